@@ -0,0 +1,296 @@
+import os
+import sys
+import json
+import time
+import zlib
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import statistics
+import tracemalloc
+from datetime import date, timedelta
+
+# ─────────────────────────────────────────────
+# 백테스트 핫패스 벤치마크
+# 사용법: python benchmarks/bench_backtest.py [--scales 1 10] [--repeat 5] [--out result.json]
+#         python benchmarks/bench_backtest.py --update-baseline   # 기준값 갱신
+#
+# fdr.DataReader 대신 결정적 가짜 주가 제공자(FakeProvider)를 price_store에 연결해 네트워크 없이 실행한다.
+# 현재 데이터(25그룹, 종목 128개, 그룹당 20종목)의 1×/10× 규모 합성 선정 CSV를 임시 폴더에 만들어 백테스트를
+# 실행하고, 그 결과로 지표·대시보드 파생 데이터(dashboard/views.py) 계산을 측정한다.
+# 항목별 벽시계 시간(중앙값), 최대 메모리(tracemalloc), 주가 조회 호출 수를 JSON으로 기록한다.
+# 기준 파일(benchmarks/baseline_backtest.json)과 비교해 시간(중앙값, 기준 MIN_WALL_SEC 하한)·메모리가
+# 허용 배율을 넘거나 조회 호출 수가 늘면 종료 코드 1.
+#
+# 가격 행렬은 날짜 × 종목 밀집 배열이라 (날짜 수 × 종목 수)가 --max-cells를 넘는 규모
+# (100×는 약 3.2억 칸)는 측정하지 않고 시작 전에 오류로 끝낸다.
+# ─────────────────────────────────────────────
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+EXPERIMENT_PATHS = [os.path.join(ROOT, "experiment", sub) for sub in ("common", "2w")]
+DASHBOARD_DIR = os.path.join(ROOT, "dashboard")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline_backtest.json")
+
+# 1× 규모 = 현재 2주 선정 데이터
+BASE_GROUPS = 25
+BASE_TICKERS = 128
+PER_GROUP = 20
+GROUP_DAYS = 10          # 2주 = 10거래일
+ACTIVE_GROUPS = 25       # 종목 1개가 선정 후보로 머무는 그룹 수 (후보군이 시간에 따라 교체됨)
+MAX_CELLS = 50_000_000   # 가격 행렬 (날짜 × 종목) 상한
+REPEAT = 5               # 항목별 측정 횟수 (중앙값 사용)
+TOLERANCE = 1.5          # 기준 대비 허용 배율 (메모리)
+TIME_TOLERANCE = 2.0     # 기준 대비 허용 배율 (시간, 실행 환경·부하에 따른 흔들림이 커서 메모리보다 넓게)
+MIN_WALL_SEC = 0.25      # 기준 시간을 이 값 이상으로 보고 비교 (수십 ms 항목의 측정 잡음으로 실패하지 않도록)
+
+
+# ─────────────────────────────────────────────
+# 가짜 주가 제공자
+# ─────────────────────────────────────────────
+class FakeProvider:
+    """
+    price_store._fetch 대체. 티커별로 고정된 시드로 거래일 달력 전체의 일봉(OHLCV)을 만든 뒤
+    요청 구간만 잘라 반환하므로 같은 날짜는 어느 구간으로 조회해도 값이 같다. 호출 수·반환 행 수를 센다 (스레드 안전)
+    """
+
+    def __init__(self, dates):
+        import pandas as pd
+        self.dates = pd.DatetimeIndex(dates, name="Date")
+        self.calls = 0
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker, start, end):
+        import numpy as np
+        import pandas as pd
+        lo = self.dates.searchsorted(pd.Timestamp(start), side="left")
+        hi = self.dates.searchsorted(pd.Timestamp(end), side="right")
+        rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+        n = len(self.dates)
+        close = (10_000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))).round()
+        open_ = (close * (1 + rng.normal(0, 0.005, n))).round()
+        volume = rng.integers(100_000, 1_000_000, n)
+        close, open_, volume = close[lo:hi], open_[lo:hi], volume[lo:hi]
+        df = pd.DataFrame({
+            "Open": open_, "High": (close * 1.01).round(), "Low": (close * 0.99).round(), "Close": close,
+            "Volume": volume, "Change": 0.0,
+        }, index=self.dates[lo:hi])
+        with self._lock:
+            self.calls += 1
+            self.rows += len(df)
+        return df
+
+
+# ─────────────────────────────────────────────
+# 합성 데이터
+# ─────────────────────────────────────────────
+def trading_days(n_groups):
+    """
+    일주일 전에 끝나는 평일 달력 (선정 그룹 수 + 마지막 투자 기간 1개). 모든 기간이 과거라
+    주가 캐시·그룹별 결과가 완결 구간으로 저장된다
+    """
+    import pandas as pd
+    end = date.today() - timedelta(days=7)
+    return pd.bdate_range(end=end, periods=(n_groups + 1) * GROUP_DAYS, name="Date")
+
+
+def make_dataset(base_dir, scale, dates):
+    """
+    scale배 규모 선정 CSV(g1.csv ~)를 base_dir에 저장 → (GroupCalendar, 종목 수).
+    그룹 i는 시간 순으로 이동하는 후보군(ACTIVE_GROUPS 그룹 동안 유지)에서 PER_GROUP 종목을 선정
+    """
+    import numpy as np
+    import pandas as pd
+    from engine import GroupCalendar
+
+    n_groups, n_tickers = BASE_GROUPS * scale, BASE_TICKERS * scale
+    calendar = GroupCalendar.generate(dates, dates[0], "2w")
+    keys = calendar.keys[:n_groups]
+    tickers = np.array([f"{100000 + i:06d}" for i in range(n_tickers)])
+    window = min(n_tickers, BASE_TICKERS * ACTIVE_GROUPS // BASE_GROUPS)
+    rng = np.random.default_rng(scale)
+    os.makedirs(base_dir, exist_ok=True)
+    for i, g in enumerate(keys):
+        lo = int((n_tickers - window) * i / max(n_groups - 1, 1))
+        picks = tickers[lo + rng.choice(window, PER_GROUP, replace=False)]
+        short, long_ = rng.random(PER_GROUP) * 0.05, rng.random(PER_GROUP) * 0.05
+        both = rng.random(PER_GROUP) < 0.3
+        score = (short + long_) * np.where(both, 2.0, 1.0)
+        note = np.where(both, "단기+장기 중복(2배)", np.where(short > long_, "단기상위", "장기상위"))
+        df = pd.DataFrame({"티커": picks, "종목명": [f"종목{t}" for t in picks], "강도_단기": short,
+                           "강도_장기": long_, "최종점수": score, "비고": note})
+        df.sort_values("최종점수", ascending=False).to_csv(
+            os.path.join(base_dir, f"{g}.csv"), index=False, encoding="utf-8-sig")
+    return calendar, n_tickers
+
+
+# ─────────────────────────────────────────────
+# 측정 대상
+# ─────────────────────────────────────────────
+def _measure(fn, repeat, setup=None, provider=None):
+    """
+    setup(측정 제외) 후 fn 실행을 repeat회 반복 → 벽시계 중앙값·호출 수,
+    이어서 tracemalloc을 켠 별도 1회로 최대 메모리 측정 (시간 측정에 영향을 주지 않도록 분리)
+    """
+    times, calls = [], []
+    for _ in range(repeat + 1):
+        if setup:
+            setup()
+        before = provider.calls if provider else 0
+        if len(times) < repeat:
+            t = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t)
+            calls.append((provider.calls if provider else 0) - before)
+        else:
+            tracemalloc.start()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    return {"wall_sec": round(statistics.median(times), 4), "peak_mb": round(peak / 2**20, 2),
+            "provider_calls": max(calls)}
+
+
+def _record(report, info, case, result):
+    report.append({**info, "case": case, **result})
+    print(f"  [{info['scale']}×] {case:26s} {result['wall_sec']:8.3f}s  {result['peak_mb']:8.1f}MB  "
+          f"조회 {result['provider_calls']}회", file=sys.stderr)
+
+
+def run(scales=(1, 10), repeat=REPEAT, max_cells=MAX_CELLS, workdir=None):
+    """규모별 항목 측정 → 결과 목록 (항목마다 dict 1개)"""
+    workdir = workdir or tempfile.mkdtemp(prefix="bench_backtest_")
+    # 캐시·저장 위치는 모듈 import 시점에 환경 변수로 정해지므로 먼저 임시 폴더로 돌려 둠
+    for var, sub in [("PRICE_CACHE_DIR", "price_cache"), ("SIGNAL_STORE_DIR", "signal_store"),
+                     ("GROUP_CACHE_DIR", "group_cache"), ("PRICE_PANEL_DIR", "price_panel"),
+                     ("BACKTEST_ARTIFACT_DIR", "artifacts")]:
+        os.environ[var] = os.path.join(workdir, sub)
+    sys.path[:0] = EXPERIMENT_PATHS + [DASHBOARD_DIR]
+
+    import price_store
+    import backtesting_2w
+    import views   # dashboard/app.py의 build_views가 호출하는 파생 데이터·차트 계산
+    from engine import calc_sharpe, calc_mdd
+
+    report = []
+    try:
+        for scale in scales:
+            cells = len(trading_days(BASE_GROUPS * scale)) * (BASE_TICKERS * scale + len(backtesting_2w.BENCHMARKS))
+            if cells > max_cells:
+                raise ValueError(f"{scale}× 규모의 가격 행렬 {cells:,}칸이 --max-cells {max_cells:,}를 넘음")
+
+        for scale in scales:
+            n_groups = BASE_GROUPS * scale
+            dates = trading_days(n_groups)
+            provider = FakeProvider(dates)
+            price_store._fetch = provider
+            price_store._limiter.min_interval = 0
+
+            base_dir = os.path.join(workdir, f"x{scale}", "signal")
+            calendar, n_tickers = make_dataset(base_dir, scale, dates)
+            info = {"scale": scale, "groups": n_groups, "tickers": n_tickers}
+
+            def cold():
+                shutil.rmtree(price_store.CACHE_DIR, ignore_errors=True)
+                price_store._MEMORY.clear()
+
+            def run_full():
+                return backtesting_2w.run_backtest(base_dir, daily=True, calendar=calendar, max_workers=1)
+
+            def run_incremental():
+                return backtesting_2w.run_backtest(base_dir, daily=True, calendar=calendar, max_workers=1,
+                                                   incremental=True)
+
+            # 백테스트 측정 후, 저장된 그룹별 결과로 만든 실제 결과를 지표·대시보드 항목의 입력으로 사용
+            for case, fn, setup in [
+                ("run_backtest_cold", run_full, cold),
+                ("run_backtest_warm", run_full, price_store._MEMORY.clear),
+                ("run_backtest_incremental", run_incremental, price_store._MEMORY.clear),
+            ]:
+                if case == "run_backtest_incremental":
+                    run_incremental()  # 그룹별 결과 저장 (측정은 저장된 결과를 읽는 경로)
+                _record(report, info, case, _measure(fn, repeat, setup, provider))
+
+            res, *_, holdings, daily = run_incremental()
+            for case, fn in [
+                ("summarize", lambda: (backtesting_2w.summarize("동일비중", res["EqualWeight"], res["KOSPI"]),
+                                       backtesting_2w.summarize_daily("동일비중", daily["EqualWeight"],
+                                                                      daily["KOSPI"]))),
+                ("calc_mdd", lambda: calc_mdd(res["EqualWeight"])),
+                ("calc_sharpe", lambda: calc_sharpe(res["EqualWeight"])),
+                ("dashboard_prep", lambda: views.derive_views(res, holdings, daily, {}, calendar)),
+            ]:
+                _record(report, info, case, _measure(fn, repeat, provider=provider))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+# ─────────────────────────────────────────────
+# 기준값 비교
+# ─────────────────────────────────────────────
+def environment():
+    import numpy as np
+    import pandas as pd
+    return {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "machine": platform.machine(), "date": date.today().isoformat()}
+
+
+def compare(report, baseline, tolerance=TOLERANCE, time_tolerance=TIME_TOLERANCE):
+    """기준 대비 항목별 판정 → report에 'baseline'·'ok' 필드를 추가해 반환"""
+    base = {(r["scale"], r["case"]): r for r in baseline.get("results", [])}
+    for r in report:
+        b = base.get((r["scale"], r["case"]))
+        if b is None:
+            r["ok"] = True
+            continue
+        r["baseline"] = {k: b[k] for k in ("wall_sec", "peak_mb", "provider_calls")}
+        slow = r["wall_sec"] > max(b["wall_sec"], MIN_WALL_SEC) * time_tolerance
+        fat = r["peak_mb"] > max(b["peak_mb"], 1.0) * tolerance
+        chatty = r["provider_calls"] > b["provider_calls"]
+        r["ok"] = not (slow or fat or chatty)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="백테스트 핫패스 벤치마크 (가짜 주가 제공자, 기준값 비교)")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="현재 데이터 대비 규모 배수")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="항목별 측정 횟수 (중앙값 사용)")
+    parser.add_argument("--max-cells", type=int, default=MAX_CELLS,
+                        help="측정할 최대 가격 행렬 크기 (날짜 × 종목, 넘는 규모는 오류)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="기준 대비 허용 배율 (메모리)")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE, help="기준 대비 허용 배율 (시간)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="비교할 기준 JSON")
+    parser.add_argument("--out", help="결과 JSON 저장 경로 (생략 시 표준 출력)")
+    parser.add_argument("--update-baseline", action="store_true", help="결과를 기준 JSON으로 저장")
+    args = parser.parse_args()
+
+    report = run(args.scales, args.repeat, args.max_cells)
+    payload = {"environment": environment(), "results": report}
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f">> 기준값 저장: {os.path.relpath(args.baseline)}", file=sys.stderr)
+        sys.exit(0)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    compare(report, baseline, args.tolerance, args.time_tolerance)
+
+    text = json.dumps(payload, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    failed = [r for r in report if not r["ok"]]
+    for r in failed:
+        print(f"  [FAIL] {r['scale']}× {r['case']}: {r['wall_sec']}s / {r['peak_mb']}MB / "
+              f"{r['provider_calls']}회 (기준 {r['baseline']})", file=sys.stderr)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,98 @@
+import os
+import sys
+import ast
+import json
+import argparse
+import statistics
+import subprocess
+
+# ─────────────────────────────────────────────
+# 시작 시간 벤치마크
+# 사용법: python benchmarks/bench_startup.py [--runs 5] [--json]
+#
+# 각 진입점의 모듈 로드를 새 파이썬 프로세스에서 반복 측정해 중앙값을 예산과 비교하고,
+# 해당 경로에서 불러오면 안 되는 무거운 모듈이 로드됐는지도 함께 검사한다.
+# 예산 초과 또는 금지 모듈 로드 시 종료 코드 1.
+# ─────────────────────────────────────────────
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+EXPERIMENT_PATHS = [os.path.join(ROOT, "experiment", sub) for sub in ("common", "2w", "1m", "")]
+DASHBOARD_DIR = os.path.join(ROOT, "dashboard")   # streamlit run이 sys.path에 넣는 스크립트 폴더
+
+HEAVY = ["matplotlib", "FinanceDataReader", "yfinance", "requests"]
+
+
+def _dashboard_imports():
+    """dashboard/app.py의 모듈 최상위 import 문만 추출 (매 rerun마다 실행되는 부분)"""
+    path = os.path.join(ROOT, "dashboard", "app.py")
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    nodes = [n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(n) for n in nodes)
+
+
+# (이름, 측정 코드, 로드되면 안 되는 모듈, 예산(초))
+TARGETS = [
+    ("engine", "import engine", HEAVY, 0.8),
+    ("backtesting_2w", "import backtesting_2w", HEAVY, 0.8),
+    ("backtesting_score_weighted", "import backtesting_score_weighted", HEAVY, 0.8),
+    ("sweep", "import sweep", HEAVY, 0.8),
+    ("dashboard", None, ["FinanceDataReader", "yfinance", "requests", "matplotlib"], 1.5),
+]
+
+_PROBE = """
+import sys, time, json
+sys.path[:0] = {paths!r}
+t = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - t
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def measure(code, forbidden, runs):
+    """새 프로세스에서 code를 runs회 실행 → (중앙값 초, 로드된 금지 모듈 목록)"""
+    times, loaded = [], set()
+    for _ in range(runs):
+        probe = _PROBE.format(paths=EXPERIMENT_PATHS + [DASHBOARD_DIR], code=code, forbidden=forbidden)
+        out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True,
+                             cwd=ROOT, check=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        times.append(result["elapsed"])
+        loaded.update(result["loaded"])
+    return statistics.median(times), sorted(loaded)
+
+
+def run(runs=5, scale=1.0):
+    """scale: 예산 배율 (느린 CI 머신 등에서 조정)"""
+    report = []
+    for name, code, forbidden, budget in TARGETS:
+        code = code or _dashboard_imports()
+        elapsed, loaded = measure(code, forbidden, runs)
+        report.append({
+            "target": name,
+            "median_sec": round(elapsed, 4),
+            "budget_sec": budget * scale,
+            "forbidden_loaded": loaded,
+            "ok": elapsed <= budget * scale and not loaded,
+        })
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="진입점별 모듈 로드 시간 예산 검사")
+    parser.add_argument("--runs", type=int, default=5, help="대상별 측정 횟수 (중앙값 사용)")
+    parser.add_argument("--scale", type=float, default=1.0, help="예산 배율")
+    parser.add_argument("--json", action="store_true", help="JSON으로 출력")
+    args = parser.parse_args()
+
+    report = run(runs=args.runs, scale=args.scale)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print(f"  {'대상':28s} | {'중앙값':>8s} | {'예산':>6s} | 금지 모듈")
+        print("  " + "-" * 70)
+        for r in report:
+            mark = "OK " if r["ok"] else "FAIL"
+            print(f"  {r['target']:28s} | {r['median_sec']:7.3f}s | {r['budget_sec']:5.1f}s | "
+                  f"{', '.join(r['forbidden_loaded']) or '-'}  [{mark}]")
+    sys.exit(0 if all(r["ok"] for r in report) else 1)
@@ -3,40 +3,33 @@ import os
 
 _DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, os.path.join(_DIR, "../experiment/2w"))
-
-from datetime import date, datetime
+sys.path.insert(0, os.path.join(_DIR, "../experiment/common"))
 
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-import FinanceDataReader as fdr
-import yfinance as yf   # 재무 데이터 라이브러리
-import requests         # 네이버 API 통신 라이브러리
 import html             # 뉴스 제목 특수문자 처리 라이브러리
 
+# FinanceDataReader(종목 목록) · yfinance(재무) · requests(뉴스)는 무거우므로
+# 매 rerun마다 불러오지 않고 해당 기능을 실제로 사용할 때 함수 안에서 import
+
 from backtesting_2w import (
-    GROUP_PERIODS, GROUP_KEYS, PRICE_LABEL,
-    run_backtest, calc_sharpe, calc_mdd, calc_ir, calc_win_rate,
+    CALENDAR,
+    run_backtest, plan_price_ranges, artifact_digest,
+)
+from price_store import load_ohlcv
+import price_panel
+from profiler import Profiler, stage
+import ticker_meta
+import fundamentals
+import news_client
+from artifacts import artifact_path, load_artifact
+
+from views import (
+    derive_views, THEME_ORANGE, THEME_LIGHT_ORANGE, THEME_COLORS, W_COL, CONTRIB_COL, STRATEGY_LABEL,
 )
-
-NAV_BASE = 10_000
-
-# ─────────────────────────────────────────────
-# 🎨 아롱님 맞춤형 디자인 테마 (주황색 강조 & 큰 이모티콘)
-# ─────────────────────────────────────────────
-THEME_ORANGE = "#FF6F00"       # 메인 진한 주황
-THEME_LIGHT_ORANGE = "#FFB300" # 밝은 주황 (골드 느낌)
-THEME_ACCENT_ORANGE = "#FF8F00" # 중간 주황
-THEME_SUB_PURPLE = "#8E24AA"    # 보조 보라 (포인트용)
-
-# 차트 색상 팔레트 (주황색 계열 중심으로 구성)
-THEME_COLORS = [
-    THEME_ORANGE, THEME_LIGHT_ORANGE,
-    "#FF5722", "#FFC107", "#FF9800",
-    THEME_SUB_PURPLE, "#F57C00", "#FFD54F"
-]
 
 # ─────────────────────────────────────────────
 # 페이지 설정 및 CSS 디자인
@@ -97,186 +90,190 @@ st.markdown(f"""
 # ─────────────────────────────────────────────
 @st.cache_data(ttl=86400, show_spinner=False)
 def get_benchmark_returns(start_date, end_date, target_dates):
-    """외부에서 실제 시장 지수를 가져와 백테스트 날짜에 맞춘 수익률 리스트 반환"""
+    """
+    외부에서 실제 시장 지수를 가져와 백테스트 날짜에 맞춘 수익률 리스트 반환.
+    구간 [직전 날짜, 날짜]의 첫·마지막 거래일 위치를 searchsorted로 한 번에 구해 계산
+    """
     benchmarks = {"KOSPI": "KS11", "KOSPI200": "KS200"}
     results = {}
-    
+    ends = pd.to_datetime(pd.Index(target_dates)).values.astype("datetime64[D]")
+    starts = np.concatenate([pd.to_datetime([start_date]).values.astype("datetime64[D]"), ends[:-1]])
+
     for name, ticker in benchmarks.items():
         try:
-            df = fdr.DataReader(ticker, start_date, end_date)
-            returns = []
-            for i in range(len(target_dates)):
-                curr_date = target_dates[i]
-                prev_date = target_dates[i-1] if i > 0 else start_date
-                
-                try:
-                    period_data = df.loc[prev_date:curr_date]
-                    if len(period_data) >= 2:
-                        ret = (period_data['Close'].iloc[-1] / period_data['Close'].iloc[0]) - 1
-                    else:
-                        ret = 0.0
-                except:
-                    ret = 0.0
-                returns.append(ret)
-            results[name] = returns
+            df = load_ohlcv(ticker, start_date, end_date)
+            dates = df.index.values.astype("datetime64[D]")
+            entry = np.searchsorted(dates, starts, side="left")
+            exit_ = np.searchsorted(dates, ends, side="right") - 1
+            close = df['Close'].to_numpy(dtype=float)
+            ok = exit_ - entry >= 1   # 거래일 2개 이상인 구간만 (get_period_return과 같은 규칙)
+            returns = np.zeros(len(ends))
+            returns[ok] = close[exit_[ok]] / close[entry[ok]] - 1
+            results[name] = returns.tolist()
         except Exception as e:
             st.warning(f"{name} 데이터를 가져오는 중 오류 발생: {e}")
             results[name] = [0.0] * len(target_dates)
             
     return results
 
-@st.cache_data(ttl=86400, show_spinner=False)
-def get_sector_map():
-    try:
-        listing = fdr.StockListing("KRX-DESC")
-        listing["Code"] = listing["Code"].astype(str).str.zfill(6)
-        return dict(zip(listing["Code"], listing["Sector"]))
-    except Exception:
-        return {}
-
-def calc_window_return(series, n):
-    if n is None or n >= len(series): return float((1 + series).prod() - 1)
-    tail = series.iloc[-n:]
-    return float((1 + tail).prod() - 1)
-
-def parse_bigo_type(bigo: str) -> str:
-    s = str(bigo)
-    if "중복" in s: return "중복선정 (단기+장기)"
-    if "단기" in s: return "단기상위"
-    return "장기상위"
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_ticker_meta():
+    """저장된 종목 메타데이터(업종·시장·종목명) 표. 오래되면 ticker_meta가 백그라운드에서 갱신"""
+    return ticker_meta.load_ticker_meta()
 
 def fmt_pct(v, sign=True):
     if sign: return f"{v * 100:+.2f}%"
     return f"{v * 100:.2f}%"
 
-def group_to_date_label(g):
-    period = GROUP_PERIODS.get(g)
-    if not period: return g
-    s = period[0][5:]
-    e = period[1][5:]
-    return f"{s.replace('-', '.')}~{e.replace('-', '.')}"
-
 def date_to_group(d, group_list):
-    for g in group_list:
-        period = GROUP_PERIODS.get(g)
-        if not period: continue
-        s = datetime.strptime(period[0], "%Y-%m-%d").date()
-        e = datetime.strptime(period[1], "%Y-%m-%d").date()
-        if s <= d <= e: return g
-    return group_list[-1]
-
-# --- 재무 데이터 수집 함수 ---
-@st.cache_data(ttl=86400, show_spinner=False)
-def get_financial_summary(ticker_code):
-    code = str(ticker_code).zfill(6)
-    try:
-        stock = yf.Ticker(f"{code}.KS")
-        info = stock.info
-        if not info.get('marketCap'):
-            stock = yf.Ticker(f"{code}.KQ")
-            info = stock.info
-            
-        summary = {
-            "PER": info.get('forwardPE') or info.get('trailingPE') or 0,
-            "PBR": info.get('priceToBook') or 0,
-            "ROE": info.get('returnOnEquity', 0) * 100 if info.get('returnOnEquity') else 0,
-            "시가총액": (info.get('marketCap') or 0) / 1e12,
-            "배당수익률": (info.get('dividendYield') or 0) * 100
-        }
-        return summary
-    except Exception:
-        return None
-
-# --- 네이버 뉴스 데이터 수집 함수 ---
-@st.cache_data(ttl=600, show_spinner=False)
-def get_naver_news(query, client_id, client_secret, display=5):
-    url = f"https://openapi.naver.com/v1/search/news.json?query={query}&display={display}&sort=sim"
-    headers = {
-        "X-Naver-Client-Id": client_id,
-        "X-Naver-Client-Secret": client_secret
-    }
-    try:
-        res = requests.get(url, headers=headers)
-        if res.status_code == 200:
-            return res.json().get('items', [])
-        else:
-            return []
-    except Exception:
-        return []
+    g = CALENDAR.group_of(d)
+    return g if g in group_list else group_list[-1]
+
+# --- 재무 데이터 수집 ---
+@st.cache_resource(show_spinner=False)
+def get_fundamentals_service():
+    """재무 요약 서비스 (서버 프로세스당 하나, 스냅샷·상장 시장 접미사는 파일로 유지)"""
+    return fundamentals.FundamentalsService()
+
+# --- 네이버 뉴스 ---
+NEWS_COUNT = 5
+NEWS_WAIT_SEC = 1.0   # 화면을 그리기 전 갱신을 기다리는 최대 시간 (넘으면 저장된 결과로 표시)
+
+@st.cache_resource(show_spinner=False)
+def get_news_client(client_id, client_secret):
+    """연결 풀·결과 저장소를 공유하는 뉴스 클라이언트 (서버 프로세스당 키별 하나)"""
+    return news_client.NewsClient(client_id, client_secret)
+
+def get_naver_credentials():
+    """네이버 검색 API 키: 환경 변수 → st.secrets 순으로 조회, 없으면 빈 문자열"""
+    client_id = os.environ.get("NAVER_CLIENT_ID", "")
+    client_secret = os.environ.get("NAVER_CLIENT_SECRET", "")
+    if not (client_id and client_secret):
+        try:
+            client_id = st.secrets.get("NAVER_CLIENT_ID", client_id)
+            client_secret = st.secrets.get("NAVER_CLIENT_SECRET", client_secret)
+        except Exception:
+            pass   # secrets.toml이 없는 경우
+    return client_id, client_secret
 
 SIGNAL_TYPE = "외국인단독"
 
 # ─────────────────────────────────────────────
 # 캐싱 백테스팅
 # ─────────────────────────────────────────────
+@st.cache_resource(show_spinner=False)
+def shared_price_panel(signal, digest):
+    """
+    시그널 폴더 전체 구간의 float32 가격 행렬을 저장해 두고 메모리 매핑으로 연결.
+    서버 프로세스당 한 번만 열리며 모든 세션의 백테스트가 같은 행렬을 읽는다
+    """
+    ranges = plan_price_ranges(os.path.join(_DIR, f"../data/file/rebal_2w_csv/{signal}"))
+    return price_panel.attach(price_panel.shared_panel_path(ranges))
+
+
 @st.cache_data(show_spinner=False, ttl=3600)
-def cached_backtest(signal):
+def cached_backtest(signal, price_method, digest):
+    """
+    빌드된 아티팩트(experiment/2w/build_artifacts.py)가 입력 CSV 해시와 일치하면 바로 불러오고,
+    없거나 오래된 경우에만 백테스트를 실행한다 (저장된 그룹별 결과를 재사용해 새 그룹만 계산). digest가 바뀌면 캐시도 새로 계산된다.
+    마지막 값은 구간별 시간·조회 카운터 (Profiler.to_dict())
+    """
+    prof = Profiler()
+    with prof.activate():
+        out = _load_or_run_backtest(signal, price_method, digest)
+    return (*out, prof.to_dict())
+
+
+def _load_or_run_backtest(signal, price_method, digest):
+    with stage("artifact.load"):
+        payload = load_artifact(artifact_path(signal, price_method), digest)
+    if payload is not None:
+        return (payload["result"], payload["m_eq"], payload["m_sc"], payload["m_ka"],
+                payload["holdings"], payload["daily"])
     base_dir = os.path.join(_DIR, f"../data/file/rebal_2w_csv/{signal}")
-    return run_backtest(base_dir, price_method="close")
+    with stage("shared_panel"):
+        shared_price_panel(signal, digest)
+    return run_backtest(base_dir, price_method=price_method, daily=True, incremental=True)
 
 # ─────────────────────────────────────────────
-# 메인 (페이지 로드 시 자동 실행)
+# 파생 데이터 · 차트 캐싱
+# 위젯을 조작할 때마다 스크립트가 처음부터 다시 실행되므로, 백테스트 결과에서 파생되는
+# NAV · 기간 수익률 · 성과 지표 · 비중 집계와 Plotly 차트는 (시그널, 가격 기준, 입력 해시)별로
+# 한 번만 만들어 rerun·세션 간에 공유한다. st.cache_resource는 복사 없이 같은 객체를 돌려주므로
+# 호출 측에서 수정하지 않는다. 날짜 선택에 따른 선택 그룹 화면만 매번 다시 계산한다.
+# 파생 데이터 계산 자체는 dashboard/views.py (벤치마크도 같은 함수를 측정)
 # ─────────────────────────────────────────────
-if "result" not in st.session_state:
-    with st.spinner("백테스팅 및 벤치마크 데이터 로드 중... (첫 실행 시 1~3분 소요)"):
-        res, m_eq, m_sc, m_ka, holdings = cached_backtest(SIGNAL_TYPE)
-        
-        # 🚨 [핵심 수정 사항] KOSPI, KOSPI200 데이터 보완
-        # res에 'KOSPI' 열이 없거나 모든 값이 0이라면 fdr을 통해 실시간 지수 수익률을 가져와 채움
-        if "KOSPI" not in res.columns or res["KOSPI"].sum() == 0:
-            start_date = res["EndDate"].min()
-            end_date = res["EndDate"].max()
-            target_dates = res["EndDate"].tolist()
-            
-            bench_data = get_benchmark_returns(start_date, end_date, target_dates)
-            res["KOSPI"] = bench_data.get("KOSPI", [0.0] * len(res))
-            res["KOSPI200"] = bench_data.get("KOSPI200", [0.0] * len(res))
-
-    st.session_state.update({
-        "result": res, "m_eq": m_eq, "m_sc": m_sc, "m_ka": m_ka,
-        "holdings": holdings,
-    })
+PRICE_METHOD = "close"
+
+
+@st.cache_resource(show_spinner="백테스팅 및 벤치마크 데이터 로드 중... (첫 실행 시 1~3분 소요)", max_entries=8)
+def build_views(signal, price_method, digest):
+    """백테스트 결과와 선택 날짜에 의존하지 않는 모든 파생 데이터·차트"""
+    res, m_eq, m_sc, m_ka, holdings, daily, profile = cached_backtest(signal, price_method, digest)
+    res = res.copy()
+
+    # res에 'KOSPI' 열이 없거나 모든 값이 0이라면 실제 지수 수익률로 채움
+    if "KOSPI" not in res.columns or res["KOSPI"].sum() == 0:
+        bench_data = get_benchmark_returns(res["EndDate"].min(), res["EndDate"].max(), res["EndDate"].tolist())
+        res["KOSPI"] = bench_data.get("KOSPI", [0.0] * len(res))
+        res["KOSPI200"] = bench_data.get("KOSPI200", [0.0] * len(res))
+
+    # 기간표 확장은 메인에서 digest 계산 전에 끝나므로 여기서는 읽기만 함 (digest에 마지막 종료일 포함)
+    return derive_views(res, holdings, daily, profile, CALENDAR)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def build_sector_view(signal, price_method, digest, meta_updated):
+    """최신 그룹 업종별 비중 TOP5 (메타데이터 표가 갱신되면 다시 계산)"""
+    views = build_views(signal, price_method, digest)
+    latest = views["holdings"][views["latest_group"]]
+    sec_top = ticker_meta.sector_weights(latest, get_ticker_meta(), W_COL, top=5)
+    weights = sec_top["비중"].to_numpy()[::-1]
+    fig = go.Figure(go.Bar(
+        x=weights, y=sec_top["업종"].to_numpy()[::-1], orientation="h",
+        marker_color=THEME_LIGHT_ORANGE,
+        text=[f"{v * 100:.1f}%" for v in weights], textposition="auto",
+    ))
+    fig.update_layout(
+        height=300, xaxis_title="비중", xaxis_tickformat=".0%",
+        margin=dict(l=10, r=10, t=10, b=10),
+    )
+    table = sec_top[["업종", "비중", "종목"]].copy()
+    table["비중"] = table["비중"].map(lambda v: f"{v * 100:.1f}%")
+    return fig, table
 
-res = st.session_state["result"]
-holdings = st.session_state["holdings"]
+# ─────────────────────────────────────────────
+# 메인 (페이지 로드 시 자동 실행)
+# ─────────────────────────────────────────────
+# 생성 기간(g26~)을 오늘 기준으로 확장한 뒤 rerun마다 입력 해시를 다시 계산
+# (선정 CSV 변경·진행 중 기간 연장이 세션을 새로 열지 않아도 반영됨. 확장은 날짜별로 한 번만 계산)
+CALENDAR.extend()
+digest = artifact_digest(os.path.join(_DIR, f"../data/file/rebal_2w_csv/{SIGNAL_TYPE}"))
+views = build_views(SIGNAL_TYPE, PRICE_METHOD, digest)
+
+holdings = views["holdings"]
+invest_groups = views["invest_groups"]
+latest_group = views["latest_group"]
+hdr = views["header"]
+last_period = hdr["last_period"]
 sig_label = SIGNAL_TYPE
-
-ret_col = "EqualWeight"
-cum_col = "EW_Cum"
-w_col = "w_equal"
-contrib_col = "contrib_eq"
-strategy_label = "동일비중"
-
-s_ret = res[ret_col]
-n = len(s_ret)
-
-nav_series = NAV_BASE * (1 + s_ret).cumprod()
-last_nav = float(nav_series.iloc[-1])
-prev_nav = float(nav_series.iloc[-2]) if n >= 2 else NAV_BASE
-nav_change = last_nav - prev_nav
-nav_change_pct = nav_change / prev_nav
-total_ret = (last_nav / NAV_BASE) - 1
-
-invest_groups = list(holdings.keys())
-latest_group = invest_groups[-1]
-latest_holdings = holdings[latest_group]
+w_col, contrib_col = W_COL, CONTRIB_COL
 
 # =========================================================
 # 섹션 1: 상단 헤더 — 기준 가격 카드
 # =========================================================
-last_period = GROUP_PERIODS.get(latest_group, ("", ""))
-change_color = "#FFF59D" if nav_change >= 0 else "#E1F5FE"
-change_arrow = "▲" if nav_change >= 0 else "▼"
+change_color = "#FFF59D" if hdr["nav_change"] >= 0 else "#E1F5FE"
+change_arrow = "▲" if hdr["nav_change"] >= 0 else "▼"
 
 st.markdown(f"""
 <div class="nav-card">
-    <div class="broker-title">Bita_증권</div> <p class="etf-name">Bita_active ETF — {sig_label} / {strategy_label}</p> <p class="nav-price">{last_nav:,.0f}원</p>
+    <div class="broker-title">Bita_증권</div> <p class="etf-name">Bita_active ETF — {sig_label} / {STRATEGY_LABEL}</p> <p class="nav-price">{hdr['last_nav']:,.0f}원</p>
     <p class="nav-change" style="color:{change_color}; background-color: rgba(0,0,0,0.2); padding: 4px 12px; border-radius: 6px; display: inline-block;">
-        전 기간 대비 {change_arrow} {abs(nav_change):,.0f}원 ({nav_change_pct:+.2%})
-        &nbsp;&nbsp;|&nbsp;&nbsp;설정일 이후 {total_ret:+.2%}
+        전 기간 대비 {change_arrow} {abs(hdr['nav_change']):,.0f}원 ({hdr['nav_change_pct']:+.2%})
+        &nbsp;&nbsp;|&nbsp;&nbsp;설정일 이후 {hdr['total_ret']:+.2%}
     </p>
     <p style="font-size:0.8rem; opacity:0.85; margin-top:0.8rem;">
-        기준일: {last_period[1]} &nbsp;|&nbsp; 설정일: {GROUP_PERIODS[invest_groups[0]][0]}
+        기준일: {last_period[1]} &nbsp;|&nbsp; 설정일: {hdr['start']}
     </p>
 </div>
 """, unsafe_allow_html=True)
@@ -288,93 +285,22 @@ st.markdown("")
 # =========================================================
 st.markdown('<p class="section-title">수익률</p>', unsafe_allow_html=True)
 
-period_config = { "1년": None, "6개월": 13, "3개월": 6, "1개월": 2 }
-tab_labels = list(period_config.keys())
-tabs = st.tabs(tab_labels)
+tabs = st.tabs([t["label"] for t in views["tabs"]])
 
-for tab, (label, win) in zip(tabs, period_config.items()):
+for tab, t in zip(tabs, views["tabs"]):
     with tab:
-        ret_my = calc_window_return(s_ret, win)
-        ret_kospi = calc_window_return(res["KOSPI"], win)
-        ret_k200 = calc_window_return(res["KOSPI200"], win)
-        
-        # KoAct 지수는 기존 데이터프레임(res)에 의존하므로 예외 처리 추가
-        ret_koact = calc_window_return(res["KoAct"], win) if "KoAct" in res.columns else 0.0
-
         rc1, rc2, rc3, rc4 = st.columns(4)
-        delta_vs_kospi = (ret_my - ret_kospi) * 100
-        rc1.metric("Bita_active ETF", fmt_pct(ret_my), f"{delta_vs_kospi:+.1f}%p vs KOSPI")
-        rc2.metric("KOSPI", fmt_pct(ret_kospi))
-        rc3.metric("KOSPI 200", fmt_pct(ret_k200))
-        rc4.metric("KoAct 배당성장", fmt_pct(ret_koact))
-
-        tail_n = win if (win is not None and win < n) else n
-        tail_nav = NAV_BASE * (1 + s_ret.iloc[-tail_n:]).cumprod()
-        tail_kospi = NAV_BASE * (1 + res["KOSPI"].iloc[-tail_n:]).cumprod()
-        tail_k200 = NAV_BASE * (1 + res["KOSPI200"].iloc[-tail_n:]).cumprod()
-        tail_dates = res["EndDate"].iloc[-tail_n:]
-
-        fig_tab = go.Figure()
-        fig_tab.add_trace(go.Scatter(
-            x=tail_dates, y=tail_nav, mode="lines+markers",
-            name="Bita_active ETF", line=dict(color=THEME_ORANGE, width=3), marker=dict(size=6),
-        ))
-        fig_tab.add_trace(go.Scatter(
-            x=tail_dates, y=tail_kospi, mode="lines", name="KOSPI",
-            line=dict(color="#9E9E9E", width=1.5, dash="dash"),
-        ))
-        fig_tab.add_trace(go.Scatter(
-            x=tail_dates, y=tail_k200, mode="lines", name="KOSPI 200",
-            line=dict(color="#757575", width=1.5, dash="dash"),
-        ))
-        fig_tab.update_layout(
-            height=280, yaxis_title="기준가격 (원)",
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, x=0),
-            hovermode="x unified",
-            margin=dict(l=20, r=20, t=30, b=20),
-        )
-        st.plotly_chart(fig_tab, use_container_width=True)
+        rc1.metric("Bita_active ETF", fmt_pct(t["my"]), f"{(t['my'] - t['kospi']) * 100:+.1f}%p vs KOSPI")
+        rc2.metric("KOSPI", fmt_pct(t["kospi"]))
+        rc3.metric("KOSPI 200", fmt_pct(t["k200"]))
+        rc4.metric("KoAct 배당성장", fmt_pct(t["koact"]))
+        st.plotly_chart(t["fig"], use_container_width=True)
 
 # =========================================================
 # 섹션 3: 기준 가격 및 기초 지수 차트
 # =========================================================
 st.markdown('<p class="section-title">기준 가격 및 기초 지수</p>', unsafe_allow_html=True)
-
-nav_kospi = NAV_BASE * (1 + res["KOSPI"]).cumprod()
-nav_k200 = NAV_BASE * (1 + res["KOSPI200"]).cumprod()
-nav_koact = NAV_BASE * (1 + res["KoAct"]).cumprod() if "KoAct" in res.columns else pd.Series([NAV_BASE]*len(res), index=res.index)
-x_dates = res["EndDate"]
-
-fig_nav = go.Figure()
-fig_nav.add_trace(go.Scatter(
-    x=x_dates, y=nav_series, mode="lines+markers",
-    name=f"Bita_active ETF ({strategy_label})",
-    line=dict(color=THEME_ORANGE, width=3), marker=dict(size=6),
-    hovertemplate="%{x}<br>%{y:,.0f}원<extra></extra>",
-))
-fig_nav.add_trace(go.Scatter(
-    x=x_dates, y=nav_kospi, mode="lines", name="KOSPI",
-    line=dict(color="#9E9E9E", width=1.5, dash="dash"),
-    hovertemplate="%{x}<br>%{y:,.0f}원<extra></extra>",
-))
-fig_nav.add_trace(go.Scatter(
-    x=x_dates, y=nav_k200, mode="lines", name="KOSPI 200",
-    line=dict(color="#757575", width=1.5, dash="dash"),
-    hovertemplate="%{x}<br>%{y:,.0f}원<extra></extra>",
-))
-fig_nav.add_trace(go.Scatter(
-    x=x_dates, y=nav_koact, mode="lines", name="KoAct 배당성장",
-    line=dict(color=THEME_SUB_PURPLE, width=2, dash="dashdot"),
-    hovertemplate="%{x}<br>%{y:,.0f}원<extra></extra>",
-))
-fig_nav.add_hline(y=NAV_BASE, line_dash="dot", line_color="gray", annotation_text=f"기준가 {NAV_BASE:,}원")
-fig_nav.update_layout(
-    height=420, yaxis_title="기준가격 (원)",
-    legend=dict(orientation="h", yanchor="bottom", y=1.02, x=0),
-    hovermode="x unified",
-    margin=dict(l=20, r=20, t=40, b=20),
-)
-st.plotly_chart(fig_nav, use_container_width=True)
+st.plotly_chart(views["fig_nav"], use_container_width=True)
 
 # =========================================================
 # 섹션 4 & 5: 자산 구성 내역 / 종목별 비중 TOP5 (좌우 배치)
@@ -384,46 +310,14 @@ col_comp, col_stock = st.columns(2)
 with col_comp:
     st.markdown('<p class="section-title">자산 구성 내역</p>', unsafe_allow_html=True)
     st.caption(f"기준 기간: {last_period[0]} ~ {last_period[1]}")
-
-    h = latest_holdings.copy()
-    h["선정유형"] = h["비고"].apply(parse_bigo_type)
-    h["비중"] = h[w_col]
-    type_weights = h.groupby("선정유형")["비중"].sum().sort_values(ascending=False)
-
-    fig_comp = px.pie(
-        names=type_weights.index, values=type_weights.values, hole=0.45,
-        color_discrete_sequence=THEME_COLORS,
-    )
-    fig_comp.update_traces(textposition="inside", textinfo="percent+label", textfont_size=12, marker=dict(line=dict(color='#FFFFFF', width=2)))
-    fig_comp.update_layout(height=300, margin=dict(l=10, r=10, t=10, b=10), showlegend=False)
-    st.plotly_chart(fig_comp, use_container_width=True)
-
-    comp_df = pd.DataFrame({ "선정유형": type_weights.index, "비중": type_weights.values })
-    comp_df["비중"] = comp_df["비중"].map(lambda v: f"{v * 100:.1f}%")
-    st.dataframe(comp_df, use_container_width=True, hide_index=True)
+    st.plotly_chart(views["fig_comp"], use_container_width=True)
+    st.dataframe(views["comp_df"], use_container_width=True, hide_index=True)
 
 with col_stock:
     st.markdown('<p class="section-title">주식 종목별 비중 TOP5</p>', unsafe_allow_html=True)
     st.caption(f"기준 기간: {last_period[0]} ~ {last_period[1]}")
-
-    top5_stocks = h.nlargest(5, w_col)[["종목명", w_col]].copy()
-    top5_stocks["비중(%)"] = top5_stocks[w_col] * 100
-
-    fig_stock = px.pie(
-        names=top5_stocks["종목명"], values=top5_stocks["비중(%)"], hole=0.45,
-        color_discrete_sequence=THEME_COLORS,
-    )
-    fig_stock.update_traces(
-        textposition="inside", textinfo="percent+label", textfont_size=12,
-        hovertemplate="%{label}<br>비중: %{value:.1f}%<extra></extra>",
-        marker=dict(line=dict(color='#FFFFFF', width=2))
-    )
-    fig_stock.update_layout(height=300, margin=dict(l=10, r=10, t=10, b=10), showlegend=False)
-    st.plotly_chart(fig_stock, use_container_width=True)
-
-    disp_stock = top5_stocks[["종목명"]].copy()
-    disp_stock["비중"] = top5_stocks[w_col].map(lambda v: f"{v * 100:.1f}%")
-    st.dataframe(disp_stock, use_container_width=True, hide_index=True)
+    st.plotly_chart(views["fig_stock"], use_container_width=True)
+    st.dataframe(views["stock_df"], use_container_width=True, hide_index=True)
 
 # =========================================================
 # 섹션 6: 업종별 비중 TOP5
@@ -431,37 +325,12 @@ with col_stock:
 st.markdown('<p class="section-title">주식 업종별 비중 TOP5</p>', unsafe_allow_html=True)
 st.caption(f"기준 기간: {last_period[0]} ~ {last_period[1]}")
 
-sector_map = get_sector_map()
-
-h_sector = latest_holdings.copy()
-h_sector["업종"] = h_sector["티커"].map(sector_map).fillna("기타")
-h_sector["비중"] = h_sector[w_col]
-sector_weights = h_sector.groupby("업종")["비중"].sum().sort_values(ascending=False).head(5)
-
-sector_stocks = {}
-for sec in sector_weights.index:
-    names = h_sector[h_sector["업종"] == sec]["종목명"].tolist()
-    sector_stocks[sec] = ", ".join(names)
+fig_sector, sec_df = build_sector_view(SIGNAL_TYPE, PRICE_METHOD, digest, ticker_meta.updated_at())
 
 col_sec_chart, col_sec_tbl = st.columns([3, 2])
 with col_sec_chart:
-    fig_sector = go.Figure(go.Bar(
-        x=sector_weights.values[::-1], y=sector_weights.index[::-1], orientation="h",
-        marker_color=THEME_LIGHT_ORANGE,
-        text=[f"{v * 100:.1f}%" for v in sector_weights.values[::-1]], textposition="auto",
-    ))
-    fig_sector.update_layout(
-        height=300, xaxis_title="비중", xaxis_tickformat=".0%",
-        margin=dict(l=10, r=10, t=10, b=10),
-    )
     st.plotly_chart(fig_sector, use_container_width=True)
-
 with col_sec_tbl:
-    sec_df = pd.DataFrame({
-        "업종": sector_weights.index, "비중": sector_weights.values,
-        "종목": [sector_stocks[s] for s in sector_weights.index],
-    })
-    sec_df["비중"] = sec_df["비중"].map(lambda v: f"{v * 100:.1f}%")
     st.dataframe(sec_df, use_container_width=True, hide_index=True)
 
 # =========================================================
@@ -469,58 +338,36 @@ with col_sec_tbl:
 # =========================================================
 st.markdown('<p class="section-title">성과 지표</p>', unsafe_allow_html=True)
 
-b_ret = res["KOSPI"]
-sharpe = calc_sharpe(s_ret, periods_per_year=n)
-mdd = calc_mdd(s_ret) * 100
-ir = calc_ir(s_ret, b_ret, periods_per_year=n)
-win = calc_win_rate(s_ret, b_ret) * 100
-
+m = views["metrics"]
 c1, c2, c3, c4, c5 = st.columns(5)
-c1.metric("총 수익률", fmt_pct(total_ret, sign=False), f"{(total_ret - calc_window_return(b_ret, None)) * 100:+.1f}%p vs KOSPI")
-c2.metric("샤프 비율", f"{sharpe:.2f}")
-c3.metric("MDD", f"{mdd:.1f}%")
-c4.metric("정보비율 (IR)", f"{ir:.2f}")
-c5.metric("승률 (vs KOSPI)", f"{win:.0f}%", f"{int((s_ret > b_ret).sum())}/{n}")
+c1.metric("총 수익률", fmt_pct(hdr["total_ret"], sign=False), f"{m['vs_kospi'] * 100:+.1f}%p vs KOSPI")
+c2.metric("샤프 비율", f"{m['sharpe']:.2f}")
+c3.metric("MDD", f"{m['mdd']:.1f}%")
+c4.metric("정보비율 (IR)", f"{m['ir']:.2f}")
+c5.metric("승률 (vs KOSPI)", f"{m['win']:.0f}%", f"{m['wins']}/{m['n']}")
 
 # =========================================================
 # 섹션 8: 기간별 초과수익 바차트
 # =========================================================
 st.markdown('<p class="section-title">기간별 초과수익</p>', unsafe_allow_html=True)
-
-excess = (res[ret_col] - res["KOSPI"]) * 100
-x_labels = [group_to_date_label(g) for g in res["InvestGroup"]]
-fig_excess = go.Figure(go.Bar(
-    x=x_labels, y=excess,
-    marker_color=[(THEME_ORANGE if v >= 0 else THEME_SUB_PURPLE) for v in excess],
-    hovertemplate="%{x}<br>초과수익: %{y:+.4f}%p<extra></extra>",
-))
-fig_excess.add_hline(y=0, line_color="black", line_width=1)
-fig_excess.update_layout(
-    height=250, yaxis_title="초과수익 (%p vs KOSPI)", xaxis=dict(tickangle=-45),
-    margin=dict(l=20, r=20, t=10, b=60),
-)
-st.plotly_chart(fig_excess, use_container_width=True)
+st.plotly_chart(views["fig_excess"], use_container_width=True)
 
 # =========================================================
 # 섹션 9: 리밸런싱 히스토리 및 기업 분석 
 # =========================================================
 st.markdown('<p class="section-title">리밸런싱 히스토리 및 기업 분석</p>', unsafe_allow_html=True)
 
-first_period = GROUP_PERIODS.get(invest_groups[0], ("2025-01-02", "2026-01-14"))
-last_period_cal = GROUP_PERIODS.get(invest_groups[-1], ("2025-01-02", "2026-01-14"))
-min_date = datetime.strptime(first_period[0], "%Y-%m-%d").date()
-max_date = datetime.strptime(last_period_cal[1], "%Y-%m-%d").date()
-default_date = datetime.strptime(GROUP_PERIODS.get(latest_group, (last_period_cal[1],))[0], "%Y-%m-%d").date()
+min_date, max_date, default_date = views["date_range"]
 
 picked_date = st.date_input(
     "날짜를 선택하면 해당 기간의 포트폴리오와 상세 재무 정보를 확인할 수 있습니다",
     value=default_date, min_value=min_date, max_value=max_date,
 )
 selected_group = date_to_group(picked_date, invest_groups)
-sel_period = GROUP_PERIODS.get(selected_group, ("", ""))
+sel_period = CALENDAR.periods.get(selected_group, ("", ""))
 st.caption(f"투자 기간: {sel_period[0]} ~ {sel_period[1]}")
 
-sel_h = holdings[selected_group].copy()
+sel_h = ticker_meta.attach_meta(holdings[selected_group], get_ticker_meta())
 
 col_tbl, col_pie, col_fin = st.columns([2.5, 1.5, 2])
 
@@ -528,6 +375,7 @@ with col_tbl:
     st.markdown(f"**<span style='color:{THEME_ORANGE}'>📋 종목별 성과</span>**", unsafe_allow_html=True)
     disp_h = pd.DataFrame({
         "종목명": sel_h["종목명"],
+        "업종": sel_h["업종"],
         "비중": (sel_h[w_col] * 100).map("{:.1f}%".format),
         "수익률": (sel_h["return"] * 100).map("{:+.2f}%".format),
         "기여도": (sel_h[contrib_col] * 100).map("{:+.3f}%".format),
@@ -554,8 +402,10 @@ with col_fin:
         
     ticker = sel_h[sel_h["종목명"] == selected_stock][ticker_col].iloc[0]
     
-    with st.spinner(f'{selected_stock} 재무 데이터 분석 중...'):
-        fin = get_financial_summary(ticker)
+    with st.spinner('보유 종목 재무 데이터 조회 중...'):
+        # 선택 기간 보유 종목 전체를 한 번에 (동시에) 조회 → 종목을 바꿔도 다시 조회하지 않음
+        fins = get_fundamentals_service().get_many(sel_h[ticker_col])
+        fin = fins.get(str(ticker).zfill(6))
         if fin:
             m1, m2 = st.columns(2)
             m1.metric("시가총액", f"{fin['시가총액']:.1f}조")
@@ -577,17 +427,49 @@ with col_fin:
 st.markdown("---") 
 st.markdown(f"""<h4 style='color: {THEME_ORANGE};'>📰 {selected_stock} 실시간 관련 이슈</h4><div class="news-link">""", unsafe_allow_html=True)
 
-NAVER_CLIENT_ID = "8mUdV3f4VWWinJ4AFKNr"
-NAVER_CLIENT_SECRET = "EMMY6g7JBA"
+NAVER_CLIENT_ID, NAVER_CLIENT_SECRET = get_naver_credentials()
+
+if not (NAVER_CLIENT_ID and NAVER_CLIENT_SECRET):
+    st.info("네이버 검색 API 키가 설정되지 않아 뉴스를 표시하지 않습니다. "
+            "(NAVER_CLIENT_ID / NAVER_CLIENT_SECRET 환경 변수 또는 st.secrets)")
+else:
+    client = get_news_client(NAVER_CLIENT_ID, NAVER_CLIENT_SECRET)
+    # 선택 기간 보유 종목 뉴스를 백그라운드로 미리 조회 → 다른 종목을 골라도 바로 표시
+    client.refresh_async(sel_h["종목명"].tolist(), display=NEWS_COUNT)
+    news_items, fresh = client.get(selected_stock, display=NEWS_COUNT, wait=NEWS_WAIT_SEC)
 
-with st.spinner('최신 뉴스 검색 중...'):
-    news_items = get_naver_news(selected_stock, NAVER_CLIENT_ID, NAVER_CLIENT_SECRET, display=5)
-    
     if news_items:
         for item in news_items:
             title = html.unescape(item['title'].replace('<b>', '').replace('</b>', '').replace('&quot;', '"'))
             link = item['link']
             st.markdown(f"- [{title}]({link})")
+        if not fresh:
+            st.caption("이전에 저장된 뉴스입니다. 최신 뉴스를 가져오는 중이며 새로고침하면 반영됩니다.")
+    elif news_items is None and client.error(selected_stock, display=NEWS_COUNT):
+        st.warning("뉴스를 불러오지 못했습니다. 잠시 후 새로고침하면 다시 시도합니다.")
+    elif news_items is None:
+        st.info("뉴스를 불러오는 중입니다. 잠시 후 새로고침하면 표시됩니다.")
     else:
         st.info("검색된 관련 뉴스가 없습니다.")
-st.markdown("</div>", unsafe_allow_html=True)
\ No newline at end of file
+st.markdown("</div>", unsafe_allow_html=True)
+
+# =========================================================
+# ⏱️ 로딩 시간 분석 (백테스트 실행 구간별 시간·조회 카운터)
+# =========================================================
+profile = views["profile"]
+if profile:
+    with st.expander(f"⏱️ 어디에 시간이 걸렸나 (백테스트 {profile['total_sec']:.2f}초)"):
+        stage_df = pd.DataFrame([
+            {"구간": name, "시간(초)": rec["sec"], "비율(%)": rec["share"] * 100, "횟수": rec["calls"]}
+            for name, rec in profile["stages"].items()
+        ])
+        if not stage_df.empty:
+            st.dataframe(stage_df.sort_values("시간(초)", ascending=False),
+                         hide_index=True, use_container_width=True)
+            st.caption("fetch·cache 구간은 주가 조회 스레드별 시간의 합이라 전체보다 클 수 있습니다.")
+        counters = profile["counters"]
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("시세 API 호출", f"{counters.get('provider.calls', 0):,}")
+        c2.metric("캐시 적중 / 미스", f"{counters.get('cache.hits', 0):,} / {counters.get('cache.misses', 0):,}")
+        c3.metric("수신 데이터", f"{counters.get('provider.bytes', 0) / 1e6:.1f} MB")
+        c4.metric("그룹 캐시 적중", f"{counters.get('group_cache.hits', 0):,}")
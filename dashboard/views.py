@@ -0,0 +1,186 @@
+from datetime import datetime
+
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.express as px
+
+from engine import calc_sharpe, calc_mdd_nav, calc_ir, calc_win_rate, TRADING_DAYS
+
+# ─────────────────────────────────────────────
+# 대시보드 파생 데이터 · 차트
+# 백테스트 결과(res, holdings, daily)에서 화면에 쓰는 NAV · 기간 수익률 · 성과 지표 · 비중 집계와
+# Plotly 차트를 만든다. Streamlit에 의존하지 않으므로 app.py(캐싱)와 벤치마크가 같은 코드를 쓴다.
+# ─────────────────────────────────────────────
+NAV_BASE = 10_000
+
+# ─────────────────────────────────────────────
+# 🎨 아롱님 맞춤형 디자인 테마 (주황색 강조 & 큰 이모티콘)
+# ─────────────────────────────────────────────
+THEME_ORANGE = "#FF6F00"       # 메인 진한 주황
+THEME_LIGHT_ORANGE = "#FFB300" # 밝은 주황 (골드 느낌)
+THEME_ACCENT_ORANGE = "#FF8F00" # 중간 주황
+THEME_SUB_PURPLE = "#8E24AA"    # 보조 보라 (포인트용)
+
+# 차트 색상 팔레트 (주황색 계열 중심으로 구성)
+THEME_COLORS = [
+    THEME_ORANGE, THEME_LIGHT_ORANGE,
+    "#FF5722", "#FFC107", "#FF9800",
+    THEME_SUB_PURPLE, "#F57C00", "#FFD54F"
+]
+
+RET_COL, W_COL, CONTRIB_COL = "EqualWeight", "w_equal", "contrib_eq"
+STRATEGY_LABEL = "동일비중"
+PERIOD_CONFIG = {"1년": None, "6개월": 13, "3개월": 6, "1개월": 2}
+NAV_HOVER = "%{x}<br>%{y:,.0f}원<extra></extra>"
+
+
+def calc_window_return(series, n):
+    if n is None or n >= len(series): return float((1 + series).prod() - 1)
+    tail = series.iloc[-n:]
+    return float((1 + tail).prod() - 1)
+
+def parse_bigo_type(bigo: str) -> str:
+    s = str(bigo)
+    if "중복" in s: return "중복선정 (단기+장기)"
+    if "단기" in s: return "단기상위"
+    return "장기상위"
+
+def group_to_date_label(g, calendar):
+    period = calendar.periods.get(g)
+    if not period: return g
+    s = period[0][5:]
+    e = period[1][5:]
+    return f"{s.replace('-', '.')}~{e.replace('-', '.')}"
+
+
+def _nav_figure(x, lines, height, margin_top, base_line=False):
+    """lines: [(이름, y, line 속성, mode)]"""
+    fig = go.Figure()
+    for name, y, line, mode in lines:
+        fig.add_trace(go.Scatter(x=x, y=y, mode=mode, name=name, line=line,
+                                 marker=dict(size=6) if "markers" in mode else None,
+                                 hovertemplate=NAV_HOVER if base_line else None))
+    if base_line:
+        fig.add_hline(y=NAV_BASE, line_dash="dot", line_color="gray", annotation_text=f"기준가 {NAV_BASE:,}원")
+    fig.update_layout(
+        height=height, yaxis_title="기준가격 (원)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, x=0),
+        hovermode="x unified",
+        margin=dict(l=20, r=20, t=margin_top, b=20),
+    )
+    return fig
+
+
+def _pie_figure(names, values, hovertemplate=None):
+    fig = px.pie(names=names, values=values, hole=0.45, color_discrete_sequence=THEME_COLORS)
+    fig.update_traces(textposition="inside", textinfo="percent+label", textfont_size=12,
+                      marker=dict(line=dict(color='#FFFFFF', width=2)))
+    if hovertemplate:
+        fig.update_traces(hovertemplate=hovertemplate)
+    fig.update_layout(height=300, margin=dict(l=10, r=10, t=10, b=10), showlegend=False)
+    return fig
+
+
+def derive_views(res, holdings, daily, profile, calendar):
+    """
+    백테스트 결과와 선택 날짜에 의존하지 않는 모든 파생 데이터·차트.
+    res는 KOSPI/KOSPI200 열이 채워진 상태로 받는다. calendar: 그룹 기간표 (GroupCalendar)
+    """
+    invest_groups = list(holdings.keys())
+    latest_group = invest_groups[-1]
+    last_period = calendar.periods.get(latest_group, ("", ""))
+
+    # 상단 헤더
+    s_ret = res[RET_COL]
+    n = len(s_ret)
+    nav_series = NAV_BASE * (1 + s_ret).cumprod()
+    last_nav = float(nav_series.iloc[-1])
+    prev_nav = float(nav_series.iloc[-2]) if n >= 2 else NAV_BASE
+    header = {
+        "last_nav": last_nav, "nav_change": last_nav - prev_nav,
+        "nav_change_pct": (last_nav - prev_nav) / prev_nav, "total_ret": last_nav / NAV_BASE - 1,
+        "last_period": last_period, "start": calendar.periods[invest_groups[0]][0],
+    }
+
+    # 수익률 탭 (기간별 수익률 + 미니 NAV 차트)
+    tabs = []
+    for label, win in PERIOD_CONFIG.items():
+        tail_n = win if (win is not None and win < n) else n
+        tail = res.iloc[-tail_n:]
+        tabs.append({
+            "label": label,
+            "my": calc_window_return(s_ret, win),
+            "kospi": calc_window_return(res["KOSPI"], win),
+            "k200": calc_window_return(res["KOSPI200"], win),
+            # KoAct 지수는 기존 데이터프레임(res)에 의존하므로 예외 처리
+            "koact": calc_window_return(res["KoAct"], win) if "KoAct" in res.columns else 0.0,
+            "fig": _nav_figure(tail["EndDate"], [
+                ("Bita_active ETF", NAV_BASE * (1 + tail[RET_COL]).cumprod(),
+                 dict(color=THEME_ORANGE, width=3), "lines+markers"),
+                ("KOSPI", NAV_BASE * (1 + tail["KOSPI"]).cumprod(),
+                 dict(color="#9E9E9E", width=1.5, dash="dash"), "lines"),
+                ("KOSPI 200", NAV_BASE * (1 + tail["KOSPI200"]).cumprod(),
+                 dict(color="#757575", width=1.5, dash="dash"), "lines"),
+            ], height=280, margin_top=30),
+        })
+
+    # 일별 NAV (기간 내 비중 변동 반영)
+    fig_nav = _nav_figure(daily.index, [
+        (f"Bita_active ETF ({STRATEGY_LABEL})", NAV_BASE * daily[RET_COL], dict(color=THEME_ORANGE, width=3), "lines"),
+        ("KOSPI", NAV_BASE * daily["KOSPI"], dict(color="#9E9E9E", width=1.5, dash="dash"), "lines"),
+        ("KOSPI 200", NAV_BASE * daily["KOSPI200"], dict(color="#757575", width=1.5, dash="dash"), "lines"),
+        ("KoAct 배당성장", NAV_BASE * daily["KoAct"], dict(color=THEME_SUB_PURPLE, width=2, dash="dashdot"), "lines"),
+    ], height=420, margin_top=40, base_line=True)
+
+    # 자산 구성 내역 / 종목별 비중 TOP5
+    h = holdings[latest_group].copy()
+    h["선정유형"] = h["비고"].apply(parse_bigo_type)
+    type_weights = h.groupby("선정유형")[W_COL].sum().sort_values(ascending=False)
+    comp_df = pd.DataFrame({"선정유형": type_weights.index,
+                            "비중": [f"{v * 100:.1f}%" for v in type_weights.values]})
+    top5 = h.nlargest(5, W_COL)
+    stock_df = pd.DataFrame({"종목명": top5["종목명"].values,
+                             "비중": [f"{v * 100:.1f}%" for v in top5[W_COL].values]})
+
+    # 성과 지표: 샤프·MDD·IR은 일별 NAV 기준 (연 252거래일 연율화), 승률은 기간 단위
+    b_ret = res["KOSPI"]
+    s_daily_ret = daily[RET_COL].pct_change().dropna()
+    b_daily_ret = daily["KOSPI"].pct_change().dropna()
+    metrics = {
+        "vs_kospi": header["total_ret"] - calc_window_return(b_ret, None),
+        "sharpe": calc_sharpe(s_daily_ret, periods_per_year=TRADING_DAYS),
+        "mdd": calc_mdd_nav(daily[RET_COL]) * 100,
+        "ir": calc_ir(s_daily_ret, b_daily_ret, periods_per_year=TRADING_DAYS),
+        "win": calc_win_rate(s_ret, b_ret) * 100,
+        "wins": int((s_ret > b_ret).sum()), "n": n,
+    }
+
+    # 기간별 초과수익
+    excess = (s_ret - res["KOSPI"]) * 100
+    fig_excess = go.Figure(go.Bar(
+        x=[group_to_date_label(g, calendar) for g in res["InvestGroup"]], y=excess,
+        marker_color=[(THEME_ORANGE if v >= 0 else THEME_SUB_PURPLE) for v in excess],
+        hovertemplate="%{x}<br>초과수익: %{y:+.4f}%p<extra></extra>",
+    ))
+    fig_excess.add_hline(y=0, line_color="black", line_width=1)
+    fig_excess.update_layout(
+        height=250, yaxis_title="초과수익 (%p vs KOSPI)", xaxis=dict(tickangle=-45),
+        margin=dict(l=20, r=20, t=10, b=60),
+    )
+
+    # 날짜 선택 범위
+    first_period = calendar.periods.get(invest_groups[0], ("2025-01-02", "2026-01-14"))
+    last_period_cal = calendar.periods.get(latest_group, ("2025-01-02", "2026-01-14"))
+    to_date = lambda s: datetime.strptime(s, "%Y-%m-%d").date()
+
+    return {
+        "holdings": holdings, "profile": profile,
+        "invest_groups": invest_groups, "latest_group": latest_group,
+        "header": header, "tabs": tabs, "fig_nav": fig_nav,
+        "fig_comp": _pie_figure(type_weights.index, type_weights.values), "comp_df": comp_df,
+        "fig_stock": _pie_figure(top5["종목명"], top5[W_COL] * 100,
+                                 hovertemplate="%{label}<br>비중: %{value:.1f}%<extra></extra>"),
+        "stock_df": stock_df,
+        "metrics": metrics, "fig_excess": fig_excess,
+        "date_range": (to_date(first_period[0]), to_date(last_period_cal[1]), to_date(last_period_cal[0])),
+    }
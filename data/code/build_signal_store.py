@@ -0,0 +1,36 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../experiment/common"))
+from engine import MonthlyCalendar, GROUP_CALENDAR
+import signal_store
+
+# ─────────────────────────────────────────────
+# 선정 CSV → 시그널 저장소(Parquet) 변환
+# 사용법: python data/code/build_signal_store.py
+#
+# rebal_2w_csv/<시그널>, monthly_csv_data/<시총> 폴더를 각각 하나의 파티션으로 저장한다.
+# data_split.py / data_split_2w.py 실행 후 자동으로 호출된다.
+# ─────────────────────────────────────────────
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REBAL_2W_DIR = os.path.join(_SCRIPT_DIR, "../file/rebal_2w_csv")
+MONTHLY_DIR = os.path.join(_SCRIPT_DIR, "../file/monthly_csv_data")
+INVEST_YEAR = 2025
+
+
+def build(root, calendar):
+    for name in sorted(os.listdir(root)):
+        base_dir = os.path.join(root, name)
+        if os.path.isdir(base_dir):
+            rows = signal_store.write_partition(base_dir, calendar)
+            print(f"  [{calendar.freq}/{name}] {rows}행 저장")
+
+
+def build_all():
+    build(REBAL_2W_DIR, GROUP_CALENDAR)
+    build(MONTHLY_DIR, MonthlyCalendar(INVEST_YEAR))
+    print(f"\n>> 완료! 저장 위치: {os.path.relpath(signal_store.STORE_DIR)}/")
+
+
+if __name__ == "__main__":
+    build_all()
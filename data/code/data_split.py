@@ -52,4 +52,8 @@ def split_excel_to_csv_by_folder(file_list):
             print(f"   == 저장 완료: {new_csv_name} ==")
 
 # 실행
-split_excel_to_csv_by_folder(excel_files)
\ No newline at end of file
+split_excel_to_csv_by_folder(excel_files)
+
+# 백테스트가 읽는 시그널 저장소(Parquet)도 함께 갱신
+from build_signal_store import build, MONTHLY_DIR, INVEST_YEAR, MonthlyCalendar
+build(MONTHLY_DIR, MonthlyCalendar(INVEST_YEAR))
\ No newline at end of file
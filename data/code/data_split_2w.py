@@ -1,16 +1,29 @@
 import pandas as pd
 import os
+import sys
+import json
+import hashlib
+
+import openpyxl
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from build_signal_store import GROUP_CALENDAR
+import signal_store
 
 # ─────────────────────────────────────────────
 # 2주 리밸런싱 엑셀 → CSV 분할
 # 상반기/하반기 컬럼명을 통일하여 저장
 #
 # 통일 컬럼: 티커, 종목명, 강도_단기, 강도_장기, 최종점수, 비고
+#
+# 워크북 파일 지문이 그대로면 열지 않고 건너뛰고, 바뀐 워크북은 읽기 전용 스트리밍으로
+# 시트별 값 지문을 계산해 새로 추가·변경된 시트만 CSV로 저장한다 (지문은 _ingest.json).
 # ─────────────────────────────────────────────
 
 _SCRIPT_DIR = os.path.dirname(__file__)
 INPUT_DIR = os.path.join(_SCRIPT_DIR, "../file/rebal_2w_raw")
 OUTPUT_DIR = os.path.join(_SCRIPT_DIR, "../file/rebal_2w_csv")
+MANIFEST_PATH = os.path.join(OUTPUT_DIR, "_ingest.json")
 
 FILE_MAP = {
     "외국인단독": [
@@ -57,10 +70,84 @@ def normalize_df(df, half, signal_type):
     return df[available].copy()
 
 
-def split_all():
+def file_fingerprint(path):
+    """워크북 파일 내용 SHA-256"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cell(value):
+    # pd.read_excel과 같이 정수 값 float는 int로
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def iter_sheets(file_path):
+    """
+    읽기 전용 스트리밍 모드로 시트별 (시트명, 값 지문, 행 목록) 생성.
+    행 목록은 첫 행(헤더) 포함, 빈 행 제외
+    """
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            h = hashlib.sha256()
+            rows = []
+            for row in ws.iter_rows(values_only=True):
+                if all(v is None for v in row):
+                    continue
+                row = tuple(_cell(v) for v in row)
+                h.update(repr(row).encode("utf-8"))
+                rows.append(row)
+            yield ws.title, h.hexdigest(), rows
+    finally:
+        wb.close()
+
+
+def rows_to_df(rows):
+    """헤더 + 값 행 → DataFrame (빈 헤더는 pd.read_excel처럼 'Unnamed: i')"""
+    if not rows:
+        return pd.DataFrame()
+    header = [c if c is not None else f"Unnamed: {i}" for i, c in enumerate(rows[0])]
+    return pd.DataFrame(rows[1:], columns=header)
+
+
+def _write_csv(df, csv_path):
+    tmp = f"{csv_path}.{os.getpid()}.tmp"
+    df.to_csv(tmp, index=False, encoding="utf-8-sig")
+    os.replace(tmp, csv_path)
+
+
+def _load_manifest():
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    with open(MANIFEST_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(manifest):
+    tmp = f"{MANIFEST_PATH}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, MANIFEST_PATH)
+
+
+def split_all(force=False):
+    """
+    변경된 워크북·시트만 CSV로 저장하고 시그널 저장소에 반영 → {시그널: [새로 쓴 CSV 파일명]}
+    force: 지문과 관계없이 전체 다시 저장
+    """
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    manifest = {} if force else _load_manifest()
+    changed = {}
+
     for signal_type, file_list in FILE_MAP.items():
         out_dir = os.path.join(OUTPUT_DIR, signal_type)
         os.makedirs(out_dir, exist_ok=True)
+        written = changed.setdefault(signal_type, [])
 
         for file_name, half in file_list:
             file_path = os.path.join(INPUT_DIR, file_name)
@@ -69,18 +156,46 @@ def split_all():
                 print(f"[경고] 파일 없음: {file_path}")
                 continue
 
-            xl = pd.read_excel(file_path, sheet_name=None)
-            print(f"\n== {file_name} ({signal_type}) ==")
+            key = f"{signal_type}/{file_name}"
+            entry = manifest.get(key, {})
+            digest = file_fingerprint(file_path)
+            outputs_exist = all(os.path.exists(os.path.join(out_dir, csv))
+                                for csv in entry.get("sheets", {}).values())
+            if entry.get("hash") == digest and outputs_exist:
+                print(f"\n== {file_name} ({signal_type}) == 변경 없음 (건너뜀)")
+                continue
 
-            for sheet_name, df in xl.items():
-                normalized = normalize_df(df, half, signal_type)
+            print(f"\n== {file_name} ({signal_type}) ==")
+            sheets, sheet_hashes = {}, {}
+            for sheet_name, sheet_hash, rows in iter_sheets(file_path):
                 csv_name = f"{sheet_name.strip().lower()}.csv"
-                csv_path = os.path.join(out_dir, csv_name)
-                normalized.to_csv(csv_path, index=False, encoding="utf-8-sig")
+                sheets[sheet_name] = csv_name
+                sheet_hashes[sheet_name] = sheet_hash
+                if (entry.get("sheet_hashes", {}).get(sheet_name) == sheet_hash
+                        and os.path.exists(os.path.join(out_dir, csv_name))):
+                    continue
+                # 티커 6자리 정규화 + 형식 검증 (오류 시 해당 워크북·시트를 포함한 ValueError)
+                normalized = signal_store.validate(normalize_df(rows_to_df(rows), half, signal_type),
+                                                   source=f"{file_name} [{sheet_name}]")
+                _write_csv(normalized, os.path.join(out_dir, csv_name))
+                written.append(csv_name)
                 print(f"  저장: {csv_name} ({len(normalized)}종목)")
 
+            manifest[key] = {"hash": digest, "sheets": sheets, "sheet_hashes": sheet_hashes}
+            _save_manifest(manifest)
+
+    # 백테스트가 읽는 시그널 저장소(Parquet)에 바뀐 파일만 반영
+    for signal_type, files in changed.items():
+        if files:
+            signal_store.update_partition(os.path.join(OUTPUT_DIR, signal_type), GROUP_CALENDAR, files)
+
     print(f"\n>> 완료! CSV 저장 위치: {OUTPUT_DIR}/")
+    return changed
 
 
 if __name__ == "__main__":
-    split_all()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="2주 리밸런싱 엑셀 → CSV 분할 (변경된 시트만)")
+    parser.add_argument("--force", action="store_true", help="변경 여부와 관계없이 전체 다시 저장")
+    split_all(force=parser.parse_args().force)
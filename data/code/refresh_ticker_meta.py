@@ -0,0 +1,19 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../experiment/common"))
+import ticker_meta
+
+# ─────────────────────────────────────────────
+# 종목 메타데이터(업종·시장·종목명) 갱신
+# 사용법: python data/code/refresh_ticker_meta.py
+#
+# KRX 상장 목록을 내려받아 data/file/ticker_meta/에 저장한다.
+# 대시보드는 저장된 표만 읽으므로 cron 등으로 주기적으로 실행해 둔다
+# (저장된 표가 TICKER_META_REFRESH_DAYS(기본 7일)보다 오래되면 대시보드가 백그라운드에서도 갱신).
+# ─────────────────────────────────────────────
+
+
+if __name__ == "__main__":
+    rows = ticker_meta.refresh()
+    print(f">> 완료! {rows}종목 저장: {os.path.relpath(ticker_meta.META_DIR)}/")
@@ -0,0 +1,372 @@
+import os
+import sys
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../experiment/common"))
+from engine import GROUP_CALENDAR as CALENDAR, krx_trading_days
+
+# ─────────────────────────────────────────────
+# 2주 수급 강도 랭킹 생성 파이프라인
+# (prep/data_preprocessing/data_preprocessing_0214.ipynb 스크립트화)
+#
+# 1. 유니버스: 그룹 기간 기관 순매수 상위 100 ∩ 외국인 순매수 상위 100
+# 2. 필터: 그룹 종료일 시가총액 ≥ 기준 + 60일 평균 거래대금 ≥ 100억
+#    (전 그룹 후보를 (group, 티커) 테이블로 모아 한 번의 마스크로 적용)
+# 3. 수급 강도: 순매수 금액 합계 / 유동 시가총액 (단기: 현재 그룹, 장기: 직전 그룹 시작일~현재 그룹 종료일)
+# 4. 단기·장기 상위 TOP_N 합집합 → 최종점수 (중복 시 2배)
+#
+# --daily-panel: 일별 순매수 패널(날짜 × 티커 × 투자자)의 누적합으로 단기·장기 구간을
+#   정확한 거래일 단위로 계산 (첫 그룹도 달력일 추정 없이 직전 같은 길이의 거래일 사용)
+#
+# KRX 조회 결과(시장 전체 스냅샷)는 data/file/krx_cache/에 Parquet로 저장하므로
+# 두 번째 실행부터는 네트워크 없이 계산된다. 종목별 조회 없이 스냅샷끼리 인덱스 조인으로 계산한다.
+# ─────────────────────────────────────────────
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get("KRX_CACHE_DIR", os.path.join(_SCRIPT_DIR, "../file/krx_cache"))
+OUTPUT_DIR = os.path.join(_SCRIPT_DIR, "../file/rebal_2w_generated")
+
+UNIVERSE_TOP = 100                 # 투자자별 순매수 상위 종목 수
+MARKET_CAP_MIN = 500_000_000_000   # 시가총액 하한 (5,000억)
+LIQUIDITY_MIN = 10_000_000_000     # 60일 평균 거래대금 하한 (100억)
+LIQUIDITY_DAYS = 60
+LIQUIDITY_LOOKBACK = 100           # 거래대금 조회 구간 (달력일, 약 60거래일)
+LONG_FALLBACK_DAYS = 30            # 직전 그룹이 없을 때 장기 구간 시작 (달력일)
+FLOATING_RATIO = 0.5               # 유동 시총 비율
+TOP_N = 10                         # 단기·장기별 상위 종목 수
+
+# 2주 기간표 (기록된 g1~g25 + 이후 KRX 거래일로 생성된 기간, 확장 시 제자리 갱신)
+PERIODS = CALENDAR.periods
+
+# 수급 강도 계산에 합산하는 투자자 (외국인합계 = 외국인 + 기타외국인)
+SIGNAL_INVESTORS = {
+    "외국인단독": ["외국인", "기타외국인"],
+    "기관포함": ["외국인", "기타외국인", "기관합계"],
+}
+
+OUTPUT_COLUMNS = ["티커", "종목명", "강도_단기(10d)", "강도_장기(20d)", "최종점수", "비고"]
+# data/code/data_split_2w.py의 통일 컬럼명
+CSV_RENAMES = {"강도_단기(10d)": "강도_단기", "강도_장기(20d)": "강도_장기"}
+
+
+# ─────────────────────────────────────────────
+# KRX 스냅샷 (로컬 캐시 경유)
+# ─────────────────────────────────────────────
+def _cached(name, fetch, end):
+    """
+    CACHE_DIR/name.parquet가 있으면 읽고, 없으면 fetch() 결과를 반환.
+    빈 결과나 종료일(end, YYYYMMDD)이 오늘 이후인 스냅샷은 아직 확정되지 않았으므로 저장하지 않는다
+    """
+    path = os.path.join(CACHE_DIR, f"{name}.parquet")
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+    df = fetch()
+    df.index = df.index.astype(str).str.zfill(6)
+    df.index.name = "티커"
+    if df.empty or end >= datetime.now().strftime("%Y%m%d"):
+        return df
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp)
+    os.replace(tmp, path)
+    return df
+
+
+def _stock():
+    from pykrx import stock  # import 시 KRX 로그인을 시도하므로 실제 조회 시점에만 불러옴
+    return stock
+
+
+def net_purchases(start, end, market, investor):
+    """기간 내 투자자별 순매수 스냅샷 (종목명, 순매수거래대금 등)"""
+    return _cached(f"net_{market}_{investor}_{start}_{end}",
+                   lambda: _stock().get_market_net_purchases_of_equities(start, end, market, investor), end)
+
+
+def market_cap(date):
+    """기준일 전 종목 시가총액 스냅샷"""
+    return _cached(f"cap_{date}", lambda: _stock().get_market_cap(date), date)
+
+
+def trading_value(start, end, market):
+    """기간 내 종목별 거래대금 합계 스냅샷"""
+    return _cached(f"change_{market}_{start}_{end}",
+                   lambda: _stock().get_market_price_change_by_ticker(start, end, market), end)
+
+
+def _krx_date(d):
+    return d.replace("-", "")
+
+
+def _shift(d, days):
+    return (datetime.strptime(d, "%Y%m%d") - timedelta(days=days)).strftime("%Y%m%d")
+
+
+# ─────────────────────────────────────────────
+# 일별 순매수 패널 (dates × tickers × investors)
+# 누적합 행렬 하나로 임의 구간 합계를 (끝 - 시작) 한 번의 뺄셈으로 계산한다.
+# 롤링 윈도우도 한 칸 이동할 때마다 O(1)이라 2주 리밸런싱일뿐 아니라 매 거래일 평가가 가능하다.
+# ─────────────────────────────────────────────
+class NetBuyPanel:
+    def __init__(self, dates, tickers, investors, values):
+        """values: ndarray (D, T, I) 일별 순매수거래대금 (없는 칸은 0)"""
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.tickers = pd.Index(tickers, name="티커")
+        self.investors = list(investors)
+        self._csum = np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+
+    def _cols(self, investors):
+        return [self.investors.index(inv) for inv in investors]
+
+    def position(self, date, side="left"):
+        """날짜 → 행 위치 (정렬된 거래일에 대한 searchsorted)"""
+        return int(np.searchsorted(self.dates, np.datetime64(date, "D"), side=side))
+
+    def range_sum(self, lo, hi, investors):
+        """[lo, hi) 행 구간의 투자자 합산 순매수 (티커 인덱스 Series)"""
+        window = self._csum[hi] - self._csum[lo]
+        return pd.Series(window[:, self._cols(investors)].sum(axis=1), index=self.tickers)
+
+    def window_sum(self, start, end, investors):
+        """[start, end] 날짜 구간 합계"""
+        return self.range_sum(self.position(start), self.position(end, "right"), investors)
+
+    def rolling(self, days, investors):
+        """모든 거래일의 직전 days거래일 합계 (DataFrame, dates × tickers, 첫 days-1일 제외)"""
+        csum = self._csum[:, :, self._cols(investors)].sum(axis=2)
+        return pd.DataFrame(csum[days:] - csum[:-days], columns=self.tickers,
+                            index=pd.DatetimeIndex(self.dates[days - 1:], name="Date"))
+
+    def group_sums(self, group, investors, periods=PERIODS):
+        """
+        (단기, 장기) 합계. 단기는 그룹 기간, 장기는 직전 그룹 시작일부터 그룹 종료일까지.
+        직전 그룹이 없으면 그룹 기간과 같은 거래일 수만큼 앞으로 늘린다.
+        """
+        start, end = periods[group]
+        lo, hi = self.position(start), self.position(end, "right")
+        keys = list(periods)
+        idx = keys.index(group)
+        if idx > 0:
+            long_lo = self.position(periods[keys[idx - 1]][0])
+        else:
+            long_lo = max(lo - (hi - lo), 0)
+        return self.range_sum(lo, hi, investors), self.range_sum(long_lo, hi, investors)
+
+
+def trading_days(start, end):
+    """[start, end] 거래일 (engine.krx_trading_days와 같은 달력)"""
+    return pd.DatetimeIndex(krx_trading_days(start, end))
+
+
+def build_net_buy_panel(start, end, market="KOSPI", investors=("외국인", "기타외국인", "기관합계")):
+    """[start, end] 거래일별 투자자 순매수 스냅샷을 (D, T, I) 패널로 결합 (일별 스냅샷은 캐시됨)"""
+    dates = trading_days(start, end)
+    days = [d.strftime("%Y%m%d") for d in dates]
+    frames = [
+        pd.DataFrame({d: net_purchases(d, d, market, inv)["순매수거래대금"] for d in days})
+        for inv in investors
+    ]
+    tickers = frames[0].index
+    for f in frames[1:]:
+        tickers = tickers.union(f.index)
+    values = np.stack([f.reindex(tickers).fillna(0).to_numpy(dtype=float).T for f in frames], axis=2)
+    return NetBuyPanel(dates, tickers, investors, values)
+
+
+def panel_for_groups(groups, market="KOSPI", periods=PERIODS):
+    """groups의 단기·장기 구간을 모두 덮는 일별 순매수 패널"""
+    keys = list(periods)
+    first = keys.index(groups[0])
+    start = periods[keys[first - 1]][0] if first > 0 else \
+        (pd.Timestamp(periods[groups[0]][0]) - timedelta(days=LONG_FALLBACK_DAYS)).date().isoformat()
+    return build_net_buy_panel(start, periods[groups[-1]][1], market)
+
+
+# ─────────────────────────────────────────────
+# 그룹별 랭킹
+# ─────────────────────────────────────────────
+
+def group_windows(group, periods=PERIODS):
+    """(단기 시작일, 종료일, 장기 시작일) — KRX 날짜 형식(YYYYMMDD)"""
+    start, end = (_krx_date(d) for d in periods[group])
+    keys = list(periods)
+    idx = keys.index(group)
+    if idx > 0:
+        long_start = _krx_date(periods[keys[idx - 1]][0])
+    else:
+        long_start = _shift(start, LONG_FALLBACK_DAYS)
+    return start, end, long_start
+
+
+def _top(df, n):
+    return df["순매수거래대금"].sort_values(ascending=False, kind="mergesort").head(n).index
+
+
+def _net_sum(start, end, market, investors):
+    """투자자별 순매수거래대금 합계 (티커 인덱스 Series)"""
+    parts = [net_purchases(start, end, market, inv)["순매수거래대금"] for inv in investors]
+    return pd.concat(parts, axis=1).fillna(0).sum(axis=1)
+
+
+def candidate_pool(groups, market="KOSPI", universe_top=UNIVERSE_TOP, periods=PERIODS):
+    """
+    그룹별 기관·외국인 순매수 상위 universe_top 교집합 → (group, 티커) MultiIndex
+    universe_top=None이면 교집합 없이 시장 전체를 후보로 사용
+    """
+    pools = {}
+    for g in groups:
+        start, end, _ = group_windows(g, periods)
+        foreign = net_purchases(start, end, market, "외국인")
+        if universe_top is None:
+            pools[g] = foreign.index
+        else:
+            inst = net_purchases(start, end, market, "기관합계")
+            pools[g] = _top(inst, universe_top).intersection(_top(foreign, universe_top))
+    return pd.MultiIndex.from_tuples(
+        [(g, t) for g, pool in pools.items() for t in pool], names=["group", "티커"])
+
+
+def market_snapshot(groups, market="KOSPI", periods=PERIODS):
+    """그룹 종료일 기준 시가총액 · 60일 거래대금 합계 → (group, 티커) 인덱스로 정렬한 프레임"""
+    frames = {}
+    for g in groups:
+        _, end, _ = group_windows(g, periods)
+        frames[g] = pd.concat([
+            market_cap(end)["시가총액"],
+            trading_value(_shift(end, LIQUIDITY_LOOKBACK), end, market)["거래대금"],
+        ], axis=1)
+    return pd.concat(frames, names=["group", "티커"])
+
+
+def filter_candidates(snapshot, pool=None, cap_min=MARKET_CAP_MIN):
+    """
+    전 그룹 시가총액·유동성 필터를 한 번의 불리언 마스크로 적용
+    snapshot: market_snapshot 결과 / pool: candidate_pool 결과 (None이면 snapshot 전체)
+    → 후보 테이블 ((group, 티커) 인덱스, 시가총액 · 거래대금 컬럼, 스냅샷에 없는 종목은 제외)
+    """
+    snap = snapshot if pool is None else snapshot.reindex(pool)
+    cap = snap["시가총액"].to_numpy(dtype=float)
+    value = snap["거래대금"].to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        mask = (cap >= cap_min) & (value / LIQUIDITY_DAYS >= LIQUIDITY_MIN)
+    return snap[mask]
+
+
+def candidates(groups, market="KOSPI", cap_min=MARKET_CAP_MIN, universe_top=UNIVERSE_TOP,
+               periods=PERIODS):
+    """groups 전체의 후보 테이블 (candidate_pool → market_snapshot → filter_candidates)"""
+    pool = candidate_pool(groups, market, universe_top, periods)
+    return filter_candidates(market_snapshot(groups, market, periods), pool, cap_min)
+
+
+def rank_group(group, cands, signal="외국인단독", market="KOSPI", top_n=TOP_N, periods=PERIODS,
+               panel=None):
+    """
+    그룹 1개의 최종 랭킹 (OUTPUT_COLUMNS, 최종점수 내림차순, 1부터 시작하는 순위 인덱스)
+    cands: candidates() 후보 테이블
+    panel: NetBuyPanel이면 단기·장기 순매수를 패널 구간 합계로 계산 (None이면 기간 스냅샷)
+    """
+    investors = SIGNAL_INVESTORS[signal]
+    start, end, long_start = group_windows(group, periods)
+    if group not in cands.index.get_level_values("group"):
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+    pool = cands.xs(group, level="group")
+
+    if panel is None:
+        net_short = _net_sum(start, end, market, investors)
+        net_long = _net_sum(long_start, end, market, investors)
+    else:
+        net_short, net_long = panel.group_sums(group, investors, periods)
+
+    f_cap = pool["시가총액"] * FLOATING_RATIO
+    res = pd.DataFrame({
+        "s1": net_short.reindex(pool.index, fill_value=0) / f_cap,
+        "s2": net_long.reindex(pool.index, fill_value=0) / f_cap,
+    }).dropna()
+    if res.empty:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+    in_s1 = res.index.isin(res["s1"].sort_values(ascending=False, kind="mergesort").head(top_n).index)
+    in_s2 = res.index.isin(res["s2"].sort_values(ascending=False, kind="mergesort").head(top_n).index)
+    res = res.assign(in_s1=in_s1, in_s2=in_s2)[in_s1 | in_s2]
+
+    # 상위권에 들지 못한 구간 점수는 0, 단기·장기 모두 상위면 2배
+    score = res["s1"].where(res["in_s1"], 0) + res["s2"].where(res["in_s2"], 0)
+    both = res["in_s1"] & res["in_s2"]
+    names = net_purchases(start, end, market, "외국인")["종목명"]
+    out = pd.DataFrame({
+        "티커": res.index,
+        "종목명": names.reindex(res.index).to_numpy(),
+        "강도_단기(10d)": res["s1"].to_numpy(),
+        "강도_장기(20d)": res["s2"].to_numpy(),
+        "최종점수": score.where(~both, score * 2).to_numpy(),
+        "비고": pd.Series("장기상위", index=res.index).mask(res["in_s1"], "단기상위")
+                  .mask(both, "중복(2배)").to_numpy(),
+    })
+    out = out.sort_values("최종점수", ascending=False, kind="mergesort").reset_index(drop=True)
+    out.index = out.index + 1
+    return out
+
+
+def run_pipeline(groups, signal="외국인단독", market="KOSPI", cap_min=MARKET_CAP_MIN, top_n=TOP_N,
+                 universe_top=UNIVERSE_TOP, panel=None):
+    """{그룹: 랭킹 DataFrame} (순서 유지)"""
+    cands = candidates(groups, market, cap_min, universe_top)
+    return {g: rank_group(g, cands, signal, market, top_n, panel=panel) for g in groups}
+
+
+def save_rankings(rankings, out_dir, excel_path=None):
+    """그룹별 CSV (통일 컬럼명) 저장, excel_path가 있으면 노트북과 같은 그룹별 시트 Excel도 저장"""
+    os.makedirs(out_dir, exist_ok=True)
+    for g, df in rankings.items():
+        df.rename(columns=CSV_RENAMES).to_csv(
+            os.path.join(out_dir, f"{g}.csv"), index=False, encoding="utf-8-sig")
+    if excel_path:
+        with pd.ExcelWriter(excel_path, engine="openpyxl") as writer:
+            for g, df in rankings.items():
+                if not df.empty:
+                    df.to_excel(writer, sheet_name=g, index=True)
+
+
+def group_range(first, last):
+    """'g13', 'g25' → ['g13', ..., 'g25'] (기간표 순서 기준, 생성 기간 포함)"""
+    CALENDAR.extend()
+    return CALENDAR.keys[CALENDAR.position(first):CALENDAR.position(last) + 1]
+
+
+if __name__ == "__main__":
+    CALENDAR.extend()
+    parser = argparse.ArgumentParser(description="2주 수급 강도 랭킹 생성")
+    parser.add_argument("--signal", nargs="+", default=list(SIGNAL_INVESTORS),
+                        choices=list(SIGNAL_INVESTORS), help="시그널 유형")
+    parser.add_argument("--groups", nargs=2, default=[CALENDAR.keys[0], CALENDAR.keys[-1]],
+                        metavar=("FIRST", "LAST"), help="생성할 그룹 범위 (예: g13 g25)")
+    parser.add_argument("--market", default="KOSPI", choices=["KOSPI", "KOSDAQ", "ALL"],
+                        help="조회 시장")
+    parser.add_argument("--cap", type=float, default=MARKET_CAP_MIN / 1e8,
+                        help="시가총액 하한 (억 원)")
+    parser.add_argument("--top-n", type=int, default=TOP_N, help="단기·장기별 상위 종목 수")
+    parser.add_argument("--universe-top", type=int, default=UNIVERSE_TOP,
+                        help="기관·외국인 순매수 상위 N 교집합으로 후보 제한 (0이면 시장 전체)")
+    parser.add_argument("--daily-panel", action="store_true",
+                        help="일별 순매수 패널로 단기·장기 구간을 거래일 단위로 계산")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="CSV 저장 폴더 (시그널별 하위 폴더 생성)")
+    parser.add_argument("--excel", action="store_true",
+                        help="시그널별 그룹 시트 Excel도 함께 저장")
+    args = parser.parse_args()
+
+    groups = group_range(*args.groups)
+    panel = panel_for_groups(groups, args.market) if args.daily_panel else None
+    for signal in args.signal:
+        rankings = run_pipeline(groups, signal, args.market, args.cap * 1e8, args.top_n,
+                                args.universe_top or None, panel)
+        out_dir = os.path.join(args.out, signal)
+        excel = os.path.join(args.out, f"수급강도_최종랭킹_{signal}.xlsx") if args.excel else None
+        save_rankings(rankings, out_dir, excel)
+        print(f"\n== {signal} ==")
+        for g, df in rankings.items():
+            print(f"  [{g}] {len(df)}종목")
+        print(f"  저장: {os.path.relpath(out_dir)}/")
@@ -1,161 +1,62 @@
 import pandas as pd
-import numpy as np
-import FinanceDataReader as fdr
-import matplotlib.pyplot as plt
 import os
+import sys
 import argparse
-from datetime import datetime, timedelta
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../common"))
+from engine import (
+    KOSPI, RISK_FREE_ANNUAL, MAX_WORKERS, MonthlyCalendar, calc_equal_weight, calc_mdd, calc_win_rate,
+)
+import engine
 
 # ─────────────────────────────────────────────
-# 1. 실행 인자 설정 (argparse)
+# 1. 설정 값
 # 사용법: python backtesting.py --cap 5천억 --price open
 # ─────────────────────────────────────────────
-parser = argparse.ArgumentParser(description="수급 강도 전략 1년 백테스팅")
-parser.add_argument("--cap", type=str, default="5천억", choices=["2천억", "5천억"],
-                    help="분석할 시총 폴더 선택 (2천억 또는 5천억)")
-parser.add_argument("--price", type=str, default="close",
-                    choices=["open", "close", "vwap"],
-                    help="수익률 계산 기준 (open: 시가, close: 종가, vwap: 거래량가중평균)")
-args = parser.parse_args()
-
 PRICE_LABEL = {"open": "시가(Open) 기준", "close": "종가(Close) 기준", "vwap": "VWAP 기준"}
 
-# 설정 값
-BASE_DIR = os.path.join(os.path.dirname(__file__), f"../../data/file/monthly_csv_data/시총{args.cap}")
-KOSPI = "KS11"  # 코스피 벤치마크 기호
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../data/file/monthly_csv_data")
 INVEST_YEAR = 2025
-RISK_FREE_ANNUAL = 0.03  # 연 무위험 수익률 (한국 국채 3년물 기준 약 3%)
-
-# ─────────────────────────────────────────────
-# 2. 수익률 계산 함수 (시가 / 종가 / VWAP)
-# ─────────────────────────────────────────────
-def _get_entry_exit_price(df_price, method):
-    """주어진 OHLCV 데이터에서 매수가/매도가를 반환"""
-    if method == "open":
-        entry = df_price['Open'].iloc[0]
-        exit_ = df_price['Open'].iloc[-1]  # 마지막 날 시가에 매도(다음 달 첫날 시가 대용)
-    elif method == "close":
-        entry = df_price['Close'].iloc[0]
-        exit_ = df_price['Close'].iloc[-1]
-    elif method == "vwap":
-        # VWAP 근사치: 일별 (High + Low + Close) / 3 을 거래량 가중 평균
-        typical = (df_price['High'] + df_price['Low'] + df_price['Close']) / 3
-        volume = df_price['Volume']
-        # 첫 날 VWAP (단일 일이므로 typical price)
-        entry = typical.iloc[0]
-        # 마지막 날 VWAP
-        exit_ = typical.iloc[-1]
-    else:
-        raise ValueError(f"지원하지 않는 가격 기준: {method}")
-    return entry, exit_
-
-
-def get_monthly_return(ticker, start, end, method="close"):
-    """특정 기간의 수익률을 지정된 가격 기준으로 계산"""
-    try:
-        df = fdr.DataReader(ticker, start, end)
-        if df.empty or len(df) < 2:
-            print(f"  [경고] {ticker}: 데이터 부족 (행 수: {len(df) if not df.empty else 0})")
-            return 0
-        entry, exit_ = _get_entry_exit_price(df, method)
-        if entry == 0:
-            print(f"  [경고] {ticker}: 매수가가 0")
-            return 0
-        return (exit_ / entry) - 1
-    except Exception as e:
-        print(f"  [에러] {ticker}: {e}")
-        return 0
+CALENDAR = MonthlyCalendar(INVEST_YEAR)
 
 
 # ─────────────────────────────────────────────
-# 3. 성과 지표 계산 함수
+# 2. 성과 지표 계산 함수 (월간 수익률 기준 연율화)
 # ─────────────────────────────────────────────
 def calc_sharpe_ratio(monthly_returns, risk_free_annual=RISK_FREE_ANNUAL):
     """월간 수익률 기반 연율화 샤프 비율"""
-    rf_monthly = (1 + risk_free_annual) ** (1 / 12) - 1
-    excess = monthly_returns - rf_monthly
-    if excess.std() == 0:
-        return 0
-    return (excess.mean() / excess.std()) * np.sqrt(12)
-
-
-def calc_mdd(monthly_returns):
-    """월간 수익률 시계열 기반 MDD (최대 낙폭)"""
-    cumulative = (1 + monthly_returns).cumprod()
-    running_max = cumulative.cummax()
-    drawdown = (cumulative - running_max) / running_max
-    return drawdown.min()  # 음수값 (가장 큰 낙폭)
+    return engine.calc_sharpe(monthly_returns, risk_free_annual, periods_per_year=CALENDAR.periods_per_year)
 
 
 def calc_information_ratio(strategy_returns, benchmark_returns):
     """정보 비율 (연율화): 초과수익 평균 / 초과수익 표준편차 * sqrt(12)"""
-    excess = strategy_returns - benchmark_returns
-    if excess.std() == 0:
-        return 0
-    return (excess.mean() / excess.std()) * np.sqrt(12)
-
-
-def calc_win_rate(strategy_returns, benchmark_returns):
-    """월간 승률: 전략이 벤치마크를 이긴 달의 비율"""
-    wins = (strategy_returns > benchmark_returns).sum()
-    total = len(strategy_returns)
-    return wins / total if total > 0 else 0
+    return engine.calc_ir(strategy_returns, benchmark_returns, periods_per_year=CALENDAR.periods_per_year)
 
 
 # ─────────────────────────────────────────────
-# 4. 백테스팅 메인 로직
+# 3. 백테스팅 메인 로직 (동일비중 + 중복 2배)
 # ─────────────────────────────────────────────
-def run_full_year_backtest(price_method="close"):
-    # 폴더 내의 CSV 파일들 읽기 (파일명: 2025_01월_... 순서대로)
-    all_files = sorted([f for f in os.listdir(BASE_DIR) if f.endswith('.csv')])
+def run_full_year_backtest(base_dir, price_method="close", max_workers=MAX_WORKERS):
+    bt = engine.run(base_dir, CALENDAR, price_method=price_method,
+                    weightings=OrderedDict([("Strategy", calc_equal_weight)]),
+                    benchmarks={"KOSPI": KOSPI}, max_workers=max_workers)
 
     monthly_results = []
-
-    for file_name in all_files:
-        # 1. 파일명에서 해당 '선정 월' 추출
-        try:
-            month_str = file_name.split('_')[1].replace('월', '')
-            select_month = int(month_str)
-        except Exception:
-            continue
-
-        # 2. 실제 투자 기간 설정 (N월 선정 -> N+1월 투자)
-        invest_month = select_month + 1
-        year = INVEST_YEAR
-        if invest_month > 12:
-            invest_month = 1
-            year += 1
-
-        start_date = f"{year}-{invest_month:02d}-01"
-        if invest_month == 12:
-            end_date = f"{year}-12-31"
-        else:
-            end_date = (datetime(year, invest_month + 1, 1) - timedelta(days=1)).strftime('%Y-%m-%d')
-
-        # 3. 데이터 로드 및 비중 계산 (중복 2배)
-        df = pd.read_csv(os.path.join(BASE_DIR, file_name))
-        df['티커'] = df['티커'].astype(str).str.zfill(6)
-        df['score'] = df['비고'].apply(lambda x: 2 if '중복' in str(x) else 1)
-        df['weight'] = df['score'] / df['score'].sum()
-
-        print(f"\n>>> {year}년 {invest_month:02d}월 수익률 계산 중... "
-            f"(선정: {select_month}월 | 기준: {PRICE_LABEL[price_method]})")
-
-        # 4. 전략 수익률 vs 코스피 수익률
-        strategy_ret = 0
-        for _, row in df.iterrows():
-            ret = get_monthly_return(row['티커'], start_date, end_date, method=price_method)
-            strategy_ret += ret * row['weight']
-
-        benchmark_ret = get_monthly_return(KOSPI, start_date, end_date, method=price_method)
+    for idx, r in enumerate(bt.rebalances):
+        print(f"\n>>> {r.invest[:4]}년 {r.invest[5:]}월 수익률 계산 중... "
+            f"(선정: {r.select}월 | 기준: {PRICE_LABEL[price_method]})")
+        short = bt.stock_counts[idx] < 2
+        for ticker, n in zip(bt.selections[idx]['티커'][short], bt.stock_counts[idx][short]):
+            print(f"  [경고] {ticker}: 데이터 부족 (행 수: {n})")
 
         monthly_results.append({
-            'Date': f"{year}-{invest_month:02d}",
-            'Strategy': strategy_ret,
-            'KOSPI': benchmark_ret
+            'Date': r.invest,
+            'Strategy': bt.port_rets[0, idx],
+            'KOSPI': bt.bench_rets[idx, 0]
         })
 
-    # ── 5. 성과 지표 계산 ──
+    # ── 성과 지표 계산 ──
     res_df = pd.DataFrame(monthly_results)
     res_df['Strategy_Cum'] = (1 + res_df['Strategy']).cumprod() - 1
     res_df['KOSPI_Cum'] = (1 + res_df['KOSPI']).cumprod() - 1
@@ -184,10 +85,23 @@ def run_full_year_backtest(price_method="close"):
 
 
 # ─────────────────────────────────────────────
-# 5. 실행 및 출력
+# 4. 실행 및 출력
 # ─────────────────────────────────────────────
 if __name__ == "__main__":
-    result, metrics = run_full_year_backtest(price_method=args.price)
+    import matplotlib.pyplot as plt
+
+    parser = argparse.ArgumentParser(description="수급 강도 전략 1년 백테스팅")
+    parser.add_argument("--cap", type=str, default="5천억", choices=["2천억", "5천억"],
+                        help="분석할 시총 폴더 선택 (2천억 또는 5천억)")
+    parser.add_argument("--price", type=str, default="close",
+                        choices=["open", "close", "vwap"],
+                        help="수익률 계산 기준 (open: 시가, close: 종가, vwap: 거래량가중평균)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help="주가 동시 조회 스레드 수 (1이면 순차 조회)")
+    args = parser.parse_args()
+
+    result, metrics = run_full_year_backtest(os.path.join(DATA_DIR, f"시총{args.cap}"),
+                                             price_method=args.price, max_workers=args.workers)
 
     # ── 월별 수익률 테이블 ──
     print("\n" + "=" * 70)
@@ -1,102 +1,32 @@
 import pandas as pd
-import numpy as np
-import FinanceDataReader as fdr
-import matplotlib.pyplot as plt
 import os
+import sys
 import argparse
-from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../common"))
+from engine import (
+    PRICE_LABEL, KOSPI, RISK_FREE_ANNUAL, MAX_WORKERS, MonthlyCalendar, calc_mdd, calc_win_rate,
+)
+import engine
 
 # ─────────────────────────────────────────────
-# 1. 실행 인자 설정
+# 1. 설정 값
 # 사용법: python backtesting_score_weighted.py --cap 5천억 --price close
 # ─────────────────────────────────────────────
-parser = argparse.ArgumentParser(
-    description="수급 강도 전략 백테스팅 - 동일비중 vs 점수비중 비교")
-parser.add_argument("--cap", type=str, default="5천억", choices=["2천억", "5천억"],
-                    help="분석할 시총 폴더 선택")
-parser.add_argument("--price", type=str, default="close",
-                    choices=["open", "close", "vwap"],
-                    help="수익률 계산 기준 (open/close/vwap)")
-args = parser.parse_args()
-
-PRICE_LABEL = {"open": "시가(Open)", "close": "종가(Close)", "vwap": "VWAP"}
-
-BASE_DIR = os.path.join(os.path.dirname(__file__), f"../../data/file/monthly_csv_data/시총{args.cap}")
-KOSPI = "KS11"
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../data/file/monthly_csv_data")
 INVEST_YEAR = 2025
-RISK_FREE_ANNUAL = 0.03
-
-
-# ─────────────────────────────────────────────
-# 2. 가격 및 수익률 계산
-# ─────────────────────────────────────────────
-def _get_entry_exit_price(df_price, method):
-    if method == "open":
-        return df_price['Open'].iloc[0], df_price['Open'].iloc[-1]
-    elif method == "close":
-        return df_price['Close'].iloc[0], df_price['Close'].iloc[-1]
-    elif method == "vwap":
-        typical = (df_price['High'] + df_price['Low'] + df_price['Close']) / 3
-        return typical.iloc[0], typical.iloc[-1]
-    raise ValueError(f"지원하지 않는 가격 기준: {method}")
-
-
-def get_monthly_return(ticker, start, end, method="close"):
-    try:
-        df = fdr.DataReader(ticker, start, end)
-        if df.empty or len(df) < 2:
-            print(f"  [경고] {ticker}: 데이터 부족")
-            return 0
-        entry, exit_ = _get_entry_exit_price(df, method)
-        if entry == 0:
-            return 0
-        return (exit_ / entry) - 1
-    except Exception as e:
-        print(f"  [에러] {ticker}: {e}")
-        return 0
-
-
-# ─────────────────────────────────────────────
-# 3. 비중 계산 방식 2가지
-# ─────────────────────────────────────────────
-def calc_equal_weight(df):
-    """기존 방식: 동일비중 + 중복 2배"""
-    df['score'] = df['비고'].apply(lambda x: 2 if '중복' in str(x) else 1)
-    df['weight'] = df['score'] / df['score'].sum()
-    return df['weight']
-
-
-def calc_score_weight(df):
-    """신규 방식: 최종점수 정규화 비중"""
-    scores = df['최종점수'].clip(lower=0)  # 음수 점수 방지
-    total = scores.sum()
-    if total == 0:
-        return pd.Series(1 / len(df), index=df.index)
-    return scores / total
+CALENDAR = MonthlyCalendar(INVEST_YEAR)
 
 
 # ─────────────────────────────────────────────
-# 4. 성과 지표 계산
+# 2. 성과 지표 계산 (월간 수익률 기준 연율화)
 # ─────────────────────────────────────────────
 def calc_sharpe(monthly_returns, rf_annual=RISK_FREE_ANNUAL):
-    rf_m = (1 + rf_annual) ** (1 / 12) - 1
-    excess = monthly_returns - rf_m
-    return (excess.mean() / excess.std()) * np.sqrt(12) if excess.std() != 0 else 0
-
-
-def calc_mdd(monthly_returns):
-    cum = (1 + monthly_returns).cumprod()
-    return ((cum - cum.cummax()) / cum.cummax()).min()
+    return engine.calc_sharpe(monthly_returns, rf_annual, periods_per_year=CALENDAR.periods_per_year)
 
 
 def calc_ir(strategy_ret, bench_ret):
-    excess = strategy_ret - bench_ret
-    return (excess.mean() / excess.std()) * np.sqrt(12) if excess.std() != 0 else 0
-
-
-def calc_win_rate(strategy_ret, bench_ret):
-    wins = (strategy_ret > bench_ret).sum()
-    return wins / len(strategy_ret) if len(strategy_ret) > 0 else 0
+    return engine.calc_ir(strategy_ret, bench_ret, periods_per_year=CALENDAR.periods_per_year)
 
 
 def summarize_metrics(label, s_ret, b_ret):
@@ -115,62 +45,47 @@ def summarize_metrics(label, s_ret, b_ret):
 
 
 # ─────────────────────────────────────────────
-# 5. 백테스팅 메인 로직 (두 전략 동시 실행)
+# 3. 투자 기간 및 주가 사전 조회 계획
 # ─────────────────────────────────────────────
-def run_comparison_backtest(price_method="close"):
-    all_files = sorted([f for f in os.listdir(BASE_DIR) if f.endswith('.csv')])
-
-    monthly_results = []
-
-    for file_name in all_files:
-        try:
-            month_str = file_name.split('_')[1].replace('월', '')
-            select_month = int(month_str)
-        except Exception:
-            continue
+def get_invest_period(file_name):
+    """파일명에서 선정 월 추출 → (선정 월, 투자 연도, 투자 월, 시작일, 종료일). 형식이 다르면 None"""
+    return CALENDAR.invest_period(file_name)
 
-        invest_month = select_month + 1
-        year = INVEST_YEAR
-        if invest_month > 12:
-            invest_month = 1
-            year += 1
 
-        start_date = f"{year}-{invest_month:02d}-01"
-        if invest_month == 12:
-            end_date = f"{year}-12-31"
-        else:
-            end_date = (datetime(year, invest_month + 1, 1) - timedelta(days=1)).strftime('%Y-%m-%d')
+def plan_price_ranges(base_dir):
+    """전체 월의 종목·KOSPI 합집합에 대해 {ticker: (최소 시작일, 최대 종료일)} 반환"""
+    return engine.plan_price_ranges(base_dir, CALENDAR, [KOSPI])
 
-        df = pd.read_csv(os.path.join(BASE_DIR, file_name))
-        df['티커'] = df['티커'].astype(str).str.zfill(6)
 
-        # 두 가지 비중 계산
-        w_equal = calc_equal_weight(df)
-        w_score = calc_score_weight(df)
-
-        print(f"\n>>> {year}년 {invest_month:02d}월 (선정: {select_month}월 | {PRICE_LABEL[price_method]})")
-
-        # 비중 분포 요약
-        print(f"    [동일비중] 최대 {w_equal.max()*100:.1f}% / 최소 {w_equal.min()*100:.1f}%"
-              f"  |  [점수비중] 최대 {w_score.max()*100:.1f}% / 최소 {w_score.min()*100:.1f}%")
+# ─────────────────────────────────────────────
+# 4. 백테스팅 메인 로직 (두 전략 동시 실행)
+# ─────────────────────────────────────────────
+def run_comparison_backtest(base_dir, price_method="close", max_workers=MAX_WORKERS, verbose=True):
+    """
+    base_dir: 월별 CSV 폴더 경로 (예: DATA_DIR/시총5천억)
+    verbose: False이면 월별 진행 상황 출력 생략 (파라미터 스윕 등에서 사용)
+    """
+    bt = engine.run(base_dir, CALENDAR, price_method=price_method, benchmarks={"KOSPI": KOSPI},
+                    max_workers=max_workers)
 
-        # 각 종목 수익률 한 번만 조회 (API 호출 절약)
-        stock_returns = []
-        for _, row in df.iterrows():
-            ret = get_monthly_return(row['티커'], start_date, end_date, method=price_method)
-            stock_returns.append(ret)
+    monthly_results = []
+    for idx, r in enumerate(bt.rebalances):
+        w_equal, w_score = bt.stock_weights[idx]
 
-        stock_returns = np.array(stock_returns)
+        if verbose:
+            print(f"\n>>> {r.invest[:4]}년 {r.invest[5:]}월 (선정: {r.select}월 | {PRICE_LABEL[price_method]})")
 
-        ret_equal = np.dot(stock_returns, w_equal.values)
-        ret_score = np.dot(stock_returns, w_score.values)
-        ret_bench = get_monthly_return(KOSPI, start_date, end_date, method=price_method)
+            # 비중 분포 요약
+            print(f"    [동일비중] 최대 {w_equal.max()*100:.1f}% / 최소 {w_equal.min()*100:.1f}%"
+                  f"  |  [점수비중] 최대 {w_score.max()*100:.1f}% / 최소 {w_score.min()*100:.1f}%")
+            for ticker in bt.selections[idx]['티커'][bt.stock_counts[idx] < 2]:
+                print(f"  [경고] {ticker}: 데이터 부족")
 
         monthly_results.append({
-            'Date': f"{year}-{invest_month:02d}",
-            'EqualWeight': ret_equal,
-            'ScoreWeight': ret_score,
-            'KOSPI': ret_bench
+            'Date': r.invest,
+            'EqualWeight': bt.port_rets[0, idx],
+            'ScoreWeight': bt.port_rets[1, idx],
+            'KOSPI': bt.bench_rets[idx, 0]
         })
 
     res = pd.DataFrame(monthly_results)
@@ -185,10 +100,25 @@ def run_comparison_backtest(price_method="close"):
 
 
 # ─────────────────────────────────────────────
-# 6. 실행 및 출력
+# 5. 실행 및 출력
+
 # ─────────────────────────────────────────────
 if __name__ == "__main__":
-    result, m_ew, m_sw = run_comparison_backtest(price_method=args.price)
+    import matplotlib.pyplot as plt
+
+    parser = argparse.ArgumentParser(
+        description="수급 강도 전략 백테스팅 - 동일비중 vs 점수비중 비교")
+    parser.add_argument("--cap", type=str, default="5천억", choices=["2천억", "5천억"],
+                        help="분석할 시총 폴더 선택")
+    parser.add_argument("--price", type=str, default="close",
+                        choices=["open", "close", "vwap"],
+                        help="수익률 계산 기준 (open/close/vwap)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help="주가 동시 조회 스레드 수 (1이면 순차 조회)")
+    args = parser.parse_args()
+
+    result, m_ew, m_sw = run_comparison_backtest(os.path.join(DATA_DIR, f"시총{args.cap}"),
+                                                 price_method=args.price, max_workers=args.workers)
 
     # ── 월별 수익률 테이블 ──
     print("\n" + "=" * 90)
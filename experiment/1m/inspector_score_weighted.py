@@ -1,106 +1,43 @@
-import pandas as pd
-import FinanceDataReader as fdr
 import os
+import sys
 import argparse
-from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../common"))
+from engine import PRICE_LABEL, MAX_WORKERS, MonthlyCalendar
+import engine
 
 # ─────────────────────────────────────────────
-# 실행 인자 설정
+# 설정
 # 사용법: python inspector_score_weighted.py --cap 5천억 --price close
 # ─────────────────────────────────────────────
-parser = argparse.ArgumentParser(
-    description="수급 강도 전략 - 월별 종목 상세 검증 (동일비중 vs 점수비중)")
-parser.add_argument("--cap", type=str, default="5천억", choices=["2천억", "5천억"],
-                    help="분석할 시총 폴더 선택")
-parser.add_argument("--price", type=str, default="close",
-                    choices=["open", "close", "vwap"],
-                    help="수익률 계산 기준 (open/close/vwap)")
-args = parser.parse_args()
-
-PRICE_LABEL = {"open": "시가(Open)", "close": "종가(Close)", "vwap": "VWAP"}
-
-BASE_DIR = os.path.join(os.path.dirname(__file__), f"../../data/file/monthly_csv_data/시총{args.cap}")
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../data/file/monthly_csv_data")
 INVEST_YEAR = 2025
+CALENDAR = MonthlyCalendar(INVEST_YEAR)
 
 
-# ─────────────────────────────────────────────
-# 가격 및 수익률 계산
-# ─────────────────────────────────────────────
-def _get_entry_exit_price(df_price, method):
-    if method == "open":
-        return df_price['Open'].iloc[0], df_price['Open'].iloc[-1]
-    elif method == "close":
-        return df_price['Close'].iloc[0], df_price['Close'].iloc[-1]
-    elif method == "vwap":
-        typical = (df_price['High'] + df_price['Low'] + df_price['Close']) / 3
-        return typical.iloc[0], typical.iloc[-1]
-    raise ValueError(f"지원하지 않는 가격 기준: {method}")
-
-
-def get_stock_detail_returns(ticker, start, end, method="close"):
-    try:
-        df = fdr.DataReader(ticker, start, end)
-        if df.empty or len(df) < 2:
-            print(f"    [경고] {ticker}: 데이터 부족")
-            return 0
-        entry, exit_ = _get_entry_exit_price(df, method)
-        if entry == 0:
-            print(f"    [경고] {ticker}: 매수가가 0")
-            return 0
-        return (exit_ / entry) - 1
-    except Exception as e:
-        print(f"    [에러] {ticker}: {e}")
-        return 0
-
-
-# ─────────────────────────────────────────────
-# 비중 계산
-# ─────────────────────────────────────────────
-def calc_equal_weight(df):
-    scores = df['비고'].apply(lambda x: 2 if '중복' in str(x) else 1)
-    return scores / scores.sum()
-
-
-def calc_score_weight(df):
-    scores = df['최종점수'].clip(lower=0)
-    total = scores.sum()
-    if total == 0:
-        return pd.Series(1 / len(df), index=df.index)
-    return scores / total
+def get_invest_period(file_name):
+    """파일명에서 선정 월 추출 → (선정 월, 투자 연도, 투자 월, 시작일, 종료일)"""
+    return CALENDAR.invest_period(file_name)
 
 
 # ─────────────────────────────────────────────
 # 월별 상세 검증 (두 비중 방식 비교)
 # ─────────────────────────────────────────────
-def inspect_monthly_details(price_method="close"):
-    files = sorted([f for f in os.listdir(BASE_DIR) if f.endswith('.csv')])
+def inspect_monthly_details(base_dir, price_method="close", max_workers=MAX_WORKERS):
+    bt = engine.run(base_dir, CALENDAR, price_method=price_method, max_workers=max_workers)
 
-    for file_name in files:
-        month_str = file_name.split('_')[1].replace('월', '')
-        select_month = int(month_str)
-
-        invest_month = select_month + 1
-        year = INVEST_YEAR
-        if invest_month > 12:
-            invest_month = 1
-            year += 1
-
-        start_date = f"{year}-{invest_month:02d}-01"
-        if invest_month == 12:
-            end_date = f"{year}-12-31"
-        else:
-            end_date = (datetime(year, invest_month + 1, 1) - timedelta(days=1)).strftime('%Y-%m-%d')
+    for idx, r in enumerate(bt.rebalances):
+        select_month, year, invest_month, _, _ = get_invest_period(r.file)
 
         print(f"\n{'=' * 95}")
         print(f"  {year}년 {invest_month:02d}월 투자 종목 성적표 "
               f"(선정: {select_month}월 | {PRICE_LABEL[price_method]})")
         print(f"{'=' * 95}")
 
-        df = pd.read_csv(os.path.join(BASE_DIR, file_name))
-        df['티커'] = df['티커'].astype(str).str.zfill(6)
-
-        w_equal = calc_equal_weight(df)
-        w_score = calc_score_weight(df)
+        df = bt.selections[idx]
+        w_equal, w_score = bt.stock_weights[idx]
+        rets = bt.stock_rets[idx]
+        counts = bt.stock_counts[idx]
 
         total_ew = 0
         total_sw = 0
@@ -112,18 +49,20 @@ def inspect_monthly_details(price_method="close"):
         print(f"  {'-' * 89}")
 
         for i, (_, row) in enumerate(df.iterrows()):
-            ret = get_stock_detail_returns(row['티커'], start_date, end_date, method=price_method)
+            if counts[i] < 2:
+                print(f"    [경고] {row['티커']}: 데이터 부족")
+            ret = rets[i]
 
-            contrib_ew = ret * w_equal.iloc[i]
-            contrib_sw = ret * w_score.iloc[i]
+            contrib_ew = ret * w_equal[i]
+            contrib_sw = ret * w_score[i]
             total_ew += contrib_ew
             total_sw += contrib_sw
 
-            mark = "**" if '중복' in str(row['비고']) else "  "
+            mark = "**" if row['중복'] else "  "
             print(f"  {mark} {row['종목명']:12s} | "
                   f"{ret * 100:+7.2f}% | "
-                  f"{w_equal.iloc[i] * 100:6.1f}% {contrib_ew * 100:+7.3f}% | "
-                  f"{w_score.iloc[i] * 100:6.1f}% {contrib_sw * 100:+7.3f}% | "
+                  f"{w_equal[i] * 100:6.1f}% {contrib_ew * 100:+7.3f}% | "
+                  f"{w_score[i] * 100:6.1f}% {contrib_sw * 100:+7.3f}% | "
                   f"{row['비고']}")
 
         print(f"  {'-' * 89}")
@@ -132,4 +71,16 @@ def inspect_monthly_details(price_method="close"):
 
 
 if __name__ == "__main__":
-    inspect_monthly_details(price_method=args.price)
+    parser = argparse.ArgumentParser(
+        description="수급 강도 전략 - 월별 종목 상세 검증 (동일비중 vs 점수비중)")
+    parser.add_argument("--cap", type=str, default="5천억", choices=["2천억", "5천억"],
+                        help="분석할 시총 폴더 선택")
+    parser.add_argument("--price", type=str, default="close",
+                        choices=["open", "close", "vwap"],
+                        help="수익률 계산 기준 (open/close/vwap)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help="주가 동시 조회 스레드 수 (1이면 순차 조회)")
+    args = parser.parse_args()
+
+    inspect_monthly_details(os.path.join(DATA_DIR, f"시총{args.cap}"),
+                            price_method=args.price, max_workers=args.workers)
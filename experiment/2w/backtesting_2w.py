@@ -1,219 +1,228 @@
 import pandas as pd
 import numpy as np
-import FinanceDataReader as fdr
-import matplotlib.pyplot as plt
 import os
+import sys
+from datetime import date
 from collections import OrderedDict
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../common"))
+from engine import (
+    PRICE_LABEL, KOSPI, KOSPI200, KOACT, TRADING_DAYS, MAX_WORKERS,
+    GROUP_PERIODS, GROUP_CALENDAR,
+    calc_sharpe, calc_mdd, calc_ir, calc_win_rate, calc_mdd_nav,
+    chain_segments,
+)
+from artifacts import file_hash, group_cache_path, save_artifact, load_artifact, backtest_digest
+from profiler import Profiler, activate, stage, count
+import engine
+
 # ─────────────────────────────────────────────
 # 상수
 # ─────────────────────────────────────────────
-PRICE_LABEL = {"open": "시가(Open)", "close": "종가(Close)", "vwap": "VWAP"}
-KOSPI = "KS11"
-KOSPI200 = "KS200"
-KOACT = "441800"  # KoAct 배당성장액티브 ETF
-RISK_FREE_ANNUAL = 0.03
-
-GROUP_PERIODS = OrderedDict({
-    "g1":  ("2025-01-02", "2025-01-15"),
-    "g2":  ("2025-01-16", "2025-02-04"),
-    "g3":  ("2025-02-05", "2025-02-18"),
-    "g4":  ("2025-02-19", "2025-03-06"),
-    "g5":  ("2025-03-07", "2025-03-20"),
-    "g6":  ("2025-03-21", "2025-04-03"),
-    "g7":  ("2025-04-04", "2025-04-17"),
-    "g8":  ("2025-04-18", "2025-05-02"),
-    "g9":  ("2025-05-07", "2025-05-20"),
-    "g10": ("2025-05-21", "2025-06-02"),
-    "g11": ("2025-06-04", "2025-06-18"),
-    "g12": ("2025-06-19", "2025-07-02"),
-    "g13": ("2025-07-03", "2025-07-16"),
-    "g14": ("2025-07-17", "2025-07-30"),
-    "g15": ("2025-07-31", "2025-08-13"),
-    "g16": ("2025-08-14", "2025-08-29"),
-    "g17": ("2025-09-01", "2025-09-12"),
-    "g18": ("2025-09-15", "2025-09-26"),
-    "g19": ("2025-09-29", "2025-10-17"),
-    "g20": ("2025-10-20", "2025-10-31"),
-    "g21": ("2025-11-03", "2025-11-14"),
-    "g22": ("2025-11-17", "2025-11-28"),
-    "g23": ("2025-12-01", "2025-12-12"),
-    "g24": ("2025-12-15", "2025-12-29"),
-    "g25": ("2025-12-30", "2026-01-14"),
-})
+BENCHMARKS = OrderedDict([("KOSPI", KOSPI), ("KOSPI200", KOSPI200), ("KoAct", KOACT)])
 
+# 2주 기간표·캘린더는 데이터 준비 스크립트와 함께 쓰므로 engine에 둔다 (g26 이후는 KRX 거래일로 생성)
 GROUP_KEYS = list(GROUP_PERIODS.keys())
+CALENDAR = GROUP_CALENDAR
 
 
 def get_invest_period(select_group):
     """GN 선정 → GN+1 기간 반환"""
-    idx = GROUP_KEYS.index(select_group)
-    if idx + 1 >= len(GROUP_KEYS):
-        return None
-    next_group = GROUP_KEYS[idx + 1]
-    return next_group, GROUP_PERIODS[next_group]
+    return CALENDAR.invest_period(select_group)
 
 
 # ─────────────────────────────────────────────
-# 가격 및 수익률 계산
+# 성과 요약
 # ─────────────────────────────────────────────
-def _get_entry_exit_price(df_price, method):
-    if method == "open":
-        return df_price['Open'].iloc[0], df_price['Open'].iloc[-1]
-    elif method == "close":
-        return df_price['Close'].iloc[0], df_price['Close'].iloc[-1]
-    elif method == "vwap":
-        typical = (df_price['High'] + df_price['Low'] + df_price['Close']) / 3
-        return typical.iloc[0], typical.iloc[-1]
-    raise ValueError(f"지원하지 않는 가격 기준: {method}")
-
-
-def get_period_return(ticker, start, end, method="close"):
-    try:
-        df = fdr.DataReader(ticker, start, end)
-        if df.empty or len(df) < 2:
-            return 0
-        entry, exit_ = _get_entry_exit_price(df, method)
-        if entry == 0:
-            return 0
-        return (exit_ / entry) - 1
-    except Exception:
-        return 0
+def summarize(label, s_ret, b_ret):
+    """기간 수익률 기준 지표 (연율화는 리밸런싱 주기 기준: 2주 → 연 26기간)"""
+    n = len(s_ret)
+    per_year = CALENDAR.periods_per_year
+    return {
+        '전략명': label,
+        '총 수익률': f"{((1+s_ret).prod()-1)*100:.2f}%",
+        'KOSPI 총 수익률': f"{((1+b_ret).prod()-1)*100:.2f}%",
+        '초과수익률': f"{(((1+s_ret).prod()-1)-((1+b_ret).prod()-1))*100:.2f}%p",
+        f'샤프 비율 (연율화, 연 {per_year}기간)': f"{calc_sharpe(s_ret, periods_per_year=per_year):.3f}",
+        'MDD': f"{calc_mdd(s_ret)*100:.2f}%",
+        '정보 비율 (IR)': f"{calc_ir(s_ret, b_ret, periods_per_year=per_year):.3f}",
+        '승률 (vs KOSPI)': f"{calc_win_rate(s_ret, b_ret)*100:.1f}% ({(s_ret>b_ret).sum()}/{n})",
+        '기간 평균 수익률': f"{s_ret.mean()*100:.2f}%",
+        '기간 변동성': f"{s_ret.std()*100:.2f}%",
+    }
+
+
+def summarize_daily(label, s_nav, b_nav):
+    """일별 NAV 기준 지표 (연율화는 연 252거래일 기준)"""
+    s_ret = s_nav.pct_change().dropna()
+    b_ret = b_nav.pct_change().dropna()
+    return {
+        '전략명': label,
+        '샤프 비율 (일별, 연율화)': f"{calc_sharpe(s_ret, periods_per_year=TRADING_DAYS):.3f}",
+        'MDD (일별)': f"{calc_mdd_nav(s_nav)*100:.2f}%",
+        '정보 비율 (일별, IR)': f"{calc_ir(s_ret, b_ret, periods_per_year=TRADING_DAYS):.3f}",
+        '일간 변동성 (연율화)': f"{s_ret.std()*np.sqrt(TRADING_DAYS)*100:.2f}%",
+    }
 
 
 # ─────────────────────────────────────────────
-# 비중 계산
+# 주가 사전 조회 계획
 # ─────────────────────────────────────────────
-def calc_equal_weight(df):
-    scores = df['비고'].apply(lambda x: 2 if '중복' in str(x) else 1)
-    return scores / scores.sum()
+def list_groups(base_dir):
+    return [f.replace('.csv', '') for f in CALENDAR.files(base_dir)]
 
 
-def calc_score_weight(df):
-    scores = df['최종점수'].clip(lower=0)
-    total = scores.sum()
-    if total == 0:
-        return pd.Series(1 / len(df), index=df.index)
-    return scores / total
+def plan_price_ranges(base_dirs):
+    """
+    base_dirs: CSV 폴더 경로 (하나 또는 여러 개)
+    전체 그룹의 종목·벤치마크 합집합에 대해 {ticker: (최소 시작일, 최대 종료일)} 반환
+    """
+    return engine.plan_price_ranges(base_dirs, CALENDAR, BENCHMARKS.values())
 
 
 # ─────────────────────────────────────────────
-# 성과 지표
+# 그룹별 결과 (증분 계산 단위)
 # ─────────────────────────────────────────────
-def calc_sharpe(rets, rf_annual=RISK_FREE_ANNUAL, periods_per_year=26):
-    rf_period = (1 + rf_annual) ** (1 / periods_per_year) - 1
-    excess = rets - rf_period
-    return (excess.mean() / excess.std()) * np.sqrt(periods_per_year) if excess.std() != 0 else 0
-
+def _group_records(bt, daily):
+    """엔진 결과를 투자 기간 1개 단위 레코드로 분리 (기간 수익률 행 · 보유종목 상세 · 일별 NAV 구간)"""
+    segments = bt.daily_segments() if daily else [None] * len(bt.rebalances)
+    records = []
+    for idx, r in enumerate(bt.rebalances):
+        row = {
+            'SelectGroup': r.select,
+            'InvestGroup': r.invest,
+            'Period': f"{r.start}~{r.end}",
+            'StartDate': r.start,
+            'EndDate': r.end,
+            'EqualWeight': bt.port_rets[0, idx],
+            'ScoreWeight': bt.port_rets[1, idx],
+            'KOSPI': bt.bench_rets[idx, 0],
+            'KOSPI200': bt.bench_rets[idx, 1],
+            'KoAct': bt.bench_rets[idx, 2],
+        }
+
+        # 보유종목 상세
+        w_eq, w_sc = bt.stock_weights[idx]
+        detail = bt.selections[idx][['티커', '종목명', '최종점수', '비고']].copy()
+        detail['w_equal'] = w_eq
+        detail['w_score'] = w_sc
+        detail['return'] = bt.stock_rets[idx]
+        detail['contrib_eq'] = detail['return'] * detail['w_equal']
+        detail['contrib_sc'] = detail['return'] * detail['w_score']
 
-def calc_mdd(rets):
-    cum = (1 + rets).cumprod()
-    return ((cum - cum.cummax()) / cum.cummax()).min()
+        segment = None
+        if segments[idx] is not None:
+            segment = segments[idx][['EqualWeight', 'ScoreWeight', 'KOSPI', 'KOSPI200', 'KoAct']]
+        records.append({'row': row, 'detail': detail, 'daily': segment, 'complete': bt.panel.complete})
+    return records
 
 
-def calc_ir(s_ret, b_ret, periods_per_year=26):
-    excess = s_ret - b_ret
-    return (excess.mean() / excess.std()) * np.sqrt(periods_per_year) if excess.std() != 0 else 0
+def _cache_digest(base_dir, r):
+    """선정 CSV 내용 + 투자 기간이 같을 때만 저장된 그룹 결과를 재사용"""
+    return f"{file_hash(os.path.join(base_dir, r.file))}|{r.start}|{r.end}"
 
 
-def calc_win_rate(s_ret, b_ret):
-    return (s_ret > b_ret).sum() / len(s_ret) if len(s_ret) > 0 else 0
+def artifact_digest(base_dir, calendar=None):
+    """결과 아티팩트 입력 해시 (선정 CSV + 마지막 투자 기간 종료일, 진행 중이면 오늘 날짜 포함)"""
+    rebalances = engine.schedule(base_dir, calendar or CALENDAR)
+    return backtest_digest(base_dir, rebalances[-1].end if rebalances else "")
 
 
-def summarize(label, s_ret, b_ret):
-    n = len(s_ret)
-    return {
-        '전략명': label,
-        '총 수익률': f"{((1+s_ret).prod()-1)*100:.2f}%",
-        'KOSPI 총 수익률': f"{((1+b_ret).prod()-1)*100:.2f}%",
-        '초과수익률': f"{(((1+s_ret).prod()-1)-((1+b_ret).prod()-1))*100:.2f}%p",
-        f'샤프 비율 (연율화, {n}기간)': f"{calc_sharpe(s_ret, periods_per_year=n):.3f}",
-        'MDD': f"{calc_mdd(s_ret)*100:.2f}%",
-        '정보 비율 (IR)': f"{calc_ir(s_ret, b_ret, periods_per_year=n):.3f}",
-        '승률 (vs KOSPI)': f"{calc_win_rate(s_ret, b_ret)*100:.1f}% ({(s_ret>b_ret).sum()}/{n})",
-        '기간 평균 수익률': f"{s_ret.mean()*100:.2f}%",
-        '기간 변동성': f"{s_ret.std()*100:.2f}%",
-    }
+def _incremental_records(base_dir, calendar, price_method, progress_callback, max_workers, daily):
+    """
+    저장된 그룹별 결과를 불러오고, 없거나 선정 CSV가 바뀐 그룹만 엔진으로 계산한 뒤 저장.
+    종료일이 오늘 이후인 진행 중 기간은 주가가 계속 바뀌므로 저장하지 않는다.
+    일부 주가 조회에 실패한 실행의 결과도 저장하지 않는다.
+    """
+    today = date.today().isoformat()
+    records, pending = {}, []
+    with stage("group_cache.load"):
+        for r in engine.schedule(base_dir, calendar):
+            digest = _cache_digest(base_dir, r)
+            path = group_cache_path(base_dir, r.invest, price_method)
+            record = load_artifact(path, digest)
+            if record is not None and (not daily or record['daily'] is not None):
+                records[r.invest] = record
+            else:
+                pending.append((r, path, digest))
+    count("group_cache.hits", len(records))
+    count("group_cache.misses", len(pending))
+
+    if pending:
+        bt = engine.run(base_dir, calendar, price_method=price_method, benchmarks=BENCHMARKS,
+                        max_workers=max_workers, progress_callback=progress_callback,
+                        files=[r.file for r, _, _ in pending])
+        with stage("group_records"):
+            new_records = _group_records(bt, daily)
+        with stage("group_cache.save"):
+            for (r, path, digest), record in zip(pending, new_records):
+                records[r.invest] = record
+                # 일부 주가 조회에 실패한 행렬로 계산한 결과는 저장하지 않아 다음 실행에서 다시 계산
+                if r.end < today and bt.panel.complete:
+                    save_artifact(path, record, digest)
+    elif progress_callback:
+        progress_callback(1, 1, "저장된 그룹 결과 사용")
+
+    return [records[key] for key in calendar.keys if key in records]
 
 
 # ─────────────────────────────────────────────
 # 백테스팅 메인 (base_dir을 매개변수로 받음)
 # ─────────────────────────────────────────────
-def run_backtest(base_dir, price_method="close", progress_callback=None):
+def run_backtest(base_dir, price_method="close", progress_callback=None, max_workers=MAX_WORKERS,
+                 daily=False, incremental=False, calendar=None, profiler=None):
     """
     base_dir: CSV 폴더 경로 (예: './data/rebal_2w_csv/외국인단독')
     progress_callback: (current, total, msg) -> None  (Streamlit 등에서 진행률 표시용)
+    max_workers: 주가 동시 조회 스레드 수 (1이면 순차 조회)
+    daily: True이면 전략·벤치마크별 일별 NAV(DataFrame, 첫 매수일 1.0)를 6번째 값으로 함께 반환
+    incremental: True이면 그룹별 결과를 data/file/group_cache/에 저장해 두고
+                 새로 추가되거나 선정 CSV가 바뀐 그룹만 계산 (누적 수익률·지표는 전체로 다시 산출)
+    calendar: 리밸런싱 캘린더 (기본 CALENDAR, 다른 주기·기간표로 실행할 때 GroupCalendar 지정)
+    profiler: profiler.Profiler를 넘기면 구간별 시간·조회 수·캐시 적중을 기록 (to_dict / write_trace)
+    결과표의 res.attrs['complete']는 모든 주가를 받아 계산했으면 True (일부 조회 실패 시 False, 저장하지 말 것)
     """
-    available_csvs = sorted(
-        [f.replace('.csv', '') for f in os.listdir(base_dir) if f.endswith('.csv')],
-        key=lambda x: int(x.replace('g', ''))
-    )
-
-    investable = [g for g in available_csvs if get_invest_period(g) is not None]
-    total = len(investable)
-    results = []
-    holdings_map = {}
-
-    for idx, select_group in enumerate(investable):
-        invest_group, (start_date, end_date) = get_invest_period(select_group)
-
-        csv_path = os.path.join(base_dir, f"{select_group}.csv")
-        df = pd.read_csv(csv_path)
-        df['티커'] = df['티커'].astype(str).str.zfill(6)
-
-        w_eq = calc_equal_weight(df)
-        w_sc = calc_score_weight(df)
-
-        if progress_callback:
-            progress_callback(idx + 1, total,
-                              f"{select_group} → {invest_group} ({start_date}~{end_date})")
-
-        stock_rets = []
-        for _, row in df.iterrows():
-            ret = get_period_return(row['티커'], start_date, end_date, method=price_method)
-            stock_rets.append(ret)
-        stock_rets_arr = np.array(stock_rets)
-
-        ret_eq = np.dot(stock_rets_arr, w_eq.values)
-        ret_sc = np.dot(stock_rets_arr, w_sc.values)
-        ret_bench = get_period_return(KOSPI, start_date, end_date, method=price_method)
-        ret_k200 = get_period_return(KOSPI200, start_date, end_date, method=price_method)
-        ret_koact = get_period_return(KOACT, start_date, end_date, method=price_method)
-
-        results.append({
-            'SelectGroup': select_group,
-            'InvestGroup': invest_group,
-            'Period': f"{start_date}~{end_date}",
-            'StartDate': start_date,
-            'EndDate': end_date,
-            'EqualWeight': ret_eq,
-            'ScoreWeight': ret_sc,
-            'KOSPI': ret_bench,
-            'KOSPI200': ret_k200,
-            'KoAct': ret_koact,
-        })
-
-        # 보유종목 상세 저장
-        detail = df[['티커', '종목명', '최종점수', '비고']].copy()
-        detail['w_equal'] = w_eq.values
-        detail['w_score'] = w_sc.values
-        detail['return'] = stock_rets
-        detail['contrib_eq'] = detail['return'] * detail['w_equal']
-        detail['contrib_sc'] = detail['return'] * detail['w_score']
-        holdings_map[invest_group] = detail
+    with activate(profiler):
+        return _run_backtest(base_dir, price_method, progress_callback, max_workers, daily, incremental,
+                             calendar or CALENDAR)
+
+
+def _run_backtest(base_dir, price_method, progress_callback, max_workers, daily, incremental, calendar):
+    if incremental:
+        records = _incremental_records(base_dir, calendar, price_method, progress_callback, max_workers,
+                                       daily)
+    else:
+        bt = engine.run(base_dir, calendar, price_method=price_method, benchmarks=BENCHMARKS,
+                        max_workers=max_workers, progress_callback=progress_callback)
+        with stage("group_records"):
+            records = _group_records(bt, daily)
 
-    res = pd.DataFrame(results)
+    with stage("summary"):
+        return _summarize_records(records, daily)
+
+
+def _summarize_records(records, daily):
+    """그룹별 레코드 → run_backtest 반환값 (누적 수익률·지표·보유종목·일별 NAV)"""
+    res = pd.DataFrame([rec['row'] for rec in records])
+    holdings_map = {rec['row']['InvestGroup']: rec['detail'] for rec in records}
     res['EW_Cum'] = (1 + res['EqualWeight']).cumprod() - 1
     res['SW_Cum'] = (1 + res['ScoreWeight']).cumprod() - 1
     res['KOSPI_Cum'] = (1 + res['KOSPI']).cumprod() - 1
     res['K200_Cum'] = (1 + res['KOSPI200']).cumprod() - 1
     res['KoAct_Cum'] = (1 + res['KoAct']).cumprod() - 1
+    # 일부 주가 조회에 실패한 행렬로 계산한 그룹이 있으면 False (저장된 그룹 결과는 항상 완전)
+    res.attrs['complete'] = all(rec.get('complete', True) for rec in records)
 
     m_eq = summarize("동일비중 (중복2배)", res['EqualWeight'], res['KOSPI'])
     m_sc = summarize("점수비중 (최종점수)", res['ScoreWeight'], res['KOSPI'])
     m_ka = summarize("KoAct 배당성장", res['KoAct'], res['KOSPI'])
 
-    return res, m_eq, m_sc, m_ka, holdings_map
+    if not daily:
+        return res, m_eq, m_sc, m_ka, holdings_map
+
+    # 기간 내에서는 비중이 가격에 따라 변동(매수 후 보유)하는 일별 NAV (기간별 구간을 이어 붙임)
+    daily_df = chain_segments([rec['daily'] for rec in records])
+    return res, m_eq, m_sc, m_ka, holdings_map, daily_df
 
 
 # ─────────────────────────────────────────────
@@ -221,6 +230,7 @@ def run_backtest(base_dir, price_method="close", progress_callback=None):
 # ─────────────────────────────────────────────
 if __name__ == "__main__":
     import argparse
+    import matplotlib.pyplot as plt
 
     parser = argparse.ArgumentParser(
         description="2주 리밸런싱 백테스팅 - 동일비중 vs 점수비중 비교")
@@ -230,10 +240,21 @@ if __name__ == "__main__":
     parser.add_argument("--price", type=str, default="close",
                         choices=["open", "close", "vwap"],
                         help="수익률 계산 기준")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help="주가 동시 조회 스레드 수 (1이면 순차 조회)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="저장된 그룹별 결과를 재사용하고 새로 추가·변경된 그룹만 계산")
+    parser.add_argument("--profile", action="store_true",
+                        help="구간별 실행 시간·주가 조회 수·캐시 적중을 출력")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="Chrome trace(JSON) 저장 경로 (--profile 포함, chrome://tracing에서 열기)")
     args = parser.parse_args()
 
     base_dir = os.path.join(os.path.dirname(__file__), f"../../data/file/rebal_2w_csv/{args.signal}")
-    result, m_eq, m_sc, m_ka, _ = run_backtest(base_dir, price_method=args.price)
+    prof = Profiler() if args.profile or args.trace else None
+    result, m_eq, m_sc, m_ka, _, daily_nav_df = run_backtest(
+        base_dir, price_method=args.price, max_workers=args.workers, daily=True,
+        incremental=args.incremental, profiler=prof)
 
     print("\n" + "=" * 100)
     print(f"  2주 리밸런싱 백테스팅 성과 보고서")
@@ -261,8 +282,21 @@ if __name__ == "__main__":
     print("  " + "-" * 96)
     for key in list(m_eq.keys())[1:]:
         print(f"  {key:34s} | {m_eq[key]:>18s} | {m_sc[key]:>18s} | {m_ka[key]:>18s}")
+    print("  " + "-" * 96)
+    d_eq = summarize_daily("동일비중 (중복2배)", daily_nav_df['EqualWeight'], daily_nav_df['KOSPI'])
+    d_sc = summarize_daily("점수비중 (최종점수)", daily_nav_df['ScoreWeight'], daily_nav_df['KOSPI'])
+    d_ka = summarize_daily("KoAct 배당성장", daily_nav_df['KoAct'], daily_nav_df['KOSPI'])
+    for key in list(d_eq.keys())[1:]:
+        print(f"  {key:34s} | {d_eq[key]:>18s} | {d_sc[key]:>18s} | {d_ka[key]:>18s}")
     print("-" * 120)
 
+    if prof is not None:
+        print("\n  [ 실행 구간별 시간 ]")
+        print(prof.format())
+        if args.trace:
+            prof.write_trace(args.trace)
+            print(f"  trace 저장: {args.trace}")
+
     plt.rcParams['font.family'] = 'Malgun Gothic'
     plt.rcParams['axes.unicode_minus'] = False
     fig, axes = plt.subplots(2, 1, figsize=(16, 10), gridspec_kw={'height_ratios': [3, 1]})
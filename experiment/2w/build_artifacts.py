@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../common"))
+from artifacts import artifact_path, save_artifact, load_artifact
+from backtesting_2w import run_backtest, artifact_digest, MAX_WORKERS
+
+# ─────────────────────────────────────────────
+# 2주 리밸런싱 백테스트 아티팩트 빌드
+# 사용법: python experiment/2w/build_artifacts.py --signal 외국인단독 기관포함 --price open close vwap
+#
+# (시그널 × 가격 기준)별로 run_backtest 결과를 data/file/artifacts/에 저장한다.
+# 입력 CSV가 바뀌지 않은 조합은 건너뛰고, 바뀐 조합도 새로 추가·변경된 그룹만 계산한다
+# (--force로 전체 그룹 강제 재계산).
+# 진행 중 기간(종료일이 오늘 이후)이 있으면 입력 해시에 날짜가 포함되어 매일 다시 빌드된다.
+# 일부 주가 조회에 실패한 결과는 저장하지 않아 다음 빌드에서 다시 계산한다.
+# ─────────────────────────────────────────────
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../data/file/rebal_2w_csv")
+SIGNALS = ["외국인단독", "기관포함"]
+PRICE_METHODS = ["open", "close", "vwap"]
+
+
+def build_artifact(signal, price_method, max_workers=MAX_WORKERS, force=False):
+    """조합 1개 빌드 → (저장 경로, 새로 계산했는지 여부). 일부 주가 조회에 실패하면 저장하지 않고 경로는 None"""
+    base_dir = os.path.join(DATA_DIR, signal)
+    digest = artifact_digest(base_dir)
+    path = artifact_path(signal, price_method)
+    if not force and load_artifact(path, digest) is not None:
+        return path, False
+
+    res, m_eq, m_sc, m_ka, holdings, daily = run_backtest(
+        base_dir, price_method=price_method, max_workers=max_workers, daily=True,
+        incremental=not force)
+    if not res.attrs.get("complete", True):
+        return None, True
+    save_artifact(path, {
+        "result": res, "m_eq": m_eq, "m_sc": m_sc, "m_ka": m_ka,
+        "holdings": holdings, "daily": daily,
+    }, digest)
+    return path, True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="2주 리밸런싱 백테스트 결과 아티팩트 빌드")
+    parser.add_argument("--signal", nargs="+", default=SIGNALS, choices=SIGNALS,
+                        help="시그널 유형")
+    parser.add_argument("--price", nargs="+", default=PRICE_METHODS, choices=PRICE_METHODS,
+                        help="수익률 계산 기준")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help="주가 동시 조회 스레드 수 (1이면 순차 조회)")
+    parser.add_argument("--force", action="store_true",
+                        help="입력이 바뀌지 않았어도 다시 계산")
+    args = parser.parse_args()
+
+    for signal in args.signal:
+        for price in args.price:
+            t = time.perf_counter()
+            path, built = build_artifact(signal, price, max_workers=args.workers, force=args.force)
+            if path is None:
+                print(f"  [{signal} / {price}] 일부 주가 조회 실패로 저장하지 않음 (다음 빌드에서 다시 계산)")
+                continue
+            status = f"빌드 완료 ({time.perf_counter() - t:.1f}초)" if built else "최신 상태 (건너뜀)"
+            print(f"  [{signal} / {price}] {status} → {os.path.relpath(path)}")
@@ -0,0 +1,98 @@
+import os
+import pickle
+import hashlib
+from datetime import date, datetime
+
+# ─────────────────────────────────────────────
+# 백테스트 결과 아티팩트
+# 오프라인 빌드에서 계산한 결과를 (포맷 버전 + 입력 해시)와 함께 저장해 두고,
+# 대시보드는 입력이 바뀌지 않았으면 백테스트 없이 바로 불러온다.
+# ─────────────────────────────────────────────
+_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTIFACT_DIR = os.environ.get(
+    "BACKTEST_ARTIFACT_DIR", os.path.join(_DIR, "../../data/file/artifacts"))
+
+# 그룹별 증분 결과 저장 위치
+GROUP_CACHE_DIR = os.environ.get(
+    "GROUP_CACHE_DIR", os.path.join(_DIR, "../../data/file/group_cache"))
+
+# 저장 내용의 구조나 계산 방식이 바뀌면 올려서 기존 아티팩트를 무효화
+# (2: KRX 거래일로 생성한 진행 중 기간 포함, 기간 지표 연율화를 리밸런싱 주기 기준으로 변경)
+ARTIFACT_VERSION = 2
+
+
+def file_hash(path):
+    """파일 1개의 내용 SHA-256"""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def input_hash(base_dir):
+    """폴더 내 CSV 파일명과 내용 전체의 SHA-256 (파일 추가·수정·삭제 시 달라짐)"""
+    h = hashlib.sha256()
+    for name in sorted(f for f in os.listdir(base_dir) if f.endswith('.csv')):
+        h.update(name.encode("utf-8") + b"\0")
+        with open(os.path.join(base_dir, name), "rb") as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    return h.hexdigest()
+
+
+def backtest_digest(base_dir, last_end):
+    """
+    백테스트 결과 아티팩트의 입력 해시: 선정 CSV 해시 + 마지막 투자 기간 종료일.
+    종료일이 오늘 이후인 진행 중 기간이 있으면 오늘 날짜(주가 기준일)를 섞어
+    빌드 당일의 주가로 계산한 진행 중 수익률을 다음 날 재사용하지 않음
+    """
+    last_end = str(last_end)
+    today = date.today().isoformat()
+    parts = [input_hash(base_dir), last_end]
+    if last_end >= today:
+        parts.append(f"asof={today}")
+    return "|".join(parts)
+
+
+def artifact_path(name, price_method):
+    """name: 시그널 유형 등 결과 구분자 (예: '외국인단독')"""
+    return os.path.join(ARTIFACT_DIR, f"backtest_{name}_{price_method}.pkl")
+
+
+def group_cache_path(base_dir, group, price_method):
+    """그룹 1개의 증분 결과 경로 (선정 CSV 폴더명별로 구분)"""
+    folder = os.path.basename(os.path.normpath(base_dir))
+    return os.path.join(GROUP_CACHE_DIR, folder, f"{group}_{price_method}.pkl")
+
+
+def save_artifact(path, payload, digest):
+    """payload를 버전·입력 해시와 함께 저장 (임시 파일에 쓴 뒤 교체)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    record = {
+        "version": ARTIFACT_VERSION,
+        "input_hash": digest,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "payload": payload,
+    }
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def read_artifact(path):
+    """저장된 레코드 전체 반환 (없거나 읽을 수 없으면 None)"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def load_artifact(path, digest):
+    """버전과 입력 해시가 모두 일치할 때만 payload 반환, 아니면 None"""
+    record = read_artifact(path)
+    if record is None:
+        return None
+    if record.get("version") != ARTIFACT_VERSION or record.get("input_hash") != digest:
+        return None
+    return record["payload"]
@@ -0,0 +1,544 @@
+import os
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from price_store import load_ohlcv, prefetch, union_ranges, MAX_WORKERS
+from price_panel import covered, panel_for, period_returns, period_counts, daily_nav
+from profiler import stage, count
+import signal_store
+
+# ─────────────────────────────────────────────
+# 백테스트 엔진 (월별 / 2주 리밸런싱 공용)
+# 리밸런싱 캘린더만 바꿔 끼우면 선정 CSV 폴더 → 주가 사전 조회 → 가격 행렬 →
+# 기간별 수익률·비중 행렬 계산까지 같은 경로로 실행된다.
+# ─────────────────────────────────────────────
+PRICE_LABEL = {"open": "시가(Open)", "close": "종가(Close)", "vwap": "VWAP"}
+KOSPI = "KS11"
+KOSPI200 = "KS200"
+KOACT = "441800"  # KoAct 배당성장액티브 ETF
+RISK_FREE_ANNUAL = 0.03
+TRADING_DAYS = 252
+
+# file: 선정 CSV 파일명 / select: 선정 시점 / invest: 투자 기간 라벨 / start, end: 투자 기간
+Rebalance = namedtuple("Rebalance", ["file", "select", "invest", "start", "end"])
+
+
+# ─────────────────────────────────────────────
+# 리밸런싱 캘린더
+# ─────────────────────────────────────────────
+# 리밸런싱 주기 → 기간당 거래일 수 ("1m"은 달력 월 단위), 연간 기간 수
+REBALANCE_DAYS = {"1w": 5, "2w": 10}
+PERIODS_PER_YEAR = {"1w": 52, "2w": 26, "1m": 12}
+
+
+def generate_periods(dates, start, freq="2w", prefix="g", first=1):
+    """
+    거래일 배열 → 리밸런싱 기간표 OrderedDict {f"{prefix}{n}": (시작일, 종료일)}
+    freq: "1w"/"2w" (5/10거래일 단위), "1m" (달력 월의 첫~마지막 거래일), 정수 N (N거래일 단위)
+    start 이후 첫 거래일부터 나누며, 거래일이 모자란 마지막 기간은 있는 데까지 (진행 중 기간)
+    """
+    d = np.asarray(dates, dtype="datetime64[D]")
+    d = d[d >= np.datetime64(start, "D")]
+    if freq == "1m":
+        months = d.astype("datetime64[M]").astype(np.int64)
+        cuts = np.flatnonzero(np.diff(months)) + 1
+    else:
+        n = REBALANCE_DAYS.get(freq, freq)
+        if not isinstance(n, (int, np.integer)) or n < 1:
+            raise ValueError(f"지원하지 않는 리밸런싱 주기: {freq}")
+        cuts = np.arange(n, len(d), n)
+    chunks = np.split(d, cuts) if len(d) else []
+    return OrderedDict((f"{prefix}{first + i}", (str(c[0]), str(c[-1]))) for i, c in enumerate(chunks))
+
+
+class GroupCalendar:
+    """
+    그룹 리밸런싱 (기본 2주): gN.csv 선정 → gN+1 기간 투자
+
+    periods: 기록된 기간표. trading_days((start, end) → 거래일 배열)를 주면 마지막 그룹
+    다음 기간이 필요할 때 기록된 마지막 종료일 이후 거래일로 freq 단위 기간을 생성해 덧붙인다
+    (마지막 그룹 선정분도 평가되고, 기간표를 손으로 늘리지 않아도 됨).
+    """
+
+    def __init__(self, periods, freq="2w", trading_days=None, prefix="g"):
+        self.freq = freq
+        self.periods_per_year = PERIODS_PER_YEAR.get(freq) or round(TRADING_DAYS / freq)
+        self.trading_days = trading_days
+        self.prefix = prefix
+        self._recorded = OrderedDict(periods)
+        self._extended_until = None
+        self._pinned = False
+        # 그룹 → 순번, 기간 경계 배열 (조회마다 문자열 파싱·선형 탐색을 하지 않도록 미리 계산).
+        # periods/keys는 확장 시 제자리에서 갱신되므로 다른 모듈이 참조를 들고 있어도 된다
+        self.periods = OrderedDict()
+        self.keys = []
+        self._set(self._recorded)
+
+    @classmethod
+    def generate(cls, dates, start, freq="2w", **kwargs):
+        """거래일 배열로 start부터 freq 단위 기간표를 만들어 캘린더 생성"""
+        prefix = kwargs.get("prefix", "g")
+        return cls(generate_periods(dates, start, freq, prefix), freq=freq, **kwargs)
+
+    def _set(self, periods):
+        self.periods.clear()
+        self.periods.update(periods)
+        self.keys[:] = list(self.periods)
+        self._index = {g: i for i, g in enumerate(self.keys)}
+        self.starts = np.array([p[0] for p in self.periods.values()], dtype="datetime64[D]")
+        self.ends = np.array([p[1] for p in self.periods.values()], dtype="datetime64[D]")
+
+    def extend(self, until=None):
+        """
+        기록된 기간표 뒤에 until(기본 어제)까지의 거래일로 기간을 생성해 덧붙임 → 생성된 기간 수.
+        기본 범위를 어제까지로 두어 price_store에 저장된 확정 일봉만으로 만들어지므로
+        (오늘 일봉은 저장되지 않음) 프로세스마다 거래일을 새로 조회하지 않는다.
+        진행 중인 마지막 기간은 그 범위의 마지막 거래일까지로 만들어지며, 날짜가 바뀌면 다시 생성된다.
+        거래일 조회에 실패하면 이전에 생성한 기간표를 유지하고, pin()으로 고정된 기간표는 다시 만들지 않는다
+        """
+        until = until or (date.today() - timedelta(days=1)).isoformat()
+        if (self.trading_days is None or not self._recorded or self._pinned
+                or self._extended_until == until):
+            return len(self.periods) - len(self._recorded)
+        self._extended_until = until
+        start = str(np.datetime64(list(self._recorded.values())[-1][1], "D") + 1)
+        if start > until:
+            return len(self.periods) - len(self._recorded)
+        try:
+            dates = self.trading_days(start, until)
+        except Exception as e:
+            dropped = self.keys[-1]
+            print(f"  [경고] 거래일 조회 실패로 기간표를 확장하지 못했습니다 "
+                  f"({dropped} 이후 기간 없음, {dropped} 선정분은 평가에서 제외): {e}")
+            return len(self.periods) - len(self._recorded)
+        added = generate_periods(dates, start, self.freq, self.prefix, first=len(self._recorded) + 1)
+        self._set(OrderedDict(list(self._recorded.items()) + list(added.items())))
+        return len(added)
+
+    def extension(self):
+        """extend()로 생성해 덧붙인 기간 {그룹: (시작일, 종료일)} (다른 프로세스에 넘겨 pin()으로 재사용)"""
+        return OrderedDict(list(self.periods.items())[len(self._recorded):])
+
+    def pin(self, extension):
+        """생성된 기간을 extension으로 고정 (이후 extend()는 거래일을 조회하지 않음)"""
+        self._set(OrderedDict(list(self._recorded.items()) + list(extension.items())))
+        self._pinned = True
+
+    def position(self, group):
+        """그룹 → 순번 (기간표에 없으면 KeyError)"""
+        return self._index[group]
+
+    def next_group(self, group):
+        """다음 그룹 (마지막 그룹이면 None)"""
+        idx = self._index[group] + 1
+        return self.keys[idx] if idx < len(self.keys) else None
+
+    def group_of(self, d):
+        """날짜 1개 → 속한 그룹 (없으면 None)"""
+        d = np.datetime64(pd.Timestamp(d).date(), "D")
+        idx = int(np.searchsorted(self.starts, d, side="right")) - 1
+        return self.keys[idx] if idx >= 0 and d <= self.ends[idx] else None
+
+    def files(self, base_dir):
+        groups = sorted(
+            [f.replace('.csv', '') for f in os.listdir(base_dir) if f.endswith('.csv')],
+            key=lambda x: int(x.replace(self.prefix, ''))
+        )
+        return [f"{g}.csv" for g in groups]
+
+    def select_date(self, file_name):
+        """선정 기준일 (그룹 종료일), 기간표(확장 포함)에 없으면 None"""
+        group = file_name.replace('.csv', '')
+        if group not in self.periods:
+            self.extend()
+        period = self.periods.get(group)
+        return period[1] if period else None
+
+    def invest_period(self, select_group):
+        """GN 선정 → (GN+1, (시작일, 종료일)). 다음 기간을 만들 수 없으면 None"""
+        next_group = self.next_group(select_group) if select_group in self._index else None
+        if next_group is None and self.extend():
+            next_group = self.next_group(select_group) if select_group in self._index else None
+        if next_group is None:
+            return None
+        return next_group, self.periods[next_group]
+
+    def rebalance(self, file_name):
+        select_group = file_name.replace('.csv', '')
+        info = self.invest_period(select_group)
+        if info is None:
+            return None
+        invest_group, (start_date, end_date) = info
+        return Rebalance(file_name, select_group, invest_group, start_date, end_date)
+
+
+class MonthlyCalendar:
+    """월별 리밸런싱: 'YYYY_MM월_...csv' 선정 → 다음 달 1일~말일 투자"""
+    periods_per_year = 12
+    freq = "1m"
+
+    def __init__(self, invest_year):
+        self.invest_year = invest_year
+
+    def files(self, base_dir):
+        return sorted([f for f in os.listdir(base_dir) if f.endswith('.csv')])
+
+    def select_date(self, file_name):
+        """선정 기준일 (선정 월 말일), 파일명 형식이 다르면 None"""
+        try:
+            year, month = file_name.split('_')[:2]
+            month_end = pd.Timestamp(int(year), int(month.replace('월', '')), 1) + pd.offsets.MonthEnd(0)
+        except Exception:
+            return None
+        return month_end.strftime('%Y-%m-%d')
+
+    def invest_period(self, file_name):
+        """파일명에서 선정 월 추출 → (선정 월, 투자 연도, 투자 월, 시작일, 종료일). 형식이 다르면 None"""
+        try:
+            month_str = file_name.split('_')[1].replace('월', '')
+            select_month = int(month_str)
+        except Exception:
+            return None
+
+        invest_month = select_month + 1
+        year = self.invest_year
+        if invest_month > 12:
+            invest_month = 1
+            year += 1
+
+        start_date = f"{year}-{invest_month:02d}-01"
+        if invest_month == 12:
+            end_date = f"{year}-12-31"
+        else:
+            end_date = (datetime(year, invest_month + 1, 1) - timedelta(days=1)).strftime('%Y-%m-%d')
+        return select_month, year, invest_month, start_date, end_date
+
+    def rebalance(self, file_name):
+        info = self.invest_period(file_name)
+        if info is None:
+            return None
+        select_month, year, invest_month, start_date, end_date = info
+        return Rebalance(file_name, select_month, f"{year}-{invest_month:02d}", start_date, end_date)
+
+
+def krx_trading_days(start, end):
+    """[start, end] KRX 거래일 배열 (KOSPI 지수 일봉 날짜 기준, price_store 캐시 경유)"""
+    return load_ohlcv(KOSPI, start, end).index.values.astype("datetime64[D]")
+
+
+# 기록된 2주 기간표 (g1~g25 선정 CSV가 만들어진 기간). 수작업 기간이라 휴장일 처리 차이로
+# 일부 기간은 10거래일이 아니므로 생성 규칙으로 대체하지 않고 그대로 둔다.
+# g26 이후는 GROUP_CALENDAR가 KRX 거래일로 10거래일씩 생성한다 (GROUP_CALENDAR.periods / GROUP_CALENDAR.keys).
+# 백테스트(backtesting_2w.CALENDAR)와 데이터 준비 스크립트(data/code/)가 같은 객체를 쓴다
+GROUP_PERIODS = OrderedDict({
+    "g1":  ("2025-01-02", "2025-01-15"),
+    "g2":  ("2025-01-16", "2025-02-04"),
+    "g3":  ("2025-02-05", "2025-02-18"),
+    "g4":  ("2025-02-19", "2025-03-06"),
+    "g5":  ("2025-03-07", "2025-03-20"),
+    "g6":  ("2025-03-21", "2025-04-03"),
+    "g7":  ("2025-04-04", "2025-04-17"),
+    "g8":  ("2025-04-18", "2025-05-02"),
+    "g9":  ("2025-05-07", "2025-05-20"),
+    "g10": ("2025-05-21", "2025-06-02"),
+    "g11": ("2025-06-04", "2025-06-18"),
+    "g12": ("2025-06-19", "2025-07-02"),
+    "g13": ("2025-07-03", "2025-07-16"),
+    "g14": ("2025-07-17", "2025-07-30"),
+    "g15": ("2025-07-31", "2025-08-13"),
+    "g16": ("2025-08-14", "2025-08-29"),
+    "g17": ("2025-09-01", "2025-09-12"),
+    "g18": ("2025-09-15", "2025-09-26"),
+    "g19": ("2025-09-29", "2025-10-17"),
+    "g20": ("2025-10-20", "2025-10-31"),
+    "g21": ("2025-11-03", "2025-11-14"),
+    "g22": ("2025-11-17", "2025-11-28"),
+    "g23": ("2025-12-01", "2025-12-12"),
+    "g24": ("2025-12-15", "2025-12-29"),
+    "g25": ("2025-12-30", "2026-01-14"),
+})
+
+GROUP_CALENDAR = GroupCalendar(GROUP_PERIODS, freq="2w", trading_days=krx_trading_days)
+
+
+def schedule(base_dir, calendar):
+    """폴더 내 선정 파일 중 투자 기간이 있는 것만 시간순 Rebalance 목록으로 반환"""
+    rebalances = []
+    for file_name in calendar.files(base_dir):
+        rebalance = calendar.rebalance(file_name)
+        if rebalance is not None:
+            rebalances.append(rebalance)
+    return rebalances
+
+
+# ─────────────────────────────────────────────
+# 선정 데이터 및 주가 사전 조회 계획
+# ─────────────────────────────────────────────
+def load_selection(path):
+    """선정 CSV 1개 → 타입이 고정된 DataFrame (signal_store.coerce, 형식 오류 시 ValueError)"""
+    return signal_store.read_csv(path)
+
+
+def load_selections(base_dir, calendar, files):
+    """
+    files 순서대로 선정 DataFrame 목록.
+    시그널 저장소(signal_store)가 원본 CSV와 일치하면 한 번의 조회로 읽고, 아니면 CSV를 파일별로 읽는다.
+    """
+    with stage("selections"):
+        stored = signal_store.read_selections(base_dir, calendar, files)
+        if stored is not None:
+            count("selections.store_files", len(files))
+            return stored
+        count("selections.csv_files", len(files))
+        return [load_selection(os.path.join(base_dir, f)) for f in files]
+
+
+def plan_price_ranges(base_dirs, calendar, benchmarks=()):
+    """
+    base_dirs: 선정 CSV 폴더 경로 (하나 또는 여러 개)
+    전체 기간의 종목·벤치마크 합집합에 대해 {ticker: (최소 시작일, 최대 종료일)} 반환
+    """
+    if isinstance(base_dirs, str):
+        base_dirs = [base_dirs]
+
+    requests = []
+    for base_dir in base_dirs:
+        rebalances = schedule(base_dir, calendar)
+        selections = load_selections(base_dir, calendar, [r.file for r in rebalances])
+        for r, df in zip(rebalances, selections):
+            requests.append((df['티커'].tolist() + list(benchmarks), r.start, r.end))
+    return union_ranges(requests)
+
+
+# ─────────────────────────────────────────────
+# 가격 및 수익률 계산 (단일 종목)
+# ─────────────────────────────────────────────
+def get_entry_exit_price(df_price, method):
+    if method == "open":
+        return df_price['Open'].iloc[0], df_price['Open'].iloc[-1]
+    elif method == "close":
+        return df_price['Close'].iloc[0], df_price['Close'].iloc[-1]
+    elif method == "vwap":
+        typical = (df_price['High'] + df_price['Low'] + df_price['Close']) / 3
+        return typical.iloc[0], typical.iloc[-1]
+    raise ValueError(f"지원하지 않는 가격 기준: {method}")
+
+
+def get_period_return(ticker, start, end, method="close"):
+    try:
+        df = load_ohlcv(ticker, start, end)
+        if df.empty or len(df) < 2:
+            return 0
+        entry, exit_ = get_entry_exit_price(df, method)
+        if entry == 0:
+            return 0
+        return (exit_ / entry) - 1
+    except Exception:
+        return 0
+
+
+# ─────────────────────────────────────────────
+# 비중 계산
+# ─────────────────────────────────────────────
+def calc_equal_weight(df):
+    """동일비중 + 중복 2배 (중복 여부는 로드 시 비고에서 도출한 bool 컬럼)"""
+    scores = pd.Series(np.where(df['중복'], 2.0, 1.0), index=df.index)
+    return scores / scores.sum()
+
+
+def calc_score_weight(df):
+    """최종점수 정규화 비중 (음수 점수는 0)"""
+    scores = df['최종점수'].astype(np.float64).clip(lower=0)
+    total = scores.sum()
+    if total == 0:
+        return pd.Series(1 / len(df), index=df.index)
+    return scores / total
+
+
+WEIGHTINGS = OrderedDict([("EqualWeight", calc_equal_weight), ("ScoreWeight", calc_score_weight)])
+
+
+# ─────────────────────────────────────────────
+# 성과 지표
+# ─────────────────────────────────────────────
+def calc_sharpe(rets, rf_annual=RISK_FREE_ANNUAL, periods_per_year=26):
+    rf_period = (1 + rf_annual) ** (1 / periods_per_year) - 1
+    excess = rets - rf_period
+    return (excess.mean() / excess.std()) * np.sqrt(periods_per_year) if excess.std() != 0 else 0
+
+
+def calc_mdd(rets):
+    cum = (1 + rets).cumprod()
+    return ((cum - cum.cummax()) / cum.cummax()).min()
+
+
+def calc_ir(s_ret, b_ret, periods_per_year=26):
+    excess = s_ret - b_ret
+    return (excess.mean() / excess.std()) * np.sqrt(periods_per_year) if excess.std() != 0 else 0
+
+
+def calc_win_rate(s_ret, b_ret):
+    return (s_ret > b_ret).sum() / len(s_ret) if len(s_ret) > 0 else 0
+
+
+def calc_mdd_nav(nav):
+    """일별 NAV 시계열 기반 MDD (기간 내 낙폭 포함)"""
+    nav = np.asarray(nav, dtype=float)
+    if nav.size == 0:
+        return 0
+    return (nav / np.maximum.accumulate(nav) - 1).min()
+
+
+# ─────────────────────────────────────────────
+# 백테스트 실행
+# ─────────────────────────────────────────────
+class Backtest:
+    """
+    run() 결과. 기간 축(G)은 rebalances 순서를 따른다.
+      port_rets:   (S, G) 비중 방식별 포트폴리오 수익률
+      bench_rets:  (G, B) 벤치마크별 기간 수익률
+      stock_rets:  기간별 보유종목 수익률 배열 목록 (선정 CSV 행 순서)
+      stock_weights: 기간별 (S, n) 보유종목 비중 배열 목록
+      stock_counts:  기간별 보유종목 유효 가격 일수 배열 목록 (2 미만이면 수익률 0 처리)
+    """
+
+    def __init__(self, rebalances, selections, panel, price_method, weight_names, weights,
+                 benchmarks, port_rets, bench_rets, stock_rets, stock_weights, stock_counts):
+        self.rebalances = rebalances
+        self.selections = selections
+        self.panel = panel
+        self.price_method = price_method
+        self.weight_names = weight_names
+        self.weights = weights
+        self.benchmarks = benchmarks
+        self.port_rets = port_rets
+        self.bench_rets = bench_rets
+        self.stock_rets = stock_rets
+        self.stock_weights = stock_weights
+        self.stock_counts = stock_counts
+
+    def returns(self):
+        """기간별 전략·벤치마크 수익률 DataFrame (열: 비중 방식명 + 벤치마크명)"""
+        data = OrderedDict()
+        for s, name in enumerate(self.weight_names):
+            data[name] = self.port_rets[s]
+        for b, name in enumerate(self.benchmarks):
+            data[name] = self.bench_rets[:, b]
+        return pd.DataFrame(data)
+
+    def daily(self):
+        """
+        기간 시작일에 매수 후 보유(비중은 가격에 따라 변동)하는 일별 NAV DataFrame
+        (열: 비중 방식명 + 벤치마크명, 첫 매수일 1.0)
+        """
+        n_groups, n_tickers = len(self.rebalances), len(self.panel.tickers)
+        bench_weights = np.zeros((len(self.benchmarks), n_groups, n_tickers))
+        for k, col in enumerate(self.panel.columns(list(self.benchmarks.values()))):
+            bench_weights[k, :, col] = 1.0
+        with stage("daily_nav"):
+            dates, nav = daily_nav(self.panel, [(r.start, r.end) for r in self.rebalances],
+                                   np.concatenate([self.weights, bench_weights]), method=self.price_method)
+        return pd.DataFrame(nav.T, index=pd.DatetimeIndex(dates, name='Date'),
+                            columns=list(self.weight_names) + list(self.benchmarks))
+
+    def daily_segments(self):
+        """
+        daily()를 기간별로 나눠 각 기간 시작 NAV를 1.0으로 맞춘 목록 (rebalances 순서).
+        기간별로 따로 저장해 두었다가 chain_segments로 다시 이어 붙일 수 있다.
+        """
+        nav = self.daily()
+        lo, hi = self.panel.bounds([(r.start, r.end) for r in self.rebalances])
+        segments, pos, prev_end = [], 0, None
+        for n in np.maximum(hi - lo, 0):
+            seg = nav.iloc[pos:pos + n]
+            segments.append(seg / prev_end if prev_end is not None else seg.copy())
+            if n:
+                prev_end = seg.iloc[-1]
+            pos += n
+        return segments
+
+
+def chain_segments(segments):
+    """기간별 일별 NAV 구간(시작 1.0 기준)을 이어 붙여 전체 일별 NAV로 변환"""
+    navs, base = [], None
+    for seg in segments:
+        if seg.empty:
+            continue
+        navs.append(seg if base is None else seg * base)
+        base = navs[-1].iloc[-1]
+    if not navs:
+        return pd.DataFrame(columns=segments[0].columns if segments else None)
+    return pd.concat(navs)
+
+
+def run(base_dir, calendar, price_method="close", weightings=WEIGHTINGS, benchmarks=None,
+        max_workers=MAX_WORKERS, progress_callback=None, files=None):
+    """
+    base_dir: 선정 CSV 폴더 경로
+    calendar: GroupCalendar / MonthlyCalendar
+    files: 계산할 선정 파일명 목록 (None이면 폴더 전체, 증분 계산 시 새로 추가·변경된 파일만 지정)
+    weightings: {비중 방식명: df -> 비중 Series}
+    benchmarks: {벤치마크명: 티커}
+    progress_callback: (current, total, msg) -> None  (주가 조회 티커 수 + 기간 수 기준으로 단조 증가)
+    """
+    if price_method not in PRICE_LABEL:
+        raise ValueError(f"지원하지 않는 가격 기준: {price_method}")
+    benchmarks = OrderedDict(benchmarks or {})
+    rebalances = schedule(base_dir, calendar)
+    if files is not None:
+        rebalances = [r for r in rebalances if r.file in set(files)]
+    if not rebalances:
+        raise ValueError(f"투자 기간이 있는 선정 파일이 없습니다: {base_dir}")
+    selections = load_selections(base_dir, calendar, [r.file for r in rebalances])
+
+    # 티커별로 전체 투자 기간을 한 번에 조회한 뒤, 기간별 계산은 가격 행렬에서 잘라 사용
+    ranges = union_ranges([(df['티커'].tolist() + list(benchmarks.values()), r.start, r.end)
+                           for r, df in zip(rebalances, selections)])
+    n_fetch = len(ranges)
+    total = n_fetch + len(rebalances)
+    # attach()로 연결된 공용(메모리 매핑) 행렬이 필요한 구간을 포함하면 티커별 주가를 읽지 않고 그대로 사용
+    if covered(ranges):
+        count("prefetch.skipped")
+        if progress_callback:
+            progress_callback(n_fetch, total, "공용 가격 행렬 사용")
+    else:
+        with stage("prefetch"):
+            prefetch(ranges, max_workers=max_workers,
+                     progress_callback=(lambda i, _, msg: progress_callback(i, total, msg))
+                     if progress_callback else None)
+
+    with stage("price_panel"):
+        panel = panel_for(ranges)
+    count("panel.cells", len(panel.dates) * len(panel.tickers))
+    periods = [(r.start, r.end) for r in rebalances]
+    with stage("period_returns"):
+        period_rets = period_returns(panel, periods, method=price_method)
+        counts = period_counts(panel, periods, method=price_method)
+
+    # 기간별 보유종목을 (기간 행, 종목 열) 좌표로 펼쳐 비중 방식별 (S, G, T) 행렬로 구성
+    with stage("weights"):
+        weight_names = list(weightings)
+        w_parts = [np.vstack([np.asarray(fn(df), dtype=float) for fn in weightings.values()])
+                   for df in selections]
+        g_rows = np.concatenate([np.full(len(df), i) for i, df in enumerate(selections)])
+        t_cols = np.concatenate([panel.columns(df['티커']) for df in selections])
+        weights = np.zeros((len(weight_names), len(rebalances), len(panel.tickers)))
+        flat_w = np.hstack(w_parts)
+        for s in range(len(weight_names)):
+            np.add.at(weights[s], (g_rows, t_cols), flat_w[s])
+
+        port_rets = np.einsum('sgt,gt->sg', weights, period_rets)
+        bench_rets = period_rets[:, panel.columns(list(benchmarks.values()))]
+        splits = np.cumsum([len(df) for df in selections])[:-1]
+        stock_rets = np.split(period_rets[g_rows, t_cols], splits)
+        stock_counts = np.split(counts[g_rows, t_cols], splits)
+
+    if progress_callback:
+        for idx, r in enumerate(rebalances):
+            progress_callback(n_fetch + idx + 1, total, f"{r.select} → {r.invest} ({r.start}~{r.end})")
+
+    return Backtest(rebalances, selections, panel, price_method, weight_names, weights, benchmarks,
+                    port_rets, bench_rets, stock_rets, w_parts, stock_counts)
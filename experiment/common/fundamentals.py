@@ -0,0 +1,163 @@
+import os
+import json
+import zlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+# ─────────────────────────────────────────────
+# 종목 재무 요약 (PER · PBR · ROE · 시가총액 · 배당수익률)
+# 보유 종목 목록을 한 번에 받아 스레드 풀로 동시에 조회하고,
+# 결과 스냅샷과 종목별 상장 시장 접미사(.KS 코스피 / .KQ 코스닥)를 JSON으로 저장한다.
+# - 스냅샷은 MAX_AGE_HOURS 동안 재사용 (지나면 다시 조회, 실패 시 이전 스냅샷 사용)
+# - 접미사는 한 번 확인되면 계속 기억해 .KS 실패 후 .KQ 재조회를 반복하지 않는다
+#
+# 조회기는 info(symbol) → dict 메서드만 있으면 된다 (YFinanceProvider, 오프라인용 StubProvider).
+# FUNDAMENTALS_PROVIDER=stub 이면 대시보드도 네트워크 없이 StubProvider를 쓴다.
+# ─────────────────────────────────────────────
+_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_PATH = os.environ.get(
+    "FUNDAMENTALS_PATH", os.path.join(_DIR, "../../data/file/fundamentals/snapshot.json"))
+MAX_AGE_HOURS = float(os.environ.get("FUNDAMENTALS_MAX_AGE_HOURS", 24))
+MAX_WORKERS = int(os.environ.get("FUNDAMENTALS_WORKERS", 4))
+RETRY_MINUTES = 10   # 조회 실패 종목은 이 시간 동안 다시 조회하지 않음 (화면 재실행마다 재시도 방지)
+
+SUFFIXES = ("KS", "KQ")
+
+
+class YFinanceProvider:
+    def info(self, symbol):
+        import yfinance as yf   # 재무 조회 시점에만 불러옴
+        return yf.Ticker(symbol).info
+
+
+class StubProvider:
+    """
+    오프라인 조회기. infos({심볼: info dict})가 없으면 종목코드에서 고정 시드로 만든 값을 돌려주며,
+    코드에 따라 .KS 또는 .KQ 한쪽에서만 시가총액이 나오도록 해 접미사 확인 경로도 재현한다
+    """
+
+    def __init__(self, infos=None):
+        self.infos = infos
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def info(self, symbol):
+        with self._lock:
+            self.calls += 1
+        if self.infos is not None:
+            return dict(self.infos.get(symbol, {}))
+        code, suffix = symbol.split(".")
+        seed = zlib.crc32(code.encode())
+        if SUFFIXES[seed % 2] != suffix:
+            return {}
+        return {
+            "trailingPE": 5 + seed % 300 / 10,
+            "priceToBook": 0.3 + seed % 40 / 10,
+            "returnOnEquity": (seed % 250) / 1000,
+            "marketCap": (seed % 5000 + 100) * 1e9,
+            "dividendYield": (seed % 60) / 1000,
+        }
+
+
+def default_provider():
+    return StubProvider() if os.environ.get("FUNDAMENTALS_PROVIDER") == "stub" else YFinanceProvider()
+
+
+def summarize(info):
+    """yfinance info → 재무 요약 (없는 값은 0, 시가총액은 조 원, 비율은 %)"""
+    return {
+        "PER": info.get("forwardPE") or info.get("trailingPE") or 0,
+        "PBR": info.get("priceToBook") or 0,
+        "ROE": info.get("returnOnEquity", 0) * 100 if info.get("returnOnEquity") else 0,
+        "시가총액": (info.get("marketCap") or 0) / 1e12,
+        "배당수익률": (info.get("dividendYield") or 0) * 100,
+    }
+
+
+class FundamentalsService:
+    def __init__(self, provider=None, path=STORE_PATH, max_age_hours=MAX_AGE_HOURS, max_workers=MAX_WORKERS):
+        self.provider = provider or default_provider()
+        self.path = path
+        self.max_age = timedelta(hours=max_age_hours)
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._snapshots = {}   # 종목코드 → {"fetched": ISO 시각, "data": 요약}
+        self._suffix = {}      # 종목코드 → "KS" | "KQ"
+        self._failed = {}      # 종목코드 → 마지막 조회 실패 시각 (메모리에만 보관)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return   # 깨진 파일은 무시하고 새로 조회
+        self._snapshots = saved.get("snapshots", {})
+        self._suffix = saved.get("suffix", {})
+
+    def _save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with self._lock:
+            payload = {"suffix": dict(self._suffix), "snapshots": dict(self._snapshots)}
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def _fresh(self, code, now):
+        snap = self._snapshots.get(code)
+        return snap is not None and now - datetime.fromisoformat(snap["fetched"]) <= self.max_age
+
+    def _fetch(self, code):
+        """
+        (접미사, 요약) 반환. 기억된 접미사를 먼저 조회하고 (이전 상장 시장),
+        시가총액이 없거나 조회가 실패하면 다른 시장을 시도. 모두 실패하면 (None, None)
+        """
+        known = self._suffix.get(code)
+        order = [known] + [s for s in SUFFIXES if s != known] if known else SUFFIXES
+        for suffix in order:
+            try:
+                info = self.provider.info(f"{code}.{suffix}")
+            except Exception:
+                continue   # 한 시장 조회 실패 → 다음 시장 시도
+            if info.get("marketCap"):
+                return suffix, summarize(info)
+        return None, None
+
+    def get_many(self, codes):
+        """
+        {종목코드: 요약 또는 None}. 신선한 스냅샷은 그대로 쓰고 나머지만 동시에 조회하며,
+        조회 실패 종목은 이전 스냅샷(있으면)을 돌려준다
+        """
+        codes = list(dict.fromkeys(str(c).zfill(6) for c in codes))
+        now = datetime.now()
+        retry_after = now - timedelta(minutes=RETRY_MINUTES)
+        stale = [c for c in codes
+                 if not self._fresh(c, now) and self._failed.get(c, datetime.min) < retry_after]
+        if stale:
+            def fetch(code):
+                try:
+                    return code, self._fetch(code)
+                except Exception:
+                    return code, (None, None)
+
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(stale)))) as pool:
+                results = list(pool.map(fetch, stale))
+            stamp = now.isoformat(timespec="seconds")
+            with self._lock:
+                for code, (suffix, data) in results:
+                    if data is None:
+                        self._failed[code] = now
+                        continue
+                    self._failed.pop(code, None)
+                    self._suffix[code] = suffix
+                    self._snapshots[code] = {"fetched": stamp, "data": data}
+            if any(data is not None for _, (_, data) in results):
+                self._save()
+        return {c: (self._snapshots[c]["data"] if c in self._snapshots else None) for c in codes}
+
+    def get(self, code):
+        return self.get_many([code])[str(code).zfill(6)]
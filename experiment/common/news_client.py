@@ -0,0 +1,152 @@
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from datetime import datetime, timedelta
+
+# ─────────────────────────────────────────────
+# 네이버 뉴스 검색 클라이언트
+# 연결을 재사용하는 requests.Session(연결 풀 + 타임아웃)으로 조회하고,
+# (검색어, 건수)별 결과를 조회 시각과 함께 JSON으로 저장해 MAX_AGE_MINUTES 동안 재사용한다.
+#
+# get()은 저장된 결과를 바로 돌려주고, 오래됐거나 없으면 백그라운드 스레드에서 갱신한다
+# (wait초까지만 기다림). 대시보드는 갱신을 기다리지 않고 화면을 그린다.
+# refresh_async()로 보유 종목 여러 개를 한 번에 미리 조회할 수 있다.
+#
+# 검색 API 주소는 NAVER_NEWS_URL 환경 변수(또는 base_url 인자)로 바꿀 수 있다 (로컬 모의 서버 등).
+# ─────────────────────────────────────────────
+_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_URL = os.environ.get("NAVER_NEWS_URL", "https://openapi.naver.com/v1/search/news.json")
+CACHE_PATH = os.environ.get("NEWS_CACHE_PATH", os.path.join(_DIR, "../../data/file/news_cache/news.json"))
+MAX_AGE_MINUTES = float(os.environ.get("NEWS_MAX_AGE_MINUTES", 10))
+TIMEOUT = (3.0, 5.0)   # (연결, 응답) 초
+MAX_WORKERS = 4
+
+
+def _key(query, display):
+    return f"{query}|{display}"
+
+
+class NewsClient:
+    def __init__(self, client_id, client_secret, base_url=BASE_URL, path=CACHE_PATH,
+                 max_age_minutes=MAX_AGE_MINUTES, timeout=TIMEOUT, max_workers=MAX_WORKERS):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.base_url = base_url
+        self.path = path
+        self.max_age = timedelta(minutes=max_age_minutes)
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._session = None
+        self._pool = None
+        self._pending = {}   # 키 → 진행 중인 갱신 Future
+        self._errors = {}    # 키 → 마지막 갱신 실패 사유 (성공하면 지움, 메모리에만 보관)
+        self._cache = self._load()
+
+    # ── 저장소 ──
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}   # 깨진 파일은 무시하고 새로 조회
+
+    def _save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            payload = dict(self._cache)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def _fresh(self, key, now=None):
+        entry = self._cache.get(key)
+        now = now or datetime.now()
+        return entry is not None and now - datetime.fromisoformat(entry["fetched"]) <= self.max_age
+
+    # ── 조회 ──
+    def session(self):
+        """검색 API 전용 세션 (스레드 수만큼 연결 유지). requests는 첫 조회 시점에 불러옴"""
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                s.headers.update({"X-Naver-Client-Id": self.client_id,
+                                  "X-Naver-Client-Secret": self.client_secret})
+                self._session = s
+            return self._session
+
+    def fetch(self, query, display=5):
+        """검색 API를 바로 호출해 결과를 저장하고 items 반환 (실패 시 예외)"""
+        res = self.session().get(self.base_url, params={"query": query, "display": display, "sort": "sim"},
+                                 timeout=self.timeout)
+        res.raise_for_status()
+        items = res.json().get("items", [])
+        with self._lock:
+            self._cache[_key(query, display)] = {
+                "fetched": datetime.now().isoformat(timespec="seconds"), "items": items}
+            self._errors.pop(_key(query, display), None)
+        self._save()
+        return items
+
+    def _fetch_quietly(self, query, display):
+        try:
+            return self.fetch(query, display)
+        except Exception as e:
+            with self._lock:
+                self._errors[_key(query, display)] = f"{type(e).__name__}: {e}"
+            return None   # 실패 시 기존 결과 유지
+        finally:
+            with self._lock:
+                self._pending.pop(_key(query, display), None)
+
+    def refresh_async(self, queries, display=5):
+        """오래됐거나 없는 검색어만 백그라운드로 조회 (이미 진행 중인 검색어는 건너뜀). {검색어: Future}"""
+        now = datetime.now()
+        futures = {}
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="news")
+            for query in dict.fromkeys(queries):
+                key = _key(query, display)
+                if key in self._pending:
+                    futures[query] = self._pending[key]
+                elif not self._fresh(key, now):
+                    futures[query] = self._pending[key] = self._pool.submit(self._fetch_quietly, query, display)
+        return futures
+
+    def cached(self, query, display=5):
+        """(저장된 items 또는 None, 신선 여부)"""
+        key = _key(query, display)
+        entry = self._cache.get(key)
+        return (entry["items"] if entry else None), self._fresh(key)
+
+    def error(self, query, display=5):
+        """마지막 백그라운드 갱신이 실패했으면 사유, 아니면 None"""
+        with self._lock:
+            return self._errors.get(_key(query, display))
+
+    def get(self, query, display=5, wait=0.0):
+        """
+        저장된 결과를 바로 반환하고 오래됐으면 백그라운드로 갱신.
+        wait초 안에 갱신이 끝나면 새 결과를 반환. (items 또는 None, 신선 여부)
+        """
+        futures = self.refresh_async([query], display)
+        if futures and wait > 0:
+            wait_futures(list(futures.values()), timeout=wait)
+        return self.cached(query, display)
+
+    def get_many(self, queries, display=5, wait=None):
+        """여러 검색어를 동시에 갱신하고 wait초(None이면 끝날 때까지) 기다린 뒤 {검색어: items 또는 None}"""
+        futures = self.refresh_async(queries, display)
+        if futures:
+            wait_futures(list(futures.values()), timeout=wait)
+        return {q: self.cached(q, display)[0] for q in dict.fromkeys(queries)}
@@ -0,0 +1,308 @@
+import os
+import json
+import shutil
+import hashlib
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from price_store import load_ohlcv, prefetch, unfilled, MAX_WORKERS
+
+# ─────────────────────────────────────────────
+# 가격 행렬 (dates × tickers)
+# 전체 기간의 시가/종가/대표가(H+L+C)/3를 하나의 정렬된 float32 행렬로 만들고,
+# 기간 경계 인덱스만으로 모든 종목·기간의 수익률을 한 번에 계산한다.
+#
+# 행렬은 필드별 .npy 파일로 저장한 뒤 np.load(mmap_mode='r')로 열 수 있어,
+# 스윕 작업 프로세스와 Streamlit 서버가 OS 페이지 캐시의 한 벌을 읽기 전용으로 공유한다.
+# 수익률·NAV 계산은 필요한 가격만 골라 float64로 올린 뒤 수행한다.
+# ─────────────────────────────────────────────
+PRICE_FIELD = {"open": "open", "close": "close", "vwap": "typical"}
+FIELDS = ("open", "close", "typical")
+PANEL_DTYPE = np.float32
+
+_DIR = os.path.dirname(os.path.abspath(__file__))
+PANEL_DIR = os.environ.get("PRICE_PANEL_DIR", os.path.join(_DIR, "../../data/file/price_panel"))
+PANEL_KEEP = 8  # 보관할 저장 행렬 수 (오래된 것부터 삭제)
+
+_META = "meta.json"
+_attached = None  # attach()로 연결한 프로세스 공용 행렬
+
+
+class PricePanel:
+    def __init__(self, dates, tickers, fields, ranges=None, complete=True):
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.tickers = list(tickers)
+        self.fields = fields                      # {"open"|"close"|"typical": ndarray (D, T)}
+        self.ranges = ranges or {}                # {ticker: (start, end)} 행렬을 만든 조회 구간
+        self.complete = complete                  # 모든 티커·구간을 조회했으면 True (일부 실패 시 해당 날짜만 NaN)
+        self._col = {t: i for i, t in enumerate(self.tickers)}
+
+    def columns(self, tickers):
+        """티커 목록 → 열 인덱스 배열"""
+        return np.array([self._col[t] for t in tickers], dtype=np.int64)
+
+    def covers(self, ranges):
+        """ranges({ticker: (start, end)})의 모든 티커·구간이 이 행렬의 조회 구간 안에 있으면 True"""
+        for ticker, (start, end) in ranges.items():
+            have = self.ranges.get(ticker)
+            if have is None or str(start) < have[0] or str(end) > have[1]:
+                return False
+        return True
+
+    def bounds(self, periods):
+        """
+        periods: [(start, end), ...]
+        각 기간의 [lo, hi) 행 범위 반환 (정렬된 날짜에 대한 searchsorted)
+        """
+        starts = np.array([p[0] for p in periods], dtype="datetime64[D]")
+        ends = np.array([p[1] for p in periods], dtype="datetime64[D]")
+        lo = np.searchsorted(self.dates, starts, side="left")
+        hi = np.searchsorted(self.dates, ends, side="right")
+        return lo, hi
+
+
+def build_price_panel(ranges):
+    """
+    ranges: {ticker: (start, end)}  티커별 필요 구간 (price_store.union_ranges 결과)
+    티커별 일봉을 날짜 합집합 기준으로 정렬해 (D, T) 행렬로 변환. 구간 밖이나 데이터가 없는 칸은 NaN.
+    일부 구간 조회에 실패한 티커는 저장된 데이터로 채우고 받지 못한 날짜만 NaN으로 둔다 (complete=False)
+    """
+    tickers = list(ranges)
+    frames = {}
+    complete = True
+    for ticker, (start, end) in ranges.items():
+        try:
+            frames[ticker] = load_ohlcv(ticker, start, end)
+        except Exception:
+            frames[ticker] = None
+        if frames[ticker] is None or unfilled(ticker):
+            complete = False
+
+    non_empty = [f.index for f in frames.values() if f is not None and not f.empty]
+    dates = pd.DatetimeIndex(sorted(set().union(*non_empty))) if non_empty else pd.DatetimeIndex([])
+
+    fields = {name: np.full((len(dates), len(tickers)), np.nan, dtype=PANEL_DTYPE) for name in FIELDS}
+    for j, ticker in enumerate(tickers):
+        df = frames[ticker]
+        if df is None or df.empty:
+            continue
+        rows = dates.get_indexer(df.index)
+        fields["open"][rows, j] = df['Open'].to_numpy(dtype=float)
+        fields["close"][rows, j] = df['Close'].to_numpy(dtype=float)
+        fields["typical"][rows, j] = ((df['High'] + df['Low'] + df['Close']) / 3).to_numpy(dtype=float)
+
+    return PricePanel(dates.values, tickers, fields,
+                      {t: (str(start), str(end)) for t, (start, end) in ranges.items()}, complete)
+
+
+# ─────────────────────────────────────────────
+# 저장 / 메모리 매핑 공유
+# PANEL_DIR/<구간 해시>/ 에 필드별 .npy + dates.npy + meta.json(티커, 조회 구간)
+# ─────────────────────────────────────────────
+def panel_key(ranges):
+    """
+    조회 구간 목록의 해시. 오늘 이후까지 걸친 구간이 있으면 날짜를 섞어
+    장중·당일 데이터로 만든 행렬을 다음 날 재사용하지 않음
+    """
+    items = sorted((t, str(s), str(e)) for t, (s, e) in ranges.items())
+    today = date.today().isoformat()
+    if any(e >= today for _, _, e in items):
+        items.append(("", "asof", today))
+    return hashlib.sha256(json.dumps(items).encode("utf-8")).hexdigest()[:16]
+
+
+def save_panel(panel, path):
+    """행렬을 path 폴더에 저장 (임시 폴더에 쓴 뒤 교체)"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "dates.npy"), panel.dates)
+    for name in FIELDS:
+        np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(panel.fields[name], dtype=PANEL_DTYPE))
+    with open(os.path.join(tmp, _META), "w", encoding="utf-8") as f:
+        json.dump({"tickers": panel.tickers, "ranges": panel.ranges, "complete": panel.complete}, f,
+                  ensure_ascii=False)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+
+
+def open_panel(path):
+    """저장된 행렬을 읽기 전용 메모리 매핑으로 열기 (없거나 손상되면 None)"""
+    try:
+        with open(os.path.join(path, _META), encoding="utf-8") as f:
+            meta = json.load(f)
+        dates = np.load(os.path.join(path, "dates.npy"))
+        fields = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in FIELDS}
+    except (OSError, ValueError):
+        return None
+    ranges = {t: tuple(r) for t, r in meta["ranges"].items()}
+    return PricePanel(dates, meta["tickers"], fields, ranges, meta.get("complete", True))
+
+
+def _prune(keep=PANEL_KEEP):
+    entries = [os.path.join(PANEL_DIR, d) for d in os.listdir(PANEL_DIR)
+               if not d.endswith(".tmp") and os.path.isdir(os.path.join(PANEL_DIR, d))]
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for path in entries[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def shared_panel_path(ranges, max_workers=MAX_WORKERS):
+    """
+    ranges로 만든 행렬의 저장 경로. 없을 때만 주가를 동시에 조회(prefetch)해 만들어 저장하므로
+    저장된 행렬이 있으면 티커별 캐시를 읽지 않는다.
+    일부 조회에 실패한 행렬은 이 프로세스 전용 경로에 저장해 다음 실행에서 다시 만들도록 함
+    """
+    path = os.path.join(PANEL_DIR, panel_key(ranges))
+    if not os.path.exists(os.path.join(path, _META)):
+        os.makedirs(PANEL_DIR, exist_ok=True)
+        prefetch(ranges, max_workers=max_workers)
+        panel = build_price_panel(ranges)
+        if not panel.complete:
+            path = f"{path}-partial-{os.getpid()}"
+        save_panel(panel, path)
+        _prune()
+    return path
+
+
+def attach(path):
+    """
+    저장된 행렬을 현재 프로세스의 공용 행렬로 연결 (ProcessPoolExecutor initializer로도 사용).
+    이후 engine.run은 필요한 구간을 모두 포함하면 행렬을 새로 만들지 않고 이 행렬을 쓴다
+    """
+    global _attached
+    _attached = open_panel(path)
+    return _attached
+
+
+def detach():
+    global _attached
+    _attached = None
+
+
+def covered(ranges):
+    """연결된 공용 행렬이 ranges를 모두 포함하면 True (이때는 주가를 다시 읽을 필요가 없음)"""
+    return _attached is not None and _attached.covers(ranges)
+
+
+def panel_for(ranges):
+    """연결된 공용 행렬이 ranges를 모두 포함하면 그 행렬, 아니면 새로 만든 행렬"""
+    if covered(ranges):
+        return _attached
+    return build_price_panel(ranges)
+
+
+def _valid_index(px):
+    """
+    prev_valid[i, j]: i행 이하 마지막 유효 행 / next_valid[i, j]: i행 이상 첫 유효 행
+    count[i, j]: i행 미만 유효 가격 개수 (행 수 + 1)
+    """
+    n_dates, n_cols = px.shape
+    valid = ~np.isnan(px)
+    rows = np.arange(n_dates)[:, None]
+    prev_valid = np.maximum.accumulate(np.where(valid, rows, -1), axis=0)
+    next_valid = np.minimum.accumulate(np.where(valid, rows, n_dates)[::-1], axis=0)[::-1]
+    count = np.vstack([np.zeros((1, n_cols), dtype=np.int64), np.cumsum(valid, axis=0)])
+    return prev_valid, next_valid, count
+
+
+def period_counts(panel, periods, method="close"):
+    """모든 기간 × 모든 종목의 유효 가격 일수 (P, T). 2일 미만이면 수익률이 0으로 처리됨"""
+    if method not in PRICE_FIELD:
+        raise ValueError(f"지원하지 않는 가격 기준: {method}")
+    valid = ~np.isnan(panel.fields[PRICE_FIELD[method]])
+    count = np.vstack([np.zeros((1, valid.shape[1]), dtype=np.int64), np.cumsum(valid, axis=0)])
+    if not periods:
+        return np.zeros((0, valid.shape[1]), dtype=np.int64)
+    lo, hi = panel.bounds(periods)
+    return count[hi] - count[lo]
+
+
+def period_returns(panel, periods, method="close"):
+    """
+    모든 기간 × 모든 종목의 수익률 행렬 (P, T) 반환.
+    기간 내 첫 유효 가격에 매수, 마지막 유효 가격에 매도하며
+    유효 일수가 2일 미만이거나 매수가가 0이면 0으로 처리 (get_period_return과 동일 규칙).
+    """
+    if method not in PRICE_FIELD:
+        raise ValueError(f"지원하지 않는 가격 기준: {method}")
+    px = panel.fields[PRICE_FIELD[method]]
+    n_dates, n_tickers = px.shape
+    out = np.zeros((len(periods), n_tickers))
+    if n_dates == 0 or not periods:
+        return out
+
+    prev_valid, next_valid, count = _valid_index(px)
+
+    lo, hi = panel.bounds(periods)
+    n_valid = count[hi] - count[lo]                                    # (P, T)
+    entry_idx = next_valid[np.minimum(lo, n_dates - 1)]                # (P, T)
+    exit_idx = prev_valid[np.maximum(hi - 1, 0)]                       # (P, T)
+
+    ok = n_valid >= 2
+    cols = np.arange(n_tickers)[None, :]
+    entry = px[np.clip(entry_idx, 0, n_dates - 1), cols].astype(np.float64)
+    exit_ = px[np.clip(exit_idx, 0, n_dates - 1), cols].astype(np.float64)
+    ok &= (entry != 0)
+    np.divide(exit_, entry, out=out, where=ok)
+    out[ok] -= 1
+    return out
+
+
+def daily_nav(panel, periods, weights, method="close"):
+    """
+    periods: [(start, end), ...]  (겹치지 않고 시간순)
+    weights: (S, P, T) 전략별·기간별 종목 비중
+    기간 시작일에 비중대로 매수 후 보유(비중은 가격에 따라 변동)하는 일별 NAV를 계산.
+    반환: (dates (N,), nav (S, N))  — 첫 매수일 기준 1.0
+
+    기간 말 NAV 변화율은 period_returns 기반 기간 수익률과 정확히 일치한다.
+    """
+    if method not in PRICE_FIELD:
+        raise ValueError(f"지원하지 않는 가격 기준: {method}")
+    weights = np.asarray(weights, dtype=float)
+    n_strat = weights.shape[0]
+
+    lo, hi = panel.bounds(periods)
+    lengths = np.maximum(hi - lo, 0)
+    if lengths.sum() == 0:
+        return np.array([], dtype="datetime64[D]"), np.ones((n_strat, 0))
+
+    # 보유 비중이 있는 종목 열만 사용
+    held = np.flatnonzero(np.abs(weights).sum(axis=(0, 1)) > 0)
+    px = np.asarray(panel.fields[PRICE_FIELD[method]][:, held], dtype=np.float64)
+    w = weights[:, :, held]
+    n_dates, n_held = px.shape
+
+    prev_valid, next_valid, count = _valid_index(px)
+
+    entry_idx = next_valid[np.minimum(lo, n_dates - 1)]                         # (P, H)
+    ok = (count[hi] - count[lo]) >= 2
+    cols = np.arange(n_held)[None, :]
+    entry_px = px[np.clip(entry_idx, 0, n_dates - 1), cols]
+    ok &= (entry_px != 0)
+
+    # 모든 기간의 일자 행을 이어 붙이고, 각 행이 속한 기간 번호를 기록
+    period_of_row = np.repeat(np.arange(len(periods)), lengths)                # (N,)
+    offsets = np.cumsum(lengths) - lengths
+    row_idx = lo[period_of_row] + np.arange(lengths.sum()) - offsets[period_of_row]
+
+    # 매수일 이전(아직 첫 유효가 전)은 1, 이후는 직전 유효 가격 / 매수가
+    e = entry_idx[period_of_row]                                                # (N, H)
+    last = np.maximum(prev_valid[row_idx], e)
+    rel = px[np.clip(last, 0, n_dates - 1), cols] / np.where(ok, entry_px, 1.0)[period_of_row]
+    rel = np.where(ok[period_of_row] & (prev_valid[row_idx] >= e), rel, 1.0)
+
+    growth = np.einsum('snh,nh->sn', w[:, period_of_row], rel)                 # (S, N)
+    # 보유 종목이 없는 기간은 현금 보유(성장률 1)로 처리
+    growth += (w.sum(axis=2) == 0)[:, period_of_row]
+
+    # 기간별 말일 성장률을 누적해 다음 기간 시작 NAV로 연결
+    ends = np.cumsum(lengths[lengths > 0]) - 1
+    period_growth = np.ones((n_strat, len(periods)))
+    period_growth[:, lengths > 0] = growth[:, ends]
+    start_factor = np.cumprod(np.hstack([np.ones((n_strat, 1)), period_growth[:, :-1]]), axis=1)
+    nav = growth * start_factor[:, period_of_row]
+    return panel.dates[row_idx], nav
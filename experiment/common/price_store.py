@@ -0,0 +1,300 @@
+import os
+import json
+import time
+import threading
+import contextvars
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from profiler import stage, count
+
+# ─────────────────────────────────────────────
+# 로컬 주가 저장소
+# 티커별 Parquet 파일 + 조회 완료 구간(JSON)을 함께 저장하고,
+# 요청 구간 중 비어 있는 앞/뒤 구간만 추가로 내려받는다.
+# ─────────────────────────────────────────────
+_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get(
+    "PRICE_CACHE_DIR", os.path.join(_DIR, "../../data/file/price_cache"))
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume", "Change"]
+
+# 동시 조회 설정
+MAX_WORKERS = int(os.environ.get("PRICE_FETCH_WORKERS", 8))
+MIN_INTERVAL = float(os.environ.get("PRICE_FETCH_INTERVAL", 0.05))  # 동일 호스트 요청 간 최소 간격 (초)
+RETRIES = 3            # 실패 시 재시도 횟수
+BACKOFF = 0.5          # 재시도 대기 시간 (0.5s → 1s → 2s)
+RETRY_COOLDOWN = 60    # 조회에 실패한 티커를 같은 프로세스에서 다시 조회하기까지 대기 (초)
+
+
+def _to_date(d):
+    if isinstance(d, datetime):
+        return d.date()
+    if isinstance(d, date):
+        return d
+    return datetime.strptime(str(d)[:10], "%Y-%m-%d").date()
+
+
+def _paths(ticker):
+    return (os.path.join(CACHE_DIR, f"{ticker}.parquet"),
+            os.path.join(CACHE_DIR, f"{ticker}.json"))
+
+
+def _read_local(ticker):
+    """저장된 (가격 DataFrame, 조회 완료 구간) 반환. 없으면 (None, None)"""
+    data_path, meta_path = _paths(ticker)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None, None
+    with stage("cache.read"):
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        df = pd.read_parquet(data_path)
+    return df, (_to_date(meta["start"]), _to_date(meta["end"]))
+
+
+def _write_local(ticker, df, coverage):
+    """
+    임시 파일에 쓴 뒤 교체하여 중간에 끊겨도 기존 캐시가 깨지지 않도록 함.
+    임시 파일명에 프로세스 ID를 붙여 여러 프로세스가 같은 티커를 써도 파일이 섞이지 않음
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    data_path, meta_path = _paths(ticker)
+    tmp = f".{os.getpid()}.tmp"
+    with stage("cache.write"):
+        df.to_parquet(data_path + tmp)
+        os.replace(data_path + tmp, data_path)
+        with open(meta_path + tmp, "w", encoding="utf-8") as f:
+            json.dump({"start": coverage[0].isoformat(), "end": coverage[1].isoformat()}, f)
+        os.replace(meta_path + tmp, meta_path)
+
+
+def _fetch(ticker, start, end):
+    # 캐시만 읽는 실행에서는 FinanceDataReader를 불러오지 않도록 실제 조회 시점에 import
+    import FinanceDataReader as fdr
+    return fdr.DataReader(ticker, start.isoformat(), end.isoformat())
+
+
+class _RateLimiter:
+    """호스트별로 요청 사이에 최소 간격을 두는 리미터 (스레드 안전)"""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_at = defaultdict(float)
+
+    def wait(self, host):
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next_at[host])
+            self._next_at[host] = at + self.min_interval
+        if at > now:
+            time.sleep(at - now)
+
+
+_limiter = _RateLimiter(MIN_INTERVAL)
+
+
+def _host_of(ticker):
+    """FinanceDataReader 조회 경로 구분: 6자리 종목코드는 네이버, 그 외(지수 등)는 별도 경로"""
+    return "naver" if ticker.isdigit() else "index"
+
+
+def _fetch_with_retry(ticker, start, end):
+    for attempt in range(RETRIES + 1):
+        with stage("fetch.wait"):
+            _limiter.wait(_host_of(ticker))
+        count("provider.calls")
+        try:
+            with stage("fetch"):
+                df = _fetch(ticker, start, end)
+        except Exception:
+            count("provider.errors")
+            if attempt == RETRIES:
+                raise
+            time.sleep(BACKOFF * (2 ** attempt))
+            continue
+        if df is not None:
+            count("provider.rows", len(df))
+            count("provider.bytes", int(df.memory_usage(deep=True).sum()))
+        return df
+
+
+def _missing_ranges(coverage, start, end):
+    """조회 완료 구간 밖에 있는 요청 구간 목록 (기존 구간과 끊기지 않도록 사이 구간 포함)"""
+    if coverage is None:
+        return [(start, end)]
+    cov_start, cov_end = coverage
+    missing = []
+    if start < cov_start:
+        missing.append((start, cov_start - timedelta(days=1)))
+    if end > cov_end:
+        missing.append((cov_end + timedelta(days=1), end))
+    return missing
+
+
+def _merge(frames):
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([], name="Date"))
+    df = pd.concat(frames)
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    return df
+
+
+# 프로세스 내 메모리 캐시: ticker -> (전체 시계열, 조회 완료 구간)
+_MEMORY = {}
+_LOCKS = defaultdict(threading.Lock)
+_UNFILLED = {}   # ticker -> 마지막 조회에서 받지 못한 구간 (저장된 데이터로 대체됨)
+_FAILED_AT = {}  # ticker -> 마지막 조회 실패 시각 (time.monotonic)
+_LOCKS_GUARD = threading.Lock()
+
+
+def _ticker_lock(ticker):
+    with _LOCKS_GUARD:
+        return _LOCKS[ticker]
+
+
+def _ensure(ticker, start, end):
+    """[start, end]를 포함하는 티커 전체 시계열 반환 (메모리 → 디스크 → 네트워크 순)"""
+    with _ticker_lock(ticker):
+        return _ensure_locked(ticker, start, end)
+
+
+def _ensure_locked(ticker, start, end):
+    cached = _MEMORY.get(ticker)
+    if cached is None:
+        cached = _read_local(ticker)
+        count("cache.disk_reads" if cached[0] is not None else "cache.cold")
+    df, coverage = cached
+
+    missing = _missing_ranges(coverage, start, end)
+    count("cache.misses" if missing else "cache.hits")
+    unfilled, error = [], None
+    if missing and time.monotonic() - _FAILED_AT.get(ticker, -RETRY_COOLDOWN) < RETRY_COOLDOWN:
+        # 같은 프로세스에서 방금 실패한 티커는 재시도 대기 없이 저장된 데이터로 대체
+        unfilled, missing = list(missing), []
+    if missing:
+        # 구간별로 받은 데이터만 반영: 조회 실패(예외)면 조회 완료 구간을 늘리지 않아 다음 실행에서 다시 조회하고,
+        # 정상 응답이 비어 있으면 그 구간에 거래가 없던 것으로 보고 (휴장일·주말·거래정지·상장폐지) 조회 완료로 기록한다
+        fetched = []
+        for s, e in missing:
+            try:
+                part = _fetch_with_retry(ticker, s, e)
+            except Exception as err:
+                error = err
+                unfilled.append((s, e))
+                continue
+            if part is None or part.empty:
+                count("provider.empty")
+                last = e
+            else:
+                fetched.append(part)
+                last = part.index.max().date()
+            # 당일 이후 데이터는 아직 확정되지 않았으므로 전일까지만 조회 완료로 기록
+            last = min(last, date.today() - timedelta(days=1))
+            if coverage is None:
+                if last >= s:
+                    coverage = (s, last)
+            elif s < coverage[0]:
+                coverage = (s, coverage[1])
+            elif last > coverage[1]:
+                coverage = (coverage[0], last)
+        if fetched or coverage != cached[1]:
+            df = _merge([df] + fetched)
+            if coverage is not None:
+                _write_local(ticker, df, coverage)
+        if unfilled:
+            _FAILED_AT[ticker] = time.monotonic()
+
+    _UNFILLED[ticker] = unfilled
+    if error is not None and (df is None or df.empty):
+        raise error
+    if df is None:
+        df = _merge([])
+    _MEMORY[ticker] = (df, coverage)
+    return df
+
+
+def unfilled(ticker):
+    """마지막 조회에서 받지 못한 구간 목록 (조회 실패 또는 재시도 대기 중이라 저장된 데이터로 대체한 구간)"""
+    return list(_UNFILLED.get(ticker, ()))
+
+
+def load_ohlcv(ticker, start, end):
+    """
+    [start, end] 구간 일봉 OHLCV 반환 (fdr.DataReader와 동일한 형태).
+    메모리/로컬 캐시가 구간을 모두 포함하면 네트워크를 사용하지 않는다.
+    """
+    start, end = _to_date(start), _to_date(end)
+    df = _ensure(ticker, start, end)
+    if df.empty:
+        return df
+    return df.loc[start.isoformat():end.isoformat()]
+
+
+def union_ranges(requests):
+    """requests: (tickers, start, end) 목록 → {ticker: (최소 시작일, 최대 종료일)}"""
+    ranges = {}
+    for tickers, start, end in requests:
+        for ticker in tickers:
+            if ticker in ranges:
+                s, e = ranges[ticker]
+                ranges[ticker] = (min(s, start), max(e, end))
+            else:
+                ranges[ticker] = (start, end)
+    return ranges
+
+
+def prefetch(ranges, max_workers=MAX_WORKERS, progress_callback=None):
+    """
+    ranges: {ticker: (start, end)}
+    max_workers: 동시 조회 스레드 수 (1이면 순차 조회)
+    progress_callback: (current, total, msg) -> None  (호출 스레드에서만 호출됨)
+
+    티커별 전체 구간을 한 번에 확보해 메모리에 올려두고,
+    이후 load_ohlcv의 기간별 조회는 메모리에서 잘라서 반환한다.
+    실패한 티커 목록을 반환한다 (일부 구간만 실패한 티커는 저장된 데이터로 계속 사용됨).
+    """
+    tickers = list(ranges)
+    total = len(tickers)
+    failed = []
+
+    def _job(ticker):
+        start, end = ranges[ticker]
+        _ensure(ticker, _to_date(start), _to_date(end))
+        gaps = unfilled(ticker)
+        if gaps:
+            raise RuntimeError("일부 구간 조회 실패, 저장된 데이터 사용: "
+                               + ", ".join(f"{s}~{e}" for s, e in gaps))
+
+    def _done(i, ticker, error):
+        if error is not None:
+            failed.append(ticker)
+            print(f"  [경고] {ticker}: 사전 조회 실패 ({error})")
+        if progress_callback:
+            progress_callback(i, total, f"주가 조회 {ticker}")
+
+    if max_workers <= 1:
+        for i, ticker in enumerate(tickers, 1):
+            try:
+                _job(ticker)
+                _done(i, ticker, None)
+            except Exception as e:
+                _done(i, ticker, e)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            # 작업마다 호출 컨텍스트를 복사해 실행 (조회 스레드의 기록도 호출한 쪽 프로파일러로)
+            futures = {pool.submit(contextvars.copy_context().run, _job, t): t for t in tickers}
+            for i, fut in enumerate(as_completed(futures), 1):
+                _done(i, futures[fut], fut.exception())
+
+    return sorted(failed)
+
+
+def clear_memory():
+    _MEMORY.clear()
+    _UNFILLED.clear()
+    _FAILED_AT.clear()
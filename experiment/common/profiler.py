@@ -0,0 +1,120 @@
+import os
+import json
+import time
+import threading
+import contextvars
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager, nullcontext
+
+# ─────────────────────────────────────────────
+# 실행 구간 계측
+# run_backtest(..., profiler=Profiler())처럼 넘기면 실행 동안 활성 프로파일러로 등록되고,
+# 엔진·주가 저장소의 stage()/count() 호출이 구간별 시간과 카운터(조회 수, 캐시 적중, 바이트)를 기록한다.
+# 활성 프로파일러가 없으면 stage()/count()는 아무것도 하지 않는다.
+#
+# 결과는 to_dict()(대시보드·JSON용) 또는 write_trace()(Chrome trace 형식,
+# chrome://tracing / https://ui.perfetto.dev 에서 열기)로 내보낸다.
+# 주가 조회 스레드에서 기록된 구간은 스레드별로 겹쳐 실행되므로 합계가 전체 시간보다 클 수 있다.
+#
+# 활성 프로파일러는 ContextVar로 관리해 동시에 실행되는 백테스트(대시보드 세션별 스레드 등)가
+# 서로의 프로파일러에 기록하지 않는다. 스레드 풀 작업은 contextvars.copy_context().run으로
+# 제출해야 호출한 쪽의 프로파일러가 이어진다 (price_store.prefetch).
+# ─────────────────────────────────────────────
+_active = contextvars.ContextVar("active_profiler", default=None)
+
+
+class Profiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+        self.stages = OrderedDict()         # 이름 → {"sec": 누적 초, "calls": 횟수}
+        self.counters = defaultdict(int)    # 이름 → 누적 값
+        self.events = []                    # trace 이벤트 (시작 µs, 길이 µs, 스레드 id, 이름)
+        self.elapsed = None                 # activate() 구간 전체 시간
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                rec = self.stages.setdefault(name, {"sec": 0.0, "calls": 0})
+                rec["sec"] += end - start
+                rec["calls"] += 1
+                self.events.append(((start - self._t0) * 1e6, (end - start) * 1e6,
+                                    threading.get_ident(), name))
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    @contextmanager
+    def activate(self):
+        """현재 컨텍스트에서 이 프로파일러를 활성으로 등록 (중첩 시 바깥 프로파일러를 유지)"""
+        outer = _active.get()
+        token = _active.set(self) if outer is None else None
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.elapsed = (self.elapsed or 0.0) + time.perf_counter() - start
+            if token is not None:
+                _active.reset(token)
+
+    def to_dict(self):
+        """{"total_sec", "stages": {이름: {"sec", "calls", "share"}}, "counters": {...}}"""
+        total = self.elapsed if self.elapsed is not None else time.perf_counter() - self._t0
+        with self._lock:
+            stages = OrderedDict(
+                (name, {"sec": round(rec["sec"], 4), "calls": rec["calls"],
+                        "share": round(rec["sec"] / total, 4) if total else 0.0})
+                for name, rec in self.stages.items())
+            counters = dict(sorted(self.counters.items()))
+        return {"total_sec": round(total, 4), "stages": stages, "counters": counters}
+
+    def write_trace(self, path):
+        """Chrome trace(JSON) 저장"""
+        pid = os.getpid()
+        with self._lock:
+            events = [{"name": name, "cat": name.split(".")[0], "ph": "X", "ts": round(ts, 1),
+                       "dur": round(dur, 1), "pid": pid, "tid": tid}
+                      for ts, dur, tid, name in self.events]
+            counters = dict(self.counters)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "otherData": counters}, f)
+
+    def format(self):
+        """CLI 출력용 표 (구간별 시간·비율, 카운터)"""
+        data = self.to_dict()
+        lines = [f"  {'구간':28s} | {'시간':>9s} | {'비율':>6s} | {'횟수':>6s}", "  " + "-" * 60]
+        for name, rec in sorted(data["stages"].items(), key=lambda kv: -kv[1]["sec"]):
+            lines.append(f"  {name:28s} | {rec['sec']:8.3f}s | {rec['share'] * 100:5.1f}% | {rec['calls']:6d}")
+        lines.append("  " + "-" * 60)
+        lines.append(f"  {'전체':28s} | {data['total_sec']:8.3f}s |  (fetch·cache 구간은 조회 스레드별 합계)")
+        for name, value in data["counters"].items():
+            lines.append(f"  {name:28s} | {value:>,}")
+        return "\n".join(lines)
+
+
+def active():
+    return _active.get()
+
+
+def stage(name):
+    """활성 프로파일러가 있으면 구간 타이머, 없으면 빈 컨텍스트"""
+    prof = _active.get()
+    return prof.stage(name) if prof is not None else nullcontext()
+
+
+def count(name, n=1):
+    prof = _active.get()
+    if prof is not None:
+        prof.count(name, n)
+
+
+def activate(profiler):
+    """profiler가 None이면 빈 컨텍스트"""
+    return profiler.activate() if profiler is not None else nullcontext()
@@ -0,0 +1,209 @@
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+# ─────────────────────────────────────────────
+# 선정 시그널 저장소 (컬럼형)
+# 폴더별 gN.csv / 월별 CSV를 하나의 Parquet 데이터셋으로 모아 두고
+# (freq=2w|1m / universe=외국인단독|시총2천억 ... 으로 파티션),
+# 백테스트는 파일별 read_csv 대신 파티션·파일명 조건으로 필요한 행만 한 번에 읽는다.
+#
+# 각 파티션에는 원본 CSV의 (크기, 수정 시각) 목록을 _source.json으로 함께 저장하고,
+# 원본과 다르면 None을 반환해 호출 측이 CSV를 직접 읽도록 한다.
+#
+# 선정 데이터는 CSV·저장소 어느 경로로 읽든 coerce()를 거쳐 같은 타입으로 고정된다
+# (티커 6자리 문자열, 점수 float32, 비고에서 한 번만 도출한 '중복' bool).
+# ─────────────────────────────────────────────
+_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.environ.get("SIGNAL_STORE_DIR", os.path.join(_DIR, "../../data/file/signal_store"))
+
+# data/code/data_split_2w.py의 통일 컬럼 (월별 CSV 컬럼도 이 이름으로 맞춤)
+KEEP_COLUMNS = ["티커", "종목명", "강도_단기", "강도_장기", "최종점수", "비고"]
+COLUMN_RENAMES = {"강도_1m": "강도_단기", "강도_2m": "강도_장기"}
+REQUIRED_COLUMNS = ["티커", "종목명", "최종점수", "비고"]
+SCORE_COLUMNS = ["강도_단기", "강도_장기", "최종점수"]
+TYPED_COLUMNS = KEEP_COLUMNS + ["중복"]
+COLUMNS = ["file", "group", "select_date", "rank"] + TYPED_COLUMNS
+
+# 저장 스키마가 바뀌면 올려서 기존 파티션을 무효화 (CSV 직접 읽기로 대체됨)
+STORE_VERSION = 2
+
+_TICKER_PATTERN = r"[0-9A-Z]{1,6}"  # 앞자리 0이 빠진 숫자 코드 포함 (예: 720, 00680K)
+_MANIFEST = "_source.json"  # '_'로 시작하는 파일은 데이터셋 탐색에서 제외됨
+
+
+def _partition_dir(freq, universe):
+    return os.path.join(STORE_DIR, f"freq={freq}", f"universe={universe}")
+
+
+def _source_signature(base_dir, files):
+    """{파일명: [크기, 수정 시각(ns)]} (내용을 읽지 않는 변경 감지용)"""
+    sig = {}
+    for name in files:
+        st = os.stat(os.path.join(base_dir, name))
+        sig[name] = [st.st_size, st.st_mtime_ns]
+    return sig
+
+
+def _bad_rows(mask):
+    # CSV 기준 행 번호 (헤더가 1행)
+    rows = [str(i + 2) for i in np.flatnonzero(mask)[:5]]
+    return ", ".join(rows) + (" ..." if mask.sum() > 5 else "")
+
+
+def validate(df, source=""):
+    """
+    통일 컬럼으로 맞추고 티커를 6자리 문자열로 정규화 (점수는 원래 정밀도 유지).
+    필수 컬럼 누락, 티커 형식 오류·중복, 최종점수 결측·비숫자가 있으면 ValueError
+    """
+    df = df.rename(columns=COLUMN_RENAMES)
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"{source}: 필수 컬럼 없음 {missing} (컬럼: {list(df.columns)})")
+    df = df.reindex(columns=KEEP_COLUMNS).reset_index(drop=True)
+
+    ticker = df['티커'].astype(str).str.strip().str.upper()
+    bad = ~ticker.str.fullmatch(_TICKER_PATTERN)
+    if bad.any():
+        raise ValueError(f"{source}: 티커 형식 오류 (행 {_bad_rows(bad)}: "
+                         f"{df['티커'][bad].head(5).tolist()})")
+    ticker = ticker.str.zfill(6)
+    dup = ticker.duplicated()
+    if dup.any():
+        raise ValueError(f"{source}: 티커 중복 (행 {_bad_rows(dup)}: {ticker[dup].head(5).tolist()})")
+    df['티커'] = ticker
+
+    for col in SCORE_COLUMNS:
+        values = pd.to_numeric(df[col], errors="coerce")
+        invalid = values.isna() & df[col].notna()
+        if col == "최종점수":
+            invalid |= values.isna()
+        if invalid.any():
+            raise ValueError(f"{source}: {col} 값 오류 (행 {_bad_rows(invalid)}: "
+                             f"{df[col][invalid].head(5).tolist()})")
+        df[col] = values
+    return df
+
+
+def coerce(df, source=""):
+    """validate + 타입 고정: 점수 float32, 비고 문자열, 중복 여부 bool 컬럼 추가 (TYPED_COLUMNS)"""
+    df = validate(df, source)
+    df[SCORE_COLUMNS] = df[SCORE_COLUMNS].astype(np.float32)
+    df['종목명'] = df['종목명'].astype(str)
+    df['비고'] = df['비고'].fillna("").astype(str)
+    df['중복'] = df['비고'].str.contains("중복", regex=False)
+    return df
+
+
+def read_csv(path):
+    """선정 CSV 1개 → coerce된 DataFrame (티커는 문자열로 읽어 앞자리 0 보존)"""
+    return coerce(pd.read_csv(path, dtype={'티커': str}), source=path)
+
+
+def _rows(base_dir, calendar, name):
+    """CSV 1개 → 저장소 행 (file, group, select_date, rank + 통일 컬럼)"""
+    df = read_csv(os.path.join(base_dir, name))
+    df.insert(0, "file", name)
+    df.insert(1, "group", os.path.splitext(name)[0])
+    df.insert(2, "select_date", calendar.select_date(name))
+    df.insert(3, "rank", range(1, len(df) + 1))
+    return df
+
+
+def _write(base_dir, calendar, frames, files):
+    """파티션 Parquet를 임시 파일에 쓴 뒤 교체하고 원본 목록 갱신 → 저장한 행 수"""
+    table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=COLUMNS)
+    out_dir = _partition_dir(calendar.freq, os.path.basename(os.path.normpath(base_dir)))
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, "part-0.parquet")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    table.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+    manifest = {"version": STORE_VERSION, "source": os.path.realpath(base_dir),
+                "files": _source_signature(base_dir, files)}
+    tmp = os.path.join(out_dir, f"{_MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(out_dir, _MANIFEST))
+    return len(table)
+
+
+def write_partition(base_dir, calendar):
+    """
+    base_dir의 선정 CSV 전체를 (freq=calendar.freq, universe=폴더명) 파티션으로 저장
+    → 저장한 행 수
+    """
+    files = calendar.files(base_dir)
+    return _write(base_dir, calendar, [_rows(base_dir, calendar, name) for name in files], files)
+
+
+def update_partition(base_dir, calendar, changed):
+    """
+    changed(새로 쓰거나 바뀐 CSV 파일명)의 행만 교체. 나머지 파일도 저장소와 다르거나
+    파티션이 없으면 전체를 다시 저장 → 저장한 행 수
+    """
+    files = calendar.files(base_dir)
+    changed = set(changed)
+    others = [name for name in files if name not in changed]
+    out_dir = _partition_dir(calendar.freq, os.path.basename(os.path.normpath(base_dir)))
+    path = os.path.join(out_dir, "part-0.parquet")
+    if not os.path.exists(path) or not _is_fresh(base_dir, out_dir, others):
+        return write_partition(base_dir, calendar)
+
+    kept = pd.read_parquet(path)
+    kept = kept[kept["file"].isin(others)]
+    frames = [kept] + [_rows(base_dir, calendar, name) for name in files if name in changed]
+    return _write(base_dir, calendar, frames, files)
+
+
+def _is_fresh(base_dir, out_dir, files):
+    path = os.path.join(out_dir, _MANIFEST)
+    if not os.path.exists(path):
+        return False
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != STORE_VERSION or manifest.get("source") != os.path.realpath(base_dir):
+        return False
+    stored = manifest.get("files", {})
+    try:
+        current = _source_signature(base_dir, files)
+    except OSError:
+        return False
+    return all(stored.get(name) == sig for name, sig in current.items())
+
+
+def query(freq, universe=None, files=None, columns=None):
+    """
+    조건에 맞는 행만 읽기 (파티션 디렉터리 선택 + 파일명 필터를 Parquet 스캔 단계에 적용)
+    → DataFrame (file, rank 순서)
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(STORE_DIR, format="parquet", partitioning="hive")
+    expr = ds.field("freq") == freq
+    if universe is not None:
+        expr &= ds.field("universe") == universe
+    if files is not None:
+        expr &= ds.field("file").isin(list(files))
+    cols = None if columns is None else list(dict.fromkeys(["file", "rank"] + list(columns)))
+    df = dataset.to_table(columns=cols, filter=expr).to_pandas()
+    return df.sort_values(["file", "rank"], kind="mergesort").reset_index(drop=True)
+
+
+def read_selections(base_dir, calendar, files, columns=TYPED_COLUMNS):
+    """
+    files 순서대로 선정 DataFrame 목록 (read_csv와 같은 컬럼·타입).
+    저장소에 해당 파티션이 없거나 원본 CSV가 바뀌었으면 None
+    """
+    universe = os.path.basename(os.path.normpath(base_dir))
+    out_dir = _partition_dir(calendar.freq, universe)
+    if not files or not _is_fresh(base_dir, out_dir, files):
+        return None
+    df = query(calendar.freq, universe, files, columns)
+    groups = dict(tuple(df.groupby("file", sort=False)))
+    if any(name not in groups for name in files):
+        return None
+    return [groups[name][list(columns)].reset_index(drop=True) for name in files]
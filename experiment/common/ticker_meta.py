@@ -0,0 +1,129 @@
+import os
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+# ─────────────────────────────────────────────
+# 종목 메타데이터 저장소 (업종·시장·종목명)
+# KRX 상장 목록(FinanceDataReader "KRX-DESC")을 티커 인덱스의 작은 Parquet 표로 저장해 두고,
+# 대시보드·스크립트는 목록 전체를 내려받는 대신 이 표를 읽어 보유 종목과 조인한다.
+#
+# 저장된 표가 REFRESH_DAYS보다 오래되면 기존 표를 그대로 돌려주면서 백그라운드에서 갱신한다.
+# 표가 아예 없을 때만 호출 시점에 내려받는다 (실패 시 빈 표).
+# 정기 갱신: python data/code/refresh_ticker_meta.py (cron 등에서 실행)
+# ─────────────────────────────────────────────
+_DIR = os.path.dirname(os.path.abspath(__file__))
+META_DIR = os.environ.get("TICKER_META_DIR", os.path.join(_DIR, "../../data/file/ticker_meta"))
+REFRESH_DAYS = float(os.environ.get("TICKER_META_REFRESH_DAYS", 7))
+
+COLUMNS = ["종목명", "시장", "업종"]
+LISTING_RENAMES = {"Code": "티커", "Name": "종목명", "Market": "시장", "Sector": "업종"}
+UNKNOWN_SECTOR = "기타"
+
+_refresh_lock = threading.Lock()
+_refreshing = None   # 진행 중인 백그라운드 갱신 스레드
+
+
+def _paths():
+    return (os.path.join(META_DIR, "krx_listing.parquet"),
+            os.path.join(META_DIR, "krx_listing.json"))
+
+
+def _empty():
+    df = pd.DataFrame({c: pd.Series(dtype="category") for c in COLUMNS})
+    df.index = pd.Index([], dtype=object, name="티커")
+    return df
+
+
+def _fetch_listing():
+    # 표를 읽기만 하는 실행에서는 FinanceDataReader를 불러오지 않도록 실제 조회 시점에 import
+    import FinanceDataReader as fdr
+    return fdr.StockListing("KRX-DESC")
+
+
+def normalize(listing):
+    """상장 목록 → 티커(6자리 문자열) 인덱스 + 종목명·시장·업종(category) 표"""
+    df = listing.rename(columns=LISTING_RENAMES)
+    df["티커"] = df["티커"].astype(str).str.zfill(6)
+    for col in COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+    df = df.drop_duplicates("티커").set_index("티커")[COLUMNS]
+    return df.astype("category")
+
+
+def updated_at():
+    """마지막 갱신 시각 (저장된 표가 없으면 None)"""
+    _, info_path = _paths()
+    if not os.path.exists(info_path):
+        return None
+    with open(info_path, encoding="utf-8") as f:
+        return datetime.fromisoformat(json.load(f)["updated"])
+
+
+def refresh():
+    """상장 목록을 내려받아 저장 (임시 파일에 쓴 뒤 교체). 저장한 종목 수 반환"""
+    df = normalize(_fetch_listing())
+    data_path, info_path = _paths()
+    os.makedirs(META_DIR, exist_ok=True)
+    tmp = f".{os.getpid()}.tmp"
+    df.to_parquet(data_path + tmp)
+    os.replace(data_path + tmp, data_path)
+    with open(info_path + tmp, "w", encoding="utf-8") as f:
+        json.dump({"updated": datetime.now().isoformat(timespec="seconds"), "rows": len(df)}, f)
+    os.replace(info_path + tmp, info_path)
+    return len(df)
+
+
+def _refresh_quietly():
+    try:
+        refresh()
+    except Exception as e:
+        print(f"  [ticker_meta] 상장 목록 갱신 실패: {e}")
+
+
+def refresh_in_background():
+    """진행 중인 갱신이 없으면 백그라운드 스레드로 갱신 시작. 시작한 스레드(또는 진행 중인 스레드) 반환"""
+    global _refreshing
+    with _refresh_lock:
+        if _refreshing is None or not _refreshing.is_alive():
+            _refreshing = threading.Thread(target=_refresh_quietly, name="ticker-meta-refresh", daemon=True)
+            _refreshing.start()
+        return _refreshing
+
+
+def load_ticker_meta(max_age_days=REFRESH_DAYS):
+    """
+    저장된 메타데이터 표 반환. 오래된 표는 그대로 쓰고 백그라운드에서 갱신하며,
+    표가 없으면 바로 내려받는다 (실패 시 빈 표)
+    """
+    data_path, _ = _paths()
+    if not os.path.exists(data_path):
+        _refresh_quietly()
+        if not os.path.exists(data_path):
+            return _empty()
+    stamp = updated_at()
+    if stamp is None or datetime.now() - stamp > timedelta(days=max_age_days):
+        refresh_in_background()
+    return pd.read_parquet(data_path)
+
+
+def attach_meta(holdings, meta, columns=("업종",), ticker_col="티커"):
+    """보유 종목 표에 메타데이터 컬럼을 조인 (없는 업종은 '기타')"""
+    cols = [c for c in columns if c not in holdings.columns]
+    out = holdings.join(meta[cols].astype(object), on=ticker_col)
+    if "업종" in cols:
+        out["업종"] = out["업종"].fillna(UNKNOWN_SECTOR)
+    return out
+
+
+def sector_weights(holdings, meta, weight_col, top=None, ticker_col="티커"):
+    """업종별 비중 합계와 종목명 목록 (비중 내림차순, top개)"""
+    h = attach_meta(holdings, meta, ticker_col=ticker_col)
+    out = (h.groupby("업종", sort=False)
+            .agg(비중=(weight_col, "sum"), 종목=("종목명", ", ".join))
+            .sort_values("비중", ascending=False, kind="stable")
+            .reset_index())
+    return out.head(top) if top else out
@@ -0,0 +1,179 @@
+import os
+import sys
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+_DIR = os.path.dirname(os.path.abspath(__file__))
+for _sub in ("common", "2w", "1m"):
+    sys.path.insert(0, os.path.join(_DIR, _sub))
+
+from price_store import union_ranges, MAX_WORKERS
+import price_panel
+import engine
+
+# ─────────────────────────────────────────────
+# 파라미터 스윕
+# 사용법: python experiment/sweep.py --freq 2w 1m --price open close vwap --workers 4
+#
+# (리밸런싱 주기 × 시그널/시총 × 가격 기준) 조합을 프로세스 풀에서 동시에 실행하고,
+# 비중 방식(동일/점수)별 성과 지표를 하나의 표로 반환한다.
+# 주가와 2주 기간표(거래일로 생성한 기간)는 부모 프로세스에서 한 번만 준비해 두고,
+# 각 작업은 메모리 매핑한 공유 가격 행렬만 읽는다 (티커별 캐시를 다시 읽지 않음).
+# ─────────────────────────────────────────────
+DATA_DIR = os.path.join(_DIR, "../data/file")
+SIGNALS = ["외국인단독", "기관포함"]
+CAPS = ["2천억", "5천억"]
+PRICE_METHODS = ["open", "close", "vwap"]
+WEIGHTINGS = {"equal": "EqualWeight", "score": "ScoreWeight"}
+
+
+def _base_dir(freq, universe):
+    if freq == "2w":
+        return os.path.join(DATA_DIR, "rebal_2w_csv", universe)
+    return os.path.join(DATA_DIR, "monthly_csv_data", f"시총{universe}")
+
+
+def build_grid(freqs=("2w", "1m"), signals=SIGNALS, caps=CAPS, prices=PRICE_METHODS):
+    """(freq, universe, price) 작업 목록. 2주는 시그널, 월별은 시총 구간이 universe"""
+    jobs = []
+    for freq in freqs:
+        universes = signals if freq == "2w" else caps
+        jobs += [(freq, u, p) for u, p in itertools.product(universes, prices)]
+    return jobs
+
+
+def plan_price_ranges(jobs):
+    """전체 작업의 티커별 조회 구간 합집합"""
+    import backtesting_2w
+    import backtesting_score_weighted
+
+    requests = []
+    for freq, universe in sorted({(f, u) for f, u, _ in jobs}):
+        module = backtesting_2w if freq == "2w" else backtesting_score_weighted
+        for ticker, (start, end) in module.plan_price_ranges(_base_dir(freq, universe)).items():
+            requests.append(([ticker], start, end))
+    return union_ranges(requests)
+
+
+def _metrics(s_ret, b_ret, periods_per_year):
+    return {
+        'total_return': (1 + s_ret).prod() - 1,
+        'kospi_return': (1 + b_ret).prod() - 1,
+        'excess_return': ((1 + s_ret).prod() - 1) - ((1 + b_ret).prod() - 1),
+        'sharpe': engine.calc_sharpe(s_ret, periods_per_year=periods_per_year),
+        'mdd': engine.calc_mdd(s_ret),
+        'ir': engine.calc_ir(s_ret, b_ret, periods_per_year=periods_per_year),
+        'win_rate': engine.calc_win_rate(s_ret, b_ret),
+        'n_periods': len(s_ret),
+    }
+
+
+def _init_worker(panel_path, extension):
+    """작업 프로세스 초기화: 공유 가격 행렬 연결 + 부모가 생성한 2주 기간표 고정"""
+    price_panel.attach(panel_path)
+    if extension is not None:
+        import backtesting_2w
+        backtesting_2w.CALENDAR.pin(extension)
+
+
+def run_job(job):
+    """작업 1개 실행 → 비중 방식별 결과 행 목록 (프로세스 풀 작업 함수)"""
+    freq, universe, price = job
+    base_dir = _base_dir(freq, universe)
+    daily = None
+
+    # 주가는 연결된 공유 가격 행렬에서 읽으므로 조회 스레드를 쓰지 않음
+    if freq == "2w":
+        import backtesting_2w
+        res, *_, daily = backtesting_2w.run_backtest(base_dir, price_method=price,
+                                                     max_workers=1, daily=True)
+    else:
+        import backtesting_score_weighted
+        res, *_ = backtesting_score_weighted.run_comparison_backtest(
+            base_dir, price_method=price, max_workers=1, verbose=False)
+
+    rows = []
+    for weighting, col in WEIGHTINGS.items():
+        row = {'freq': freq, 'universe': universe, 'price': price, 'weighting': weighting}
+        row.update(_metrics(res[col], res['KOSPI'], engine.PERIODS_PER_YEAR[freq]))
+        if daily is not None:
+            d_ret = daily[col].pct_change().dropna()
+            row['daily_sharpe'] = engine.calc_sharpe(d_ret, periods_per_year=engine.TRADING_DAYS)
+            row['daily_mdd'] = engine.calc_mdd_nav(daily[col])
+        else:
+            row['daily_sharpe'] = np.nan
+            row['daily_mdd'] = np.nan
+        rows.append(row)
+    return rows
+
+
+def run_sweep(jobs, max_workers=None, fetch_workers=MAX_WORKERS):
+    """
+    jobs: build_grid() 결과
+    max_workers: 프로세스 수 (None이면 CPU 수, 1이면 현재 프로세스에서 순차 실행)
+    반환: 작업 순서대로 정렬된 결과 DataFrame (작업 × 비중 방식 1행)
+    """
+    # 2주 기간표를 한 번만 생성해 작업 프로세스에 넘김 (프로세스마다 거래일을 조회하지 않도록)
+    extension = None
+    if any(freq == "2w" for freq, _, _ in jobs):
+        import backtesting_2w
+        backtesting_2w.CALENDAR.extend()
+        extension = backtesting_2w.CALENDAR.extension()
+    ranges = plan_price_ranges(jobs)
+
+    # 전체 구간의 가격 행렬을 한 번만 만들어 저장하고 (없을 때만 주가 조회), 각 프로세스는 메모리 매핑으로 공유
+    panel_path = price_panel.shared_panel_path(ranges, max_workers=fetch_workers)
+
+    if max_workers == 1:
+        price_panel.attach(panel_path)
+        try:
+            results = [run_job(job) for job in jobs]
+        finally:
+            price_panel.detach()
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(panel_path, extension)) as pool:
+            results = list(pool.map(run_job, jobs))
+
+    return pd.DataFrame([row for rows in results for row in rows])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="리밸런싱 주기 × 시그널/시총 × 가격 기준 × 비중 방식 파라미터 스윕")
+    parser.add_argument("--freq", nargs="+", default=["2w", "1m"], choices=["2w", "1m"],
+                        help="리밸런싱 주기")
+    parser.add_argument("--signal", nargs="+", default=SIGNALS, choices=SIGNALS,
+                        help="2주 리밸런싱 시그널 유형")
+    parser.add_argument("--cap", nargs="+", default=CAPS, choices=CAPS,
+                        help="월별 리밸런싱 시총 구간")
+    parser.add_argument("--price", nargs="+", default=PRICE_METHODS, choices=PRICE_METHODS,
+                        help="수익률 계산 기준")
+    parser.add_argument("--weighting", nargs="+", default=list(WEIGHTINGS), choices=list(WEIGHTINGS),
+                        help="비중 방식 (결과 필터)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="동시 실행 프로세스 수 (기본: CPU 수, 1이면 순차 실행)")
+    parser.add_argument("--out", type=str, default="sweep_results.csv",
+                        help="결과 CSV 저장 경로")
+    args = parser.parse_args()
+
+    grid = build_grid(args.freq, args.signal, args.cap, args.price)
+    table = run_sweep(grid, max_workers=args.workers)
+    table = table[table['weighting'].isin(args.weighting)].reset_index(drop=True)
+
+    disp = table.copy()
+    for col in ['total_return', 'kospi_return', 'excess_return', 'mdd', 'win_rate', 'daily_mdd']:
+        disp[col] = disp[col].map(lambda x: f"{x*100:+.2f}%" if pd.notna(x) else "-")
+    for col in ['sharpe', 'ir', 'daily_sharpe']:
+        disp[col] = disp[col].map(lambda x: f"{x:.3f}" if pd.notna(x) else "-")
+
+    print("\n" + "=" * 120)
+    print(f"  파라미터 스윕 결과 ({len(grid)}개 조합 × {len(args.weighting)}개 비중 방식)")
+    print("=" * 120)
+    print(disp.to_string(index=False))
+
+    table.to_csv(args.out, index=False, encoding="utf-8-sig")
+    print(f"\n>> 완료! 결과 표: '{args.out}'")
@@ -0,0 +1,34 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../experiment/common"))
+from fundamentals import FundamentalsService, StubProvider
+
+
+class FlakyKSProvider(StubProvider):
+    """.KS 조회는 예외, .KQ는 infos 값 반환"""
+
+    def info(self, symbol):
+        if symbol.endswith(".KS"):
+            with self._lock:
+                self.calls += 1
+            raise ConnectionError("KS 조회 실패")
+        return super().info(symbol)
+
+
+def test_falls_through_to_kq_when_ks_raises(tmp_path):
+    provider = FlakyKSProvider({"035720.KQ": {"marketCap": 2e13, "trailingPE": 12.0}})
+    service = FundamentalsService(provider, path=str(tmp_path / "snapshot.json"))
+    data = service.get("035720")
+    assert data["시가총액"] == 20.0
+    assert data["PER"] == 12.0
+    assert service._suffix["035720"] == "KQ"
+    assert provider.calls == 2
+
+
+def test_failure_recorded_only_when_all_suffixes_fail(tmp_path):
+    provider = FlakyKSProvider({})
+    service = FundamentalsService(provider, path=str(tmp_path / "snapshot.json"))
+    assert service.get("000001") is None
+    assert "000001" in service._failed
+    assert provider.calls == 2
@@ -0,0 +1,113 @@
+import os
+import sys
+import json
+import time
+import threading
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../experiment/common"))
+from news_client import NewsClient
+
+
+class MockNaver(BaseHTTPRequestHandler):
+    """검색어에 따라 정상 응답 / 지연("느림") / 서버 오류("실패")를 돌려주는 모의 검색 API"""
+    protocol_version = "HTTP/1.1"   # keep-alive (연결 재사용 확인용)
+
+    def do_GET(self):
+        q = parse_qs(urlparse(self.path).query)
+        query, display = q["query"][0], int(q["display"][0])
+        with self.server.lock:
+            self.server.hits.append((query, self.client_address, self.headers["X-Naver-Client-Id"]))
+        if query == "느림":
+            time.sleep(1.0)
+        if query == "실패" or self.server.down:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps({"items": [{"title": f"<b>{query}</b> {i}", "link": f"http://news/{i}"}
+                                     for i in range(display)]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), MockNaver)
+    srv.hits, srv.lock, srv.down = [], threading.Lock(), False
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _client(server, tmp_path, **kwargs):
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/search/news.json"
+    return NewsClient("id", "secret", base_url=url, path=str(tmp_path / "news.json"), **kwargs)
+
+
+def test_get_many_reuses_pooled_connections(server, tmp_path):
+    client = _client(server, tmp_path, max_workers=2)
+    queries = [f"종목{i}" for i in range(8)]
+    result = client.get_many(queries, display=3)
+    assert all(len(result[q]) == 3 for q in queries)
+    assert {h[2] for h in server.hits} == {"id"}
+    # 검색어 8개를 스레드 2개가 연결을 재사용해 조회 (검색어마다 새 연결을 열지 않음)
+    assert len(server.hits) == 8
+    assert len({h[1] for h in server.hits}) <= 2
+
+    # 저장된 결과는 새 클라이언트에서도 재사용 (추가 요청 없음)
+    again = _client(server, tmp_path, max_workers=2).get_many(queries, display=3)
+    assert again == result
+    assert len(server.hits) == 8
+
+
+def test_timeout_and_server_error(server, tmp_path):
+    client = _client(server, tmp_path, timeout=(1.0, 0.2))
+    result = client.get_many(["느림", "실패", "정상"], display=2)
+    assert result["느림"] is None
+    assert result["실패"] is None
+    assert len(result["정상"]) == 2
+    assert "Timeout" in client.error("느림", display=2)
+    assert "HTTPError" in client.error("실패", display=2)
+    assert client.error("정상", display=2) is None
+
+
+def test_background_refresh_keeps_stale_result_until_updated(server, tmp_path):
+    client = _client(server, tmp_path, max_age_minutes=10)
+    client.get_many(["삼성전자"], display=1)
+    # 저장 시각을 오래전으로 돌려 갱신 대상으로 만든 뒤, 서버 장애 중에는 이전 결과를 유지
+    client._cache["삼성전자|1"]["fetched"] = (datetime.now() - timedelta(hours=1)).isoformat()
+    server.down = True
+    items, fresh = client.get("삼성전자", display=1, wait=2.0)
+    assert items is not None and not fresh
+    assert client.error("삼성전자", display=1) is not None
+
+    server.down = False
+    items, fresh = client.get("삼성전자", display=1, wait=2.0)
+    assert fresh and len(items) == 1
+    assert client.error("삼성전자", display=1) is None
+
+
+def test_get_returns_immediately_while_refreshing(server, tmp_path):
+    client = _client(server, tmp_path)
+    t = time.perf_counter()
+    items, fresh = client.get("느림", display=1, wait=0.0)
+    assert time.perf_counter() - t < 0.5
+    assert items is None and not fresh
+    futures = client.refresh_async(["느림"], display=1)   # 진행 중인 갱신을 다시 제출하지 않음
+    futures["느림"].result(timeout=5)
+    items, fresh = client.cached("느림", display=1)
+    assert fresh and len(items) == 1
+    assert sum(1 for h in server.hits if h[0] == "느림") == 1
@@ -0,0 +1,99 @@
+import os
+import sys
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../experiment/common"))
+import price_store
+
+
+class CalendarProvider:
+    """거래일 달력에서 잘라 반환하는 가짜 조회기 (달력에 없는 날짜는 휴장·거래정지)"""
+
+    def __init__(self, dates, fail=False):
+        self.dates = pd.DatetimeIndex(dates, name="Date")
+        self.fail = fail
+        self.calls = []
+
+    def __call__(self, ticker, start, end):
+        self.calls.append((ticker, start, end))
+        if self.fail:
+            raise ConnectionError("조회 실패")
+        idx = self.dates[(self.dates >= pd.Timestamp(start)) & (self.dates <= pd.Timestamp(end))]
+        return pd.DataFrame({c: 1.0 for c in ["Open", "High", "Low", "Close", "Volume"]}, index=idx)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_store, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(price_store._limiter, "min_interval", 0)
+    monkeypatch.setattr(price_store, "BACKOFF", 0)
+    price_store.clear_memory()
+    yield price_store
+    price_store.clear_memory()
+
+
+def _use(store, monkeypatch, provider):
+    monkeypatch.setattr(store, "_fetch", provider)
+    store.clear_memory()   # 새 프로세스처럼 디스크 캐시부터 읽음
+    return provider
+
+
+def test_holiday_gap_is_covered(store, monkeypatch):
+    # 2025-12-31(수)은 휴장: 12-30까지 받은 뒤 12-31만 남은 구간은 빈 응답
+    days = pd.bdate_range("2025-12-01", "2025-12-30")
+    _use(store, monkeypatch, CalendarProvider(days))
+    store.load_ohlcv("005930", "2025-12-01", "2025-12-30")
+
+    provider = _use(store, monkeypatch, CalendarProvider(days))
+    assert store.prefetch({"005930": ("2025-12-01", "2025-12-31")}, max_workers=1) == []
+    assert len(provider.calls) == 1
+    assert store.unfilled("005930") == []
+
+    provider = _use(store, monkeypatch, CalendarProvider(days))
+    assert store.prefetch({"005930": ("2025-12-01", "2025-12-31")}, max_workers=1) == []
+    assert provider.calls == []
+
+
+def test_suspended_ticker_is_not_refetched(store, monkeypatch):
+    # 11월 거래 후 12월 전체 거래정지 (과거 구간의 빈 응답)
+    days = pd.bdate_range("2025-11-03", "2025-11-28")
+    _use(store, monkeypatch, CalendarProvider(days))
+    store.load_ohlcv("000001", "2025-11-03", "2025-11-28")
+
+    provider = _use(store, monkeypatch, CalendarProvider(days))
+    df = store.load_ohlcv("000001", "2025-11-03", "2025-12-31")
+    assert len(df) == len(days)
+    assert len(provider.calls) == 1
+    assert store.unfilled("000001") == []
+
+    provider = _use(store, monkeypatch, CalendarProvider(days))
+    store.load_ohlcv("000001", "2025-11-03", "2025-12-31")
+    assert provider.calls == []
+
+
+def test_failed_tail_stays_unfilled(store, monkeypatch):
+    days = pd.bdate_range("2025-11-03", "2025-12-31")
+    _use(store, monkeypatch, CalendarProvider(days))
+    store.load_ohlcv("005930", "2025-11-03", "2025-11-28")
+
+    _use(store, monkeypatch, CalendarProvider(days, fail=True))
+    df = store.load_ohlcv("005930", "2025-11-03", "2025-12-31")
+    assert df.index.max() == pd.Timestamp("2025-11-28")
+    assert store.unfilled("005930") == [(date(2025, 11, 29), date(2025, 12, 31))]
+
+    provider = _use(store, monkeypatch, CalendarProvider(days))
+    df = store.load_ohlcv("005930", "2025-11-03", "2025-12-31")
+    assert df.index.max() == pd.Timestamp("2025-12-31")
+    assert len(provider.calls) == 1
+
+
+def test_today_is_not_marked_covered(store, monkeypatch):
+    today = date.today()
+    provider = _use(store, monkeypatch, CalendarProvider(pd.bdate_range(today - timedelta(days=20), today)))
+    store.load_ohlcv("005930", today - timedelta(days=20), today)
+    _, coverage = store._read_local("005930")
+    assert coverage[1] == today - timedelta(days=1)
+    assert len(provider.calls) == 1
@@ -0,0 +1,67 @@
+import os
+import sys
+import threading
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../experiment/common"))
+import price_store
+from profiler import Profiler, activate, active, count, stage
+
+
+def _fake_fetch(ticker, start, end):
+    idx = pd.bdate_range(start, end, name="Date")
+    return pd.DataFrame({c: 1.0 for c in ["Open", "High", "Low", "Close", "Volume"]}, index=idx)
+
+
+def test_concurrent_runs_record_to_own_profiler(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_store, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(price_store, "_fetch", _fake_fetch)
+    monkeypatch.setattr(price_store._limiter, "min_interval", 0)
+    price_store.clear_memory()
+
+    runs = {"a": ["A1", "A2", "A3"], "b": ["B1", "B2", "B3", "B4", "B5"]}
+    profilers = {name: Profiler() for name in runs}
+    barrier = threading.Barrier(len(runs))
+    errors = []
+
+    def run(name):
+        try:
+            with activate(profilers[name]):
+                barrier.wait()   # 두 실행이 모두 활성화된 상태에서 동시에 기록
+                with stage(f"run.{name}"):
+                    count(f"only.{name}")
+                    ranges = {t: ("2025-01-02", "2025-01-31") for t in runs[name]}
+                    assert price_store.prefetch(ranges, max_workers=4) == []
+                barrier.wait()
+            assert active() is None
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in runs]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    price_store.clear_memory()
+
+    assert errors == []
+    for name, tickers in runs.items():
+        data = profilers[name].to_dict()
+        other = "b" if name == "a" else "a"
+        assert list(data["stages"]).count(f"run.{other}") == 0
+        assert data["counters"][f"only.{name}"] == 1
+        assert f"only.{other}" not in data["counters"]
+        # 조회 스레드 풀에서 기록된 카운터도 자기 실행의 티커 수만큼만
+        assert data["counters"]["provider.calls"] == len(tickers)
+
+
+def test_nested_activate_keeps_outer():
+    outer, inner = Profiler(), Profiler()
+    with activate(outer):
+        with activate(inner):
+            count("x")
+        assert active() is outer
+    assert active() is None
+    assert outer.counters["x"] == 1
+    assert "x" not in inner.counters
@@ -0,0 +1,40 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../data/code"))
+import signal_pipeline
+
+
+def _day(offset):
+    return (datetime.now() + timedelta(days=offset)).strftime("%Y%m%d")
+
+
+def _snapshot():
+    return pd.DataFrame({"순매수거래대금": [1.0, 2.0]}, index=[5930, 660])
+
+
+def test_cached_persists_past_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(signal_pipeline, "CACHE_DIR", str(tmp_path))
+    df = signal_pipeline._cached("past", _snapshot, _day(-1))
+    assert list(df.index) == ["005930", "000660"]
+    assert os.path.exists(tmp_path / "past.parquet")
+    cached = signal_pipeline._cached("past", lambda: pd.DataFrame(), _day(-1))
+    assert list(cached.index) == ["005930", "000660"]
+
+
+def test_cached_skips_empty_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(signal_pipeline, "CACHE_DIR", str(tmp_path))
+    df = signal_pipeline._cached("empty", lambda: pd.DataFrame({"순매수거래대금": []}), _day(-1))
+    assert df.empty
+    assert not os.path.exists(tmp_path / "empty.parquet")
+
+
+def test_cached_skips_unfinished_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(signal_pipeline, "CACHE_DIR", str(tmp_path))
+    for name, end in [("today", _day(0)), ("future", _day(3))]:
+        df = signal_pipeline._cached(name, _snapshot, end)
+        assert len(df) == 2
+        assert not os.path.exists(tmp_path / f"{name}.parquet")